@@ -65,6 +65,10 @@ class UserProfile:
     dwell_time_ms: int = 1200
     click_radius_pixels: int = 25
     
+    # Tuned IntentEngine thresholds (intent_tuner.py); empty = engine defaults
+    intent_params: Dict[str, object] = field(default_factory=dict)
+    intent_tuning_score: float = 0.0  # F-score of intent_params on the tuning sessions
+    
     # Usage statistics
     total_sessions: int = 0
     total_usage_minutes: float = 0.0
@@ -402,6 +406,25 @@ class UserProfileManager:
         profile.last_updated = datetime.now().isoformat()
         logger.info(f"Profile calibration updated: {profile.user_id}")
     
+    def update_profile_intent(
+        self,
+        profile: UserProfile,
+        params: Dict[str, object],
+        score: float
+    ) -> None:
+        """
+        Update profile with tuned intent thresholds.
+        
+        Args:
+            profile: UserProfile to update
+            params: IntentEngine parameters (see IntentEngine.apply_params)
+            score: Tuning objective reached with these parameters
+        """
+        profile.intent_params = dict(params)
+        profile.intent_tuning_score = score
+        profile.last_updated = datetime.now().isoformat()
+        logger.info(f"Profile intent parameters updated: {profile.user_id}")
+    
     def update_profile_session_stats(
         self,
         profile: UserProfile,
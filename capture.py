@@ -0,0 +1,220 @@
+"""
+Threaded Camera Capture
+Dedicated capture thread with a preallocated latest-frame ring buffer
+Decouples USB frame delivery from the processing loop and counts dropped frames
+Part of NeuroGaze Elite
+"""
+
+import time
+import logging
+import threading
+from typing import Callable, Optional, Tuple, List
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class ThreadedCameraCapture:
+    """
+    Reads frames on a background thread into a small ring of reusable buffers.
+
+    The consumer always receives the newest completed frame; frames that were
+    overwritten before the consumer asked for them are counted as dropped.
+    A frame returned by read() stays valid until the next call to read().
+    """
+
+    def __init__(
+        self,
+        open_camera: Callable[[], cv2.VideoCapture],
+        ring_size: int = 3,
+        read_timeout_s: float = 1.0
+    ):
+        """
+        Initialize threaded capture.
+
+        Args:
+            open_camera: Callable returning an opened cv2.VideoCapture
+                         (called again to reconnect after a read failure)
+            ring_size: Number of preallocated frame buffers (minimum 3)
+            read_timeout_s: Max time read() waits for a new frame
+        """
+        self._open_camera = open_camera
+        self.ring_size = max(3, int(ring_size))
+        self.read_timeout_s = read_timeout_s
+
+        self.cap: cv2.VideoCapture = open_camera()
+        self.frame_width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.frame_height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+
+        # Ring buffer (allocated lazily on first frame so geometry is exact)
+        self._buffers: List[Optional[np.ndarray]] = [None] * self.ring_size
+        self._timestamps = [0.0] * self.ring_size
+        self._frame_ids = [0] * self.ring_size
+        self._latest_slot = -1
+        self._reader_slot = -1
+        self._frame_seq = 0
+        self._consumed_seq = 0
+
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self.failed = False
+        self.error_message = ""
+
+        # Stats
+        self.frames_captured = 0
+        self.frames_delivered = 0
+        self.frames_dropped = 0
+        self.reconnects = 0
+        self.buffer_allocations = 0
+
+        # Metadata of the frame most recently returned by read()
+        self.last_frame_id = 0
+        self.last_timestamp = 0.0
+
+    def start(self) -> None:
+        """Start the capture thread"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._capture_loop,
+            name="neurogaze-capture",
+            daemon=True
+        )
+        self._thread.start()
+        logger.info(f"✓ Threaded capture started (ring size: {self.ring_size})")
+
+    def stop(self) -> None:
+        """Stop the capture thread and release the camera"""
+        self._running = False
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+        if self.cap is not None:
+            self.cap.release()
+
+    def _next_write_slot(self) -> int:
+        """Pick a slot that is neither the published frame nor held by the reader"""
+        for offset in range(1, self.ring_size + 1):
+            slot = (self._latest_slot + offset) % self.ring_size
+            if slot != self._latest_slot and slot != self._reader_slot:
+                return slot
+        return 0
+
+    def _ensure_buffer(self, slot: int) -> np.ndarray:
+        """Allocate the slot buffer if missing or if camera geometry changed"""
+        buf = self._buffers[slot]
+        shape = (self.frame_height, self.frame_width, 3)
+        if buf is None or buf.shape != shape:
+            buf = np.empty(shape, dtype=np.uint8)
+            self._buffers[slot] = buf
+            self.buffer_allocations += 1
+        return buf
+
+    def _reconnect(self) -> bool:
+        """Reopen the camera using the caller-supplied open routine"""
+        logger.warning("Frame read failed - attempting camera reconnect...")
+        try:
+            self.cap.release()
+        except Exception:
+            pass
+        try:
+            self.cap = self._open_camera()
+        except RuntimeError as exc:
+            logger.error(str(exc))
+            self.error_message = str(exc)
+            return False
+        self.frame_width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.frame_height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        self.reconnects += 1
+        return True
+
+    def _capture_loop(self) -> None:
+        """Capture thread main loop"""
+        while self._running:
+            if not self.cap.grab():
+                if not self._running:
+                    break
+                if not self._reconnect():
+                    with self._cond:
+                        self.failed = True
+                        self._running = False
+                        self._cond.notify_all()
+                    break
+                continue
+
+            timestamp = time.time()
+            with self._cond:
+                slot = self._next_write_slot()
+            buf = self._ensure_buffer(slot)
+
+            ret, frame = self.cap.retrieve(buf)
+            if not ret or frame is None:
+                continue
+            if frame is not buf:
+                # Driver returned a different geometry; adopt it as the slot buffer
+                self._buffers[slot] = frame
+                self.frame_height, self.frame_width = frame.shape[:2]
+                self.buffer_allocations += 1
+
+            with self._cond:
+                self.frames_captured += 1
+                if self._frame_seq > self._consumed_seq:
+                    # Previous frame was never handed to the consumer
+                    self.frames_dropped += 1
+                self._frame_seq += 1
+                self._timestamps[slot] = timestamp
+                self._frame_ids[slot] = self._frame_seq
+                self._latest_slot = slot
+                self._cond.notify_all()
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        """
+        Get the newest frame, waiting for one newer than the last read.
+
+        Returns:
+            (success, frame) like cv2.VideoCapture.read(); the frame buffer is
+            owned by the ring and is reused after the next read() call
+        """
+        with self._cond:
+            deadline = time.time() + self.read_timeout_s
+            while self._frame_seq <= self._consumed_seq:
+                if self.failed or not self._running:
+                    return False, None
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return False, None
+                self._cond.wait(timeout=remaining)
+
+            slot = self._latest_slot
+            self._reader_slot = slot
+            self._consumed_seq = self._frame_seq
+            self.last_frame_id = self._frame_ids[slot]
+            self.last_timestamp = self._timestamps[slot]
+            self.frames_delivered += 1
+            return True, self._buffers[slot]
+
+    def clock(self) -> float:
+        """Current time on the last_timestamp clock (wall clock)"""
+        return time.time()
+
+    def get_stats(self) -> dict:
+        """Get capture statistics"""
+        with self._cond:
+            captured = self.frames_captured
+            dropped = self.frames_dropped
+            return {
+                "frames_captured": captured,
+                "frames_delivered": self.frames_delivered,
+                "frames_dropped": dropped,
+                "drop_rate": dropped / captured if captured else 0.0,
+                "reconnects": self.reconnects,
+                "buffer_allocations": self.buffer_allocations,
+                "ring_size": self.ring_size,
+                "is_running": bool(self._thread and self._thread.is_alive()),
+            }
@@ -0,0 +1,190 @@
+"""
+Local Control Channel
+Keyboard-equivalent controls for headless runs, read from stdin and/or a UNIX socket
+Each line is one command ("calibrate", "hud", "quit", ...) or a single hotkey character
+Part of NeuroGaze Elite
+"""
+
+import os
+import sys
+import queue
+import socket
+import logging
+import threading
+from pathlib import Path
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+# Command name -> key code understood by NeuroGazeElite._handle_keyboard_input
+COMMAND_KEYS = {
+    "quit": 27,
+    "exit": 27,
+    "esc": 27,
+    "calibrate": ord('c'),
+    "mode": ord('m'),
+    "heatmap": ord('h'),
+    "bluelight": ord('b'),
+    "reset": ord('r'),
+    "gestures": ord('g'),
+    "fusion": ord('f'),
+    "hud": ord(' '),
+    "space": ord(' '),
+}
+
+
+def parse_command(line: str) -> Optional[int]:
+    """
+    Map one control line to a key code.
+
+    Args:
+        line: Command name (case-insensitive) or a single hotkey character
+
+    Returns:
+        Key code, or None if the line is not a known command
+    """
+    text = line.strip()
+    if not text:
+        return None
+    key = COMMAND_KEYS.get(text.lower())
+    if key is not None:
+        return key
+    if len(text) == 1:
+        return ord(text.lower())
+    return None
+
+
+class ControlChannel:
+    """
+    Collects control commands from background reader threads.
+    The frame loop drains them with poll_keys() once per frame (non-blocking).
+    """
+
+    def __init__(self, use_stdin: bool = True, socket_path: Optional[Path] = None):
+        """
+        Initialize control channel.
+
+        Args:
+            use_stdin: Read commands from standard input
+            socket_path: Also listen on this UNIX socket path (one command per line)
+        """
+        self.use_stdin = use_stdin
+        self.socket_path = Path(socket_path) if socket_path is not None else None
+        self._keys: "queue.Queue[int]" = queue.Queue()
+        self._stop_event = threading.Event()
+        self._server: Optional[socket.socket] = None
+        self._threads: List[threading.Thread] = []
+        self.commands_received = 0
+
+    def start(self) -> None:
+        """Start reader threads"""
+        if self.use_stdin and sys.stdin is not None and not sys.stdin.closed:
+            thread = threading.Thread(target=self._stdin_loop, daemon=True, name="ControlStdin")
+            thread.start()
+            self._threads.append(thread)
+            logger.info("Control channel: reading commands from stdin")
+
+        if self.socket_path is not None:
+            if not hasattr(socket, "AF_UNIX"):
+                logger.warning("Control channel: UNIX sockets not supported on this platform")
+            else:
+                self._open_socket()
+
+    def _open_socket(self) -> None:
+        try:
+            if self.socket_path.exists():
+                self.socket_path.unlink()
+            server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            server.bind(str(self.socket_path))
+            server.listen(2)
+            server.settimeout(0.5)
+            os.chmod(self.socket_path, 0o600)
+        except OSError as exc:
+            logger.warning(f"Control channel: could not listen on {self.socket_path}: {exc}")
+            return
+
+        self._server = server
+        thread = threading.Thread(target=self._socket_loop, daemon=True, name="ControlSocket")
+        thread.start()
+        self._threads.append(thread)
+        logger.info(f"Control channel: listening on {self.socket_path}")
+
+    def _submit(self, line: str) -> bool:
+        key = parse_command(line)
+        if key is None:
+            if line.strip():
+                logger.warning(f"Control channel: unknown command '{line.strip()}'")
+            return False
+        self._keys.put(key)
+        self.commands_received += 1
+        return True
+
+    def _stdin_loop(self) -> None:
+        try:
+            for line in sys.stdin:
+                if self._stop_event.is_set():
+                    break
+                self._submit(line)
+        except (OSError, ValueError):
+            pass
+
+    def _socket_loop(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                conn, _ = self._server.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+
+            with conn:
+                conn.settimeout(0.5)
+                buffer = b""
+                while not self._stop_event.is_set():
+                    try:
+                        chunk = conn.recv(1024)
+                    except socket.timeout:
+                        continue
+                    except OSError:
+                        break
+                    if not chunk:
+                        break
+                    buffer += chunk
+                    while b"\n" in buffer:
+                        raw, buffer = buffer.split(b"\n", 1)
+                        ok = self._submit(raw.decode("utf-8", errors="replace"))
+                        try:
+                            conn.sendall(b"ok\n" if ok else b"unknown command\n")
+                        except OSError:
+                            break
+                if buffer.strip():
+                    self._submit(buffer.decode("utf-8", errors="replace"))
+
+    def poll_keys(self) -> List[int]:
+        """Return all key codes received since the last call"""
+        keys = []
+        while True:
+            try:
+                keys.append(self._keys.get_nowait())
+            except queue.Empty:
+                return keys
+
+    def stop(self) -> None:
+        """Stop reader threads and remove the socket file"""
+        self._stop_event.set()
+        if self._server is not None:
+            try:
+                self._server.close()
+            except OSError:
+                pass
+            self._server = None
+            try:
+                self.socket_path.unlink()
+            except OSError:
+                pass
+        for thread in self._threads:
+            if thread.name != "ControlStdin":
+                # stdin reader blocks in readline; it is a daemon thread
+                thread.join(timeout=1.0)
+        self._threads = []
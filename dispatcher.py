@@ -0,0 +1,284 @@
+"""
+Command Dispatcher
+Drains the CommandGatekeeper into the CommandWorkerProcess on its own schedule
+Maps gatekeeper command names to worker CommandTypes and accounts end-to-end
+latency per command: capture -> fusion -> enqueue -> dispatch -> execute
+Part of NeuroGaze Elite
+"""
+
+import time
+import logging
+from typing import Callable, Dict, Optional, Tuple
+
+from intent import CommandGatekeeper
+from profiler import StageHistogram
+from worker import CommandType, CommandWorkerProcess
+
+logger = logging.getLogger(__name__)
+
+
+# Gatekeeper command name -> (worker command type, parameters)
+# EMERGENCY_ALERT / CALL_NURSE are also sent to caregivers before queueing;
+# here they only produce a local audible alarm.
+COMMAND_ACTIONS: Dict[str, Tuple[CommandType, Dict[str, object]]] = {
+    "CLICK": (CommandType.MOUSE_CLICK, {}),
+    "DOUBLE_CLICK": (CommandType.MOUSE_DOUBLE_CLICK, {}),
+    "SCROLL_UP": (CommandType.MOUSE_SCROLL, {"direction": "up"}),
+    "SCROLL_DOWN": (CommandType.MOUSE_SCROLL, {"direction": "down"}),
+    "SCROLL_LEFT": (CommandType.MOUSE_SCROLL, {"direction": "left"}),
+    "SCROLL_RIGHT": (CommandType.MOUSE_SCROLL, {"direction": "right"}),
+    "LEFT": (CommandType.KEYBOARD, {"key": "left"}),
+    "RIGHT": (CommandType.KEYBOARD, {"key": "right"}),
+    "UP": (CommandType.KEYBOARD, {"key": "up"}),
+    "DOWN": (CommandType.KEYBOARD, {"key": "down"}),
+    "VOLUME_UP": (CommandType.KEYBOARD, {"key": "volumeup"}),
+    "VOLUME_DOWN": (CommandType.KEYBOARD, {"key": "volumedown"}),
+    "BACK": (CommandType.KEYBOARD, {"key": "browserback"}),
+    "HOME": (CommandType.KEYBOARD, {"key": "browserhome"}),
+    "PAGE_UP": (CommandType.KEYBOARD, {"key": "pageup"}),
+    "PAGE_DOWN": (CommandType.KEYBOARD, {"key": "pagedown"}),
+    "END": (CommandType.KEYBOARD, {"key": "end"}),
+    "PLAY_PAUSE": (CommandType.KEYBOARD, {"key": "playpause"}),
+    "NEXT_TRACK": (CommandType.KEYBOARD, {"key": "nexttrack"}),
+    "PREV_TRACK": (CommandType.KEYBOARD, {"key": "prevtrack"}),
+    "EMERGENCY_ALERT": (CommandType.AUDIO_BEEP, {"frequency": 2000, "duration_ms": 600}),
+    "CALL_NURSE": (CommandType.AUDIO_BEEP, {"frequency": 1500, "duration_ms": 300}),
+}
+
+# Pointer commands that take the gatekeeper entry's screen target as x/y
+POSITIONED_COMMANDS = frozenset((CommandType.MOUSE_CLICK, CommandType.MOUSE_DOUBLE_CLICK))
+
+# Commands that drive the real mouse/keyboard; held back outside live mode
+INPUT_COMMANDS = frozenset((
+    CommandType.MOUSE_MOVE,
+    CommandType.MOUSE_CLICK,
+    CommandType.MOUSE_DOUBLE_CLICK,
+    CommandType.MOUSE_SCROLL,
+    CommandType.KEYBOARD,
+))
+
+# Worker command name of cursor moves sent by move_cursor
+MOVE_NAME = "CURSOR"
+
+# Latency segments: (name, start timestamp key, end timestamp key)
+LATENCY_SEGMENTS = (
+    ("capture_to_fusion", "capture", "fusion"),
+    ("fusion_to_enqueue", "fusion", "enqueue"),
+    ("queue_wait", "enqueue", "dispatch"),
+    ("dispatch_to_execute", "dispatch", "execute"),
+    ("intent_to_action", "capture", "execute"),
+)
+
+
+class CommandDispatcher:
+    """
+    Moves accepted commands from the gatekeeper to the worker process.
+
+    Usage (once per scheduled tick in the frame loop):
+        dispatcher.dispatch(live=app.live_mode)   # send pending commands, collect completions
+
+    Cursor moves bypass the gatekeeper (move_cursor, once per tracked frame);
+    their completions are timed separately and, like every executed command,
+    feed the latency observer.
+
+    Outside live mode, mouse/keyboard commands are drained and counted as
+    suppressed instead of sent; alarms still go to the worker.
+    """
+
+    def __init__(
+        self,
+        gatekeeper: CommandGatekeeper,
+        worker: Optional[CommandWorkerProcess],
+        max_per_tick: int = 3,
+        latency_observer: Optional[Callable[[float], None]] = None
+    ):
+        """
+        Initialize dispatcher.
+
+        Args:
+            gatekeeper: Source queue
+            worker: Command worker (None = drain and account only)
+            max_per_tick: Commands sent per dispatch() call; critical commands
+                          come out of the gatekeeper first, so they are never held back
+            latency_observer: Called with fusion -> execute latency in seconds for
+                              every executed command, cursor moves included
+                              (e.g. KalmanGaze.observe_downstream_latency)
+        """
+        self.gatekeeper = gatekeeper
+        self.worker = worker
+        self.max_per_tick = max(1, max_per_tick)
+        self.latency_observer = latency_observer
+
+        self.histograms: Dict[str, StageHistogram] = {
+            name: StageHistogram() for name, _, _ in LATENCY_SEGMENTS
+        }
+        self.move_histogram = StageHistogram()  # Cursor moves, capture -> execute
+        self._next_id = 0
+        self.dispatched = 0
+        self.unmapped = 0
+        self.send_failed = 0
+        self.completed = 0
+        self.execute_failed = 0
+        self.suppressed = 0
+        self.moves_sent = 0
+        self.moves_completed = 0
+
+    def dispatch(self, live: bool = True) -> int:
+        """
+        Send up to max_per_tick pending commands and collect completion reports.
+
+        Args:
+            live: Live mode; False drops mouse/keyboard commands (counted as suppressed)
+
+        Returns:
+            Number of commands sent to the worker
+        """
+        sent = 0
+        while sent < self.max_per_tick:
+            entry = self.gatekeeper.get_next_entry()
+            if entry is None:
+                break
+            name, timestamps, position = entry
+
+            action = COMMAND_ACTIONS.get(name)
+            if action is None:
+                self.unmapped += 1
+                logger.debug(f"Dispatcher: no worker action for {name}")
+                continue
+            command_type, params = action
+            if not live and command_type in INPUT_COMMANDS:
+                self.suppressed += 1
+                continue
+            if position is not None and command_type in POSITIONED_COMMANDS:
+                params = dict(params, x=int(round(position[0])), y=int(round(position[1])))
+
+            timestamps["dispatch"] = time.time()
+            if self.worker is None:
+                self._record(timestamps)
+                sent += 1
+                continue
+
+            ok = self.worker.queue_command(
+                command_type,
+                command_id=self._next_id,
+                name=name,
+                timestamps=timestamps,
+                **params
+            )
+            self._next_id += 1
+            if ok:
+                sent += 1
+            else:
+                self.send_failed += 1
+
+        self.dispatched += sent
+        self.collect_results()
+        return sent
+
+    def move_cursor(
+        self,
+        position: Tuple[float, float],
+        capture_ts: Optional[float] = None,
+        predict_ts: Optional[float] = None,
+        live: bool = True
+    ) -> bool:
+        """
+        Send a cursor move straight to the worker (no gatekeeper, no cooldown).
+
+        Args:
+            position: Target in screen pixels (e.g. KalmanGaze.predict_position)
+            capture_ts: Capture time of the frame the position comes from (time.time() clock)
+            predict_ts: Time the position was predicted (time.time() clock); the
+                        move's "fusion" stamp for the latency observer
+            live: Live mode; False sends nothing
+
+        Returns:
+            True if the move was queued
+        """
+        if not live or self.worker is None:
+            return False
+        now = time.time()
+        timestamps = {"fusion": predict_ts if predict_ts is not None else now, "dispatch": now}
+        if capture_ts is not None:
+            timestamps["capture"] = capture_ts
+        ok = self.worker.queue_command(
+            CommandType.MOUSE_MOVE,
+            name=MOVE_NAME,
+            x=int(round(position[0])),
+            y=int(round(position[1])),
+            timestamps=timestamps
+        )
+        if ok:
+            self.moves_sent += 1
+        else:
+            self.send_failed += 1
+        return ok
+
+    def collect_results(self) -> None:
+        """Record latency for commands the worker has finished"""
+        if self.worker is None:
+            return
+        for result in self.worker.poll_results():
+            timestamps = result.get("timestamps") or {}
+            if result.get("name") == MOVE_NAME:
+                self.moves_completed += 1
+                self._record_move(timestamps)
+                continue
+            self.completed += 1
+            if not result.get("success", False):
+                self.execute_failed += 1
+            self._record(timestamps)
+
+    def _record_move(self, timestamps: Dict[str, float]) -> None:
+        start = timestamps.get("capture")
+        end = timestamps.get("execute")
+        if start is not None and end is not None and end >= start:
+            self.move_histogram.record(int((end - start) * 1e9))
+        self._observe(timestamps)
+
+    def _record(self, timestamps: Dict[str, float]) -> None:
+        for name, start_key, end_key in LATENCY_SEGMENTS:
+            start = timestamps.get(start_key)
+            end = timestamps.get(end_key)
+            if start is not None and end is not None and end >= start:
+                self.histograms[name].record(int((end - start) * 1e9))
+        self._observe(timestamps)
+
+    def _observe(self, timestamps: Dict[str, float]) -> None:
+        if self.latency_observer is not None and "fusion" in timestamps and "execute" in timestamps:
+            self.latency_observer(timestamps["execute"] - timestamps["fusion"])
+
+    def get_stats(self) -> Dict[str, object]:
+        """Dispatch counters and per-segment latency (ms)"""
+        latency = {}
+        for name, hist in (*self.histograms.items(), ("cursor_move", self.move_histogram)):
+            if hist.total == 0:
+                continue
+            latency[name] = {
+                "p50": round(hist.percentile_ns(50) / 1e6, 3),
+                "p95": round(hist.percentile_ns(95) / 1e6, 3),
+                "p99": round(hist.percentile_ns(99) / 1e6, 3),
+                "mean": round(hist.mean_ns() / 1e6, 3),
+                "count": hist.total,
+            }
+        return {
+            "dispatched": self.dispatched,
+            "completed": self.completed,
+            "unmapped": self.unmapped,
+            "suppressed": self.suppressed,
+            "send_failed": self.send_failed,
+            "execute_failed": self.execute_failed,
+            "moves_sent": self.moves_sent,
+            "moves_completed": self.moves_completed,
+            "latency_ms": latency,
+        }
+
+    def format_summary(self) -> str:
+        """One-line summary for periodic logging"""
+        hist = self.histograms["intent_to_action"]
+        if hist.total == 0:
+            return f"commands: {self.dispatched} dispatched, no completions yet"
+        return (
+            f"commands: {self.dispatched} dispatched | intent->action ms p50/p95 "
+            f"{hist.percentile_ns(50) / 1e6:.1f}/{hist.percentile_ns(95) / 1e6:.1f}"
+        )
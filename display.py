@@ -0,0 +1,279 @@
+"""
+Threaded HUD Display
+Renders the HUD and shows the preview window on a dedicated thread
+The frame loop hands over a per-frame render snapshot through a depth-1
+latest-wins slot, so imshow/waitKey never sit between processing and the
+next capture; key presses come back through a thread-safe queue
+Part of NeuroGaze Elite
+"""
+
+import queue
+import time
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from hud import HUDRenderer
+from hand_hud import GestureHUDRenderer, GestureDisplayInfo
+from profiler import StageProfiler
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RenderState:
+    """Everything the HUD needs for one frame (owned by the display once submitted)"""
+    frame: np.ndarray
+    gaze_position: Optional[Tuple[float, float]] = None
+    gaze_velocity: Optional[Tuple[float, float]] = None
+    intent_confidence: Optional[float] = None
+    strain_metrics: Optional[dict] = None
+    fps: Optional[float] = None
+    backend_info: Optional[dict] = None
+    mode_info: Optional[str] = None
+    stage_timings: Optional[dict] = None
+    face_detected: bool = True
+    gesture_info: Optional[GestureDisplayInfo] = None
+    hand_landmarks: Optional[np.ndarray] = None  # (21, >=2) normalized x, y
+    fusion_mode: str = ""
+    gesture_diagnostics: Optional[dict] = None
+    # Gaze samples (x, y, timestamp) for the heatmap; samples of snapshots that
+    # were replaced before rendering are carried over, so none are lost
+    gaze_samples: List[Tuple[float, float, float]] = field(default_factory=list)
+
+
+class HUDDisplay:
+    """
+    HUD rendering + preview window, on a background thread or inline.
+
+    Usage (once per frame in the frame loop):
+        display.submit(state)           # never blocks on rendering or the window
+        for key in display.poll_keys():
+            handle(key)                 # hold display.lock while changing HUD state
+
+    Only the newest snapshot is rendered: if the display falls behind, older
+    snapshots are replaced (and counted as dropped), so tracking latency does
+    not depend on the display refresh. All HighGUI calls happen on the display
+    thread; inline mode (threaded=False) renders and shows inside submit().
+
+    A frame that fails to render is logged and skipped (render_errors). If the
+    display thread dies anyway, alive turns False; the caller can then switch
+    to inline mode with fall_back_inline().
+    """
+
+    def __init__(
+        self,
+        hud_renderer: HUDRenderer,
+        gesture_hud: GestureHUDRenderer,
+        window_name: str = "NeuroGaze Elite",
+        show_window: bool = True,
+        threaded: bool = True
+    ):
+        """
+        Initialize display.
+
+        Args:
+            hud_renderer: Main HUD renderer
+            gesture_hud: Hand gesture overlay renderer
+            window_name: Preview window title
+            show_window: Show the preview window and read keys via cv2.waitKey
+            threaded: Render and display on a dedicated thread
+        """
+        self.hud_renderer = hud_renderer
+        self.gesture_hud = gesture_hud
+        self.window_name = window_name
+        self.show_window = show_window
+        self.threaded = threaded
+
+        # Held while rendering; callers changing renderer state (mode, heatmap
+        # reset, ...) from another thread take it too
+        self.lock = threading.Lock()
+
+        self._cond = threading.Condition()
+        self._pending: Optional[RenderState] = None
+        self._keys: "queue.Queue[int]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+        # Render/display timing, recorded on the display thread
+        self.profiler = StageProfiler(trace_frames=0)
+
+        # Stats
+        self.frames_submitted = 0
+        self.frames_rendered = 0
+        self.frames_dropped = 0
+        self.render_errors = 0
+
+    def start(self) -> None:
+        """Start the display thread (no-op in inline mode)"""
+        if not self.threaded or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._display_loop,
+            name="neurogaze-display",
+            daemon=True
+        )
+        self._thread.start()
+        logger.info("✓ Display thread started")
+
+    @property
+    def alive(self) -> bool:
+        """False once a started display thread has died (always True inline)"""
+        if not self.threaded:
+            return True
+        return self._thread is not None and self._thread.is_alive()
+
+    def fall_back_inline(self) -> None:
+        """Render and show inside submit() from now on (e.g. after the thread died)"""
+        logger.warning("Display thread not running - rendering inline")
+        self._running = False
+        self._thread = None
+        self.threaded = False
+        with self._cond:
+            self._pending = None
+
+    def stop(self) -> None:
+        """Stop the display thread and close the preview window"""
+        self._running = False
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+        elif self.show_window:
+            cv2.destroyAllWindows()
+
+    def submit(self, state: RenderState) -> None:
+        """
+        Hand over a render snapshot; replaces one that was not rendered yet.
+
+        Args:
+            state: Snapshot for this frame; the caller must not modify its
+                   frame or containers afterwards
+        """
+        self.frames_submitted += 1
+        if not self.threaded:
+            try:
+                self._present(state)
+            except Exception as e:
+                self._render_failed(e)
+            return
+
+        with self._cond:
+            if self._pending is not None:
+                state.gaze_samples = self._pending.gaze_samples + state.gaze_samples
+                self.frames_dropped += 1
+            self._pending = state
+            self._cond.notify()
+
+    def poll_keys(self) -> List[int]:
+        """Return all key codes pressed in the preview window since the last call"""
+        keys = []
+        while True:
+            try:
+                keys.append(self._keys.get_nowait())
+            except queue.Empty:
+                return keys
+
+    def _display_loop(self) -> None:
+        """Display thread main loop"""
+        while self._running:
+            with self._cond:
+                if self._pending is None and self._running:
+                    # Wake up regularly so the window stays responsive
+                    self._cond.wait(timeout=0.05)
+                state = self._pending
+                self._pending = None
+
+            try:
+                if state is not None:
+                    self._present(state)
+                elif self.show_window:
+                    self._poll_window()
+            except Exception as e:
+                self._render_failed(e)
+
+        if self.show_window:
+            cv2.destroyAllWindows()
+
+    def _present(self, state: RenderState) -> None:
+        """Render one snapshot and show it"""
+        start_ns = time.perf_counter_ns()
+        with self.lock:
+            display_frame = self._render(state)
+        self.profiler.record("hud", start_ns, time.perf_counter_ns())
+        self.frames_rendered += 1
+
+        if self.show_window:
+            with self.profiler.stage("display"):
+                cv2.imshow(self.window_name, display_frame)
+                self._poll_window()
+
+    def _render_failed(self, error: Exception) -> None:
+        """Log a failed frame (with traceback the first time) and keep going"""
+        self.render_errors += 1
+        if self.render_errors == 1:
+            logger.exception(f"HUD frame failed: {error}")
+        else:
+            logger.error(f"HUD frame failed ({self.render_errors} so far): {error}")
+
+    def _poll_window(self) -> None:
+        key = cv2.waitKey(1) & 0xFF
+        if key != 255:
+            self._keys.put(key)
+
+    def _render(self, state: RenderState) -> np.ndarray:
+        """Draw the HUD and gesture overlay for one snapshot"""
+        display_frame = self.hud_renderer.render_frame(
+            state.frame,
+            gaze_position=state.gaze_position,
+            gaze_velocity=state.gaze_velocity,
+            intent_confidence=state.intent_confidence,
+            strain_metrics=state.strain_metrics,
+            fps=state.fps,
+            backend_info=state.backend_info,
+            mode_info=state.mode_info,
+            stage_timings=state.stage_timings,
+            gaze_samples=state.gaze_samples
+        )
+
+        if not state.face_detected:
+            cv2.putText(
+                display_frame,
+                "No face detected - look at camera",
+                (20, 50),
+                cv2.FONT_HERSHEY_SIMPLEX,
+                0.7,
+                (0, 255, 255),
+                2,
+            )
+
+        if state.gesture_info is not None and state.hand_landmarks is not None:
+            display_frame = self.gesture_hud.render_hand_overlay(
+                frame=display_frame,
+                hand_landmarks=state.hand_landmarks,
+                gesture_info=state.gesture_info,
+                fusion_mode=state.fusion_mode,
+                diagnostics=state.gesture_diagnostics
+            )
+
+        return display_frame
+
+    def get_stage_stats(self) -> Dict[str, Dict[str, float]]:
+        """Render ("hud") and window ("display") latency in StageProfiler format"""
+        return self.profiler.get_stage_stats()
+
+    def get_stats(self) -> Dict[str, object]:
+        """Display counters"""
+        return {
+            "threaded": self.threaded,
+            "frames_submitted": self.frames_submitted,
+            "frames_rendered": self.frames_rendered,
+            "frames_dropped": self.frames_dropped,
+            "render_errors": self.render_errors,
+        }
@@ -138,7 +138,8 @@ class GazeFusionEngine:
         intent_score: Optional[IntentScore],
         gesture_result: Optional[GestureResult],
         screen_width: int = 1280,
-        screen_height: int = 720
+        screen_height: int = 720,
+        timestamp: Optional[float] = None
     ) -> FusionResult:
         """
         Fuse eye intent and hand gesture into a final command decision.
@@ -148,12 +149,13 @@ class GazeFusionEngine:
             gesture_result: Hand gesture from hand_engine.py (can be None)
             screen_width: Screen width in pixels
             screen_height: Screen height in pixels
+            timestamp: Decision time in seconds on the frame clock (time.time() if None)
             
         Returns:
             FusionResult with command decision and confidence
         """
         with self._lock:
-            current_time = time.time() * 1000  # ms
+            current_time = (time.time() if timestamp is None else timestamp) * 1000  # ms
             
             # Update buffers
             if intent_score:
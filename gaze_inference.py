@@ -16,6 +16,7 @@ import os
 import time
 import hashlib
 import logging
+import threading
 import numpy as np
 from pathlib import Path
 from typing import Optional, Tuple, Dict, Any
@@ -50,6 +51,10 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Input normalization used by prep_data.py / train_gaze.py (RGB order)
+IMAGENET_MEAN = np.array([0.485, 0.456, 0.406], dtype=np.float32)
+IMAGENET_STD = np.array([0.229, 0.224, 0.225], dtype=np.float32)
+
 
 @dataclass
 class GazeInferenceResult:
@@ -71,6 +76,7 @@ class CrossValidationResult:
     agreement_threshold_px: float  # Threshold for "agreement" (default 15px)
     is_confident: bool  # True if models agree within threshold
     consensus_point: Tuple[float, float]  # Blended output (weighted by confidence)
+    dl_result_age_ms: float = 0.0  # Age of the DL result relative to the MediaPipe frame
 
 
 class DLInferenceEngine:
@@ -79,12 +85,18 @@ class DLInferenceEngine:
     Loads ONNX models and provides cross-validation against MediaPipe.
     """
 
+    INPUT_SIZE = 224  # Square face crop fed to ONNX models without a fixed input shape
+    L2CS_INPUT_SIZE = 448  # L2CS reference preprocessing (transforms.Resize(448)), gaze360 training size
+    CROP_MARGIN = 0.15  # Margin around the landmark box (matches prep_data.crop_face)
+
     def __init__(
         self,
         model_name: str = "l2cs-net-gaze360",
         model_path: Optional[Path] = None,
         agreement_threshold_px: float = 15.0,
-        enable_gpu: bool = True
+        enable_gpu: bool = True,
+        async_mode: bool = False,
+        max_result_age_ms: float = 500.0
     ):
         """
         Initialize DL inference engine.
@@ -94,6 +106,8 @@ class DLInferenceEngine:
             model_path: Path to ONNX model file (auto-discovers if None)
             agreement_threshold_px: Pixel distance threshold for MediaPipe agreement
             enable_gpu: Use CUDA ExecutionProvider if available
+            async_mode: Run inference on a background worker thread (see submit_async)
+            max_result_age_ms: Async results older than this are ignored by cross_validate
         """
         self.model_name = model_name
         self.agreement_threshold_px = agreement_threshold_px
@@ -102,6 +116,26 @@ class DLInferenceEngine:
         self.model_loaded = False
         self.inference_times = []
         self.max_buffer_size = 100
+        self._crop_buffer: Optional[np.ndarray] = None
+        self._input_tensor: Optional[np.ndarray] = None
+        # Square network input size; set by the loaded backend
+        self.input_size = self.INPUT_SIZE
+
+        # Async worker state (single pending slot, newest frame wins)
+        self.async_mode = async_mode
+        self.max_result_age_ms = max_result_age_ms
+        self._async_cond = threading.Condition()
+        self._async_thread: Optional[threading.Thread] = None
+        self._async_running = False
+        self._pending_frame: Optional[np.ndarray] = None
+        self._pending_pose: Tuple[float, float, float] = (0.0, 0.0, 0.0)
+        self._pending_timestamp = 0.0
+        self._has_pending = False
+        self._latest_result: Optional[GazeInferenceResult] = None
+        self._latest_result_timestamp = 0.0
+        self.async_frames_submitted = 0
+        self.async_frames_dropped = 0
+        self.async_frames_inferred = 0
         
         # Prefer L2CS pipeline (official PyTorch weights)
         if L2CS_AVAILABLE and TORCH_AVAILABLE:
@@ -112,6 +146,9 @@ class DLInferenceEngine:
         else:
             logger.warning("No L2CS or ONNX backend available - DL inference disabled")
 
+        if self.async_mode and self.model_loaded:
+            self.start_async_worker()
+
     def _get_default_model_path(self) -> Optional[Path]:
         """
         Search for model in standard locations:
@@ -211,6 +248,12 @@ class DLInferenceEngine:
             self.output_names = [output.name for output in self.session.get_outputs()]
             logger.info(f"✓ Model I/O: input={self.input_name}, outputs={self.output_names}")
             
+            # Use the model's declared NCHW input size (dynamic dims keep the default)
+            input_shape = self.session.get_inputs()[0].shape
+            if len(input_shape) == 4 and isinstance(input_shape[2], int) and input_shape[2] > 0:
+                self.input_size = int(input_shape[2])
+            logger.info(f"✓ Model input size: {self.input_size}x{self.input_size}")
+            
             self.model_loaded = True
             logger.info(f"✓ DL Model '{self.model_name}' loaded successfully")
             
@@ -227,28 +270,139 @@ class DLInferenceEngine:
         try:
             weights_path = Path.home() / ".neurogaze" / "models" / "L2CSNet_gaze360.pkl"
             device = torch.device("cuda" if self.enable_gpu and torch.cuda.is_available() else "cpu")
+            # Faces come from the MediaPipe landmarks, so skip the built-in RetinaFace detector
             self.pipeline = L2CSPipeline(
                 weights=weights_path,
                 arch="ResNet50",
                 device=device,
+                include_detector=False,
             )
+            self.torch_device = device
+            self.input_size = self.L2CS_INPUT_SIZE
+            self.l2cs_softmax = torch.nn.Softmax(dim=1)
+            self.l2cs_idx_tensor = torch.arange(90, dtype=torch.float32, device=device)
             self.model_loaded = True
-            logger.info("✓ L2CS pipeline loaded successfully")
+            logger.info("✓ L2CS pipeline loaded successfully (landmark face crops, no detector)")
         except Exception as exc:
             logger.error(f"Failed to load L2CS pipeline: {exc}")
             self.model_loaded = False
 
+    @staticmethod
+    def face_bbox_from_landmarks(
+        face_landmarks,
+        frame_width: int,
+        frame_height: int
+    ) -> Tuple[int, int, int, int]:
+        """
+        Compute a pixel bounding box from MediaPipe normalized face landmarks.
+
+        Args:
+            face_landmarks: Sequence of landmarks with .x/.y in [0, 1]
+            frame_width: Frame width in pixels
+            frame_height: Frame height in pixels
+
+        Returns:
+            (x1, y1, x2, y2) in pixels
+        """
+        xs = [lm.x for lm in face_landmarks]
+        ys = [lm.y for lm in face_landmarks]
+        return (
+            int(min(xs) * frame_width),
+            int(min(ys) * frame_height),
+            int(max(xs) * frame_width),
+            int(max(ys) * frame_height),
+        )
+
+    def crop_face(
+        self,
+        frame: np.ndarray,
+        face_bbox: Tuple[int, int, int, int]
+    ) -> Optional[np.ndarray]:
+        """
+        Crop the face from a full BGR frame and resize it once to the model input size.
+        Uses the same 15% margin as prep_data.crop_face so inputs match training.
+
+        Args:
+            frame: Full BGR camera frame
+            face_bbox: (x1, y1, x2, y2) pixel box, e.g. from face_bbox_from_landmarks
+
+        Returns:
+            BGR crop of shape (input_size, input_size, 3), or None if the box is empty.
+            The array is an internal buffer reused by the next crop_face call.
+        """
+        h, w = frame.shape[:2]
+        x1, y1, x2, y2 = face_bbox
+        dx = int((x2 - x1) * self.CROP_MARGIN)
+        dy = int((y2 - y1) * self.CROP_MARGIN)
+        x1 = max(0, x1 - dx)
+        y1 = max(0, y1 - dy)
+        x2 = min(w, x2 + dx)
+        y2 = min(h, y2 + dy)
+        if x2 - x1 < 2 or y2 - y1 < 2:
+            return None
+
+        size = self.input_size
+        if self._crop_buffer is None or self._crop_buffer.shape[:2] != (size, size) \
+                or self._crop_buffer.shape[2:] != frame.shape[2:]:
+            self._crop_buffer = np.empty((size, size) + frame.shape[2:], dtype=frame.dtype)
+        if CV2_AVAILABLE:
+            cv2.resize(frame[y1:y2, x1:x2], (size, size), dst=self._crop_buffer)
+        else:
+            rows = (np.arange(size) * (y2 - y1) // size) + y1
+            cols = (np.arange(size) * (x2 - x1) // size) + x1
+            self._crop_buffer[...] = frame[rows[:, None], cols[None, :]]
+        return self._crop_buffer
+
+    def _prepare_input(self, face_crop: np.ndarray) -> np.ndarray:
+        """
+        Convert a BGR face crop into a normalized NCHW float32 tensor.
+        The BGR->RGB swap is folded into the normalization, so no cvtColor pass is needed.
+        """
+        size = self.input_size
+        if face_crop.ndim == 2:
+            face_crop = np.repeat(face_crop[:, :, None], 3, axis=2)
+        if face_crop.shape[:2] != (size, size):
+            if CV2_AVAILABLE:
+                face_crop = cv2.resize(face_crop, (size, size))
+            else:
+                rows = np.arange(size) * face_crop.shape[0] // size
+                cols = np.arange(size) * face_crop.shape[1] // size
+                face_crop = face_crop[rows[:, None], cols[None, :]]
+
+        if self._input_tensor is None or self._input_tensor.shape[2] != size:
+            self._input_tensor = np.empty((1, 3, size, size), dtype=np.float32)
+        scale = 255.0 if face_crop.dtype == np.uint8 else 1.0
+        for c in range(3):
+            # Output channel c is RGB order; BGR source channel is 2 - c
+            np.multiply(face_crop[:, :, 2 - c], 1.0 / (scale * IMAGENET_STD[c]), out=self._input_tensor[0, c])
+            self._input_tensor[0, c] -= IMAGENET_MEAN[c] / IMAGENET_STD[c]
+        return self._input_tensor
+
+    def _predict_l2cs(self, input_tensor: np.ndarray) -> Tuple[float, float]:
+        """Run the L2CS network directly on a prepared tensor; returns (pitch, yaw) in radians"""
+        with torch.no_grad():
+            img = torch.from_numpy(input_tensor).to(self.torch_device)
+            gaze_pitch, gaze_yaw = self.pipeline.model(img)
+            pitch = torch.sum(self.l2cs_softmax(gaze_pitch) * self.l2cs_idx_tensor, dim=1) * 4 - 180
+            yaw = torch.sum(self.l2cs_softmax(gaze_yaw) * self.l2cs_idx_tensor, dim=1) * 4 - 180
+        return (
+            float(pitch[0].item()) * np.pi / 180.0,
+            float(yaw[0].item()) * np.pi / 180.0,
+        )
+
     def infer(
         self,
         face_frame: np.ndarray,
-        head_pose_euler: Tuple[float, float, float]
+        head_pose_euler: Tuple[float, float, float],
+        face_bbox: Optional[Tuple[int, int, int, int]] = None
     ) -> Optional[GazeInferenceResult]:
         """
         Run inference on a face frame.
 
         Args:
-            face_frame: Face crop (224x224 or model-specific size)
+            face_frame: BGR face crop (input_size square), or the full BGR frame if face_bbox is given
             head_pose_euler: Head pose (pitch, yaw, roll) in radians
+            face_bbox: Optional (x1, y1, x2, y2) landmark face box in face_frame pixels
 
         Returns:
             GazeInferenceResult if model loaded, else None
@@ -259,21 +413,16 @@ class DLInferenceEngine:
         try:
             start_time = time.time()
 
-            # L2CS pipeline inference (preferred path)
-            if L2CS_AVAILABLE and TORCH_AVAILABLE and hasattr(self, "pipeline"):
-                # L2CS expects RGB image; pipeline handles resizing internally
-                if face_frame.ndim == 2:
-                    if CV2_AVAILABLE:
-                        face_frame = cv2.cvtColor(face_frame, cv2.COLOR_GRAY2RGB)
-                    else:
-                        face_frame = np.stack([face_frame] * 3, axis=-1)
-
-                if CV2_AVAILABLE:
-                    face_rgb = cv2.cvtColor(face_frame, cv2.COLOR_BGR2RGB)
-                else:
-                    face_rgb = face_frame
+            if face_bbox is not None:
+                face_frame = self.crop_face(face_frame, face_bbox)
+                if face_frame is None:
+                    return None
+
+            input_tensor = self._prepare_input(face_frame)
 
-                yaw, pitch = self.pipeline.step(face_rgb)
+            # L2CS network inference (preferred path)
+            if L2CS_AVAILABLE and TORCH_AVAILABLE and hasattr(self, "pipeline"):
+                pitch, yaw = self._predict_l2cs(input_tensor)
                 # Convert yaw/pitch to gaze vector and normalized screen point
                 gaze_3d = np.array([np.sin(yaw), -np.sin(pitch), np.cos(pitch) * np.cos(yaw)])
                 gaze_2d = (0.5 + yaw / np.pi, 0.5 - pitch / (np.pi / 2))
@@ -283,33 +432,7 @@ class DLInferenceEngine:
                 if self.session is None:
                     return None
 
-                # Preprocess: normalize to [0, 1] and reshape
-                if face_frame.dtype != np.float32:
-                    face_frame = face_frame.astype(np.float32) / 255.0
-
-                # Ensure shape matches model expectation (typically [1, 3, 224, 224])
-                if face_frame.ndim == 2:
-                    face_frame = cv2.cvtColor(face_frame, cv2.COLOR_GRAY2BGR) if CV2_AVAILABLE else np.stack([face_frame] * 3, axis=-1)
-
-                if face_frame.shape != (224, 224, 3):
-                    if CV2_AVAILABLE:
-                        face_frame = cv2.resize(face_frame, (224, 224))
-                    else:
-                        face_frame = np.array([[face_frame[int(i * face_frame.shape[0] / 224)][int(j * face_frame.shape[1] / 224)]
-                                               for j in range(224)] for i in range(224)])
-
-                if face_frame.ndim == 3:
-                    face_frame = np.transpose(face_frame, (2, 0, 1))
-
-                face_frame = np.expand_dims(face_frame, 0)
-                input_data = {self.input_name: face_frame}
-                outputs = self.session.run(self.output_names, input_data)
-
-            inference_time_ms = (time.time() - start_time) * 1000.0
-            self.inference_times.append(inference_time_ms)
-            if len(self.inference_times) > self.max_buffer_size:
-                self.inference_times.pop(0)
-
+                outputs = self.session.run(self.output_names, {self.input_name: input_tensor})
                 gaze_output = outputs[0]
                 if gaze_output.shape[-1] == 2:
                     pitch, yaw = gaze_output[0, :2]
@@ -325,6 +448,11 @@ class DLInferenceEngine:
                     confidence = float(outputs[1][0]) if outputs[1].shape[0] > 0 else 0.8
                 confidence = np.clip(confidence, 0.0, 1.0)
 
+            inference_time_ms = (time.time() - start_time) * 1000.0
+            self.inference_times.append(inference_time_ms)
+            if len(self.inference_times) > self.max_buffer_size:
+                self.inference_times.pop(0)
+
             return GazeInferenceResult(
                 gaze_point_3d=tuple(gaze_3d),
                 gaze_point_2d=gaze_2d,
@@ -338,12 +466,123 @@ class DLInferenceEngine:
             logger.error(f"Inference failed: {e}")
             return None
 
+    def start_async_worker(self) -> None:
+        """Start the background inference thread used in async mode"""
+        if self._async_thread is not None and self._async_thread.is_alive():
+            return
+        self._async_running = True
+        self._async_thread = threading.Thread(
+            target=self._async_loop,
+            name="neurogaze-dl-inference",
+            daemon=True
+        )
+        self._async_thread.start()
+        logger.info("✓ Async DL inference worker started")
+
+    def stop_async_worker(self) -> None:
+        """Stop the background inference thread"""
+        with self._async_cond:
+            self._async_running = False
+            self._async_cond.notify_all()
+        if self._async_thread is not None:
+            self._async_thread.join(timeout=2.0)
+            self._async_thread = None
+
+    def submit_async(
+        self,
+        face_frame: np.ndarray,
+        head_pose_euler: Tuple[float, float, float],
+        timestamp: Optional[float] = None
+    ) -> bool:
+        """
+        Hand a frame to the async worker without blocking.
+
+        Only the newest submitted frame is kept; a frame still waiting when a
+        newer one arrives is dropped. The frame is copied into a buffer owned
+        by the engine, so callers may reuse their array immediately.
+
+        Args:
+            face_frame: Face crop (same format as infer)
+            head_pose_euler: Head pose (pitch, yaw, roll) in radians
+            timestamp: Capture time of the frame (time.time() if None)
+
+        Returns:
+            True if the frame was accepted
+        """
+        if not self.model_loaded or not self._async_running:
+            return False
+
+        with self._async_cond:
+            if self._has_pending:
+                self.async_frames_dropped += 1
+            if self._pending_frame is None or self._pending_frame.shape != face_frame.shape \
+                    or self._pending_frame.dtype != face_frame.dtype:
+                self._pending_frame = np.empty_like(face_frame)
+            np.copyto(self._pending_frame, face_frame)
+            self._pending_pose = head_pose_euler
+            self._pending_timestamp = timestamp if timestamp is not None else time.time()
+            self._has_pending = True
+            self.async_frames_submitted += 1
+            self._async_cond.notify()
+        return True
+
+    def _async_loop(self) -> None:
+        """Worker thread: run inference on the newest pending frame"""
+        work_frame: Optional[np.ndarray] = None
+        while True:
+            with self._async_cond:
+                while self._async_running and not self._has_pending:
+                    self._async_cond.wait()
+                if not self._async_running:
+                    break
+                # Swap buffers so the producer can keep writing while we infer
+                work_frame, self._pending_frame = self._pending_frame, work_frame
+                pose = self._pending_pose
+                frame_timestamp = self._pending_timestamp
+                self._has_pending = False
+
+            result = self.infer(work_frame, head_pose_euler=pose)
+
+            with self._async_cond:
+                self.async_frames_inferred += 1
+                if result is not None:
+                    self._latest_result = result
+                    self._latest_result_timestamp = frame_timestamp
+
+    def get_latest_result(
+        self,
+        reference_time: Optional[float] = None
+    ) -> Tuple[Optional[GazeInferenceResult], float]:
+        """
+        Get the most recent finished async result and its age.
+
+        Args:
+            reference_time: Timestamp to measure age against (time.time() if None),
+                            normally the capture time of the current frame
+
+        Returns:
+            (result, age_ms); result is None if nothing has finished yet
+        """
+        with self._async_cond:
+            result = self._latest_result
+            result_timestamp = self._latest_result_timestamp
+        if result is None:
+            return None, 0.0
+        now = reference_time if reference_time is not None else time.time()
+        return result, max(0.0, (now - result_timestamp) * 1000.0)
+
+    def get_result_age_ms(self) -> float:
+        """Age of the latest async result in milliseconds (-1 if none yet)"""
+        result, age_ms = self.get_latest_result()
+        return age_ms if result is not None else -1.0
+
     def cross_validate(
         self,
         dl_result: Optional[GazeInferenceResult],
         mediapipe_point: Tuple[float, float],
         screen_width: int = 1280,
-        screen_height: int = 720
+        screen_height: int = 720,
+        dl_result_age_ms: float = 0.0
     ) -> CrossValidationResult:
         """
         Cross-validate DL inference against MediaPipe.
@@ -353,10 +592,16 @@ class DLInferenceEngine:
             mediapipe_point: MediaPipe gaze point (pixel coordinates)
             screen_width: Screen width in pixels
             screen_height: Screen height in pixels
+            dl_result_age_ms: How old dl_result is relative to mediapipe_point;
+                              results older than max_result_age_ms are ignored
 
         Returns:
             CrossValidationResult with agreement assessment
         """
+        if dl_result is not None and dl_result_age_ms > self.max_result_age_ms:
+            # Stale async result - the eyes have moved on since that frame
+            dl_result = None
+
         if dl_result is None:
             # DL model not available - trust MediaPipe
             return CrossValidationResult(
@@ -365,7 +610,8 @@ class DLInferenceEngine:
                 agreement_pixels=0.0,
                 agreement_threshold_px=self.agreement_threshold_px,
                 is_confident=True,
-                consensus_point=mediapipe_point
+                consensus_point=mediapipe_point,
+                dl_result_age_ms=dl_result_age_ms
             )
 
         # Convert DL 2D output to pixel coordinates
@@ -400,7 +646,8 @@ class DLInferenceEngine:
             agreement_pixels=agreement_pixels,
             agreement_threshold_px=self.agreement_threshold_px,
             is_confident=is_confident,
-            consensus_point=(consensus_x, consensus_y)
+            consensus_point=(consensus_x, consensus_y),
+            dl_result_age_ms=dl_result_age_ms
         )
 
     def get_avg_latency_ms(self) -> float:
@@ -416,7 +663,12 @@ class DLInferenceEngine:
             "model_name": self.model_name,
             "avg_latency_ms": self.get_avg_latency_ms(),
             "recent_frames": len(self.inference_times),
-            "gpu_enabled": self.enable_gpu
+            "gpu_enabled": self.enable_gpu,
+            "async_mode": self.async_mode,
+            "result_age_ms": self.get_result_age_ms() if self.async_mode else 0.0,
+            "async_submitted": self.async_frames_submitted,
+            "async_dropped": self.async_frames_dropped,
+            "async_inferred": self.async_frames_inferred,
         }
 
 
@@ -433,9 +685,11 @@ self.dl_engine = DLInferenceEngine(
 # In main loop, after MediaPipe inference:
 mediapipe_gaze_point = (iris_x, iris_y)  # pixel coordinates
 
-# Run DL inference on face crop
+# Crop the face once using the FaceLandmarker box, then run DL inference on it
+face_bbox = DLInferenceEngine.face_bbox_from_landmarks(face_landmarks, frame_w, frame_h)
+face_crop = self.dl_engine.crop_face(frame_bgr, face_bbox)
 dl_result = self.dl_engine.infer(
-    face_frame=face_roi,
+    face_frame=face_crop,
     head_pose_euler=(pitch, yaw, roll)
 )
 
@@ -110,7 +110,7 @@ class HandProfileCalibrator:
         Add a hand frame sample during calibration.
         
         Args:
-            hand_landmarks: List of MediaPipe hand landmarks
+            hand_landmarks: (21, 4) landmark array from hand_engine (x, y, z, presence)
             hand_size: Normalized hand bounding box diagonal
         """
         if self.calibration_state != CalibrationState.COLLECTING:
@@ -129,7 +129,7 @@ class HandProfileCalibrator:
         if len(hand_landmarks) >= 9:
             thumb = hand_landmarks[4]
             index = hand_landmarks[8]
-            pinch_dist = ((thumb.x - index.x)**2 + (thumb.y - index.y)**2) ** 0.5
+            pinch_dist = float(((thumb[0] - index[0])**2 + (thumb[1] - index[1])**2) ** 0.5)
             
             self.current_calibration.pinch_distance_min = min(
                 self.current_calibration.pinch_distance_min,
@@ -17,6 +17,7 @@ from __future__ import annotations
 import cv2
 import numpy as np
 import logging
+import math
 import time
 from typing import Optional, Tuple, List, Dict, Any
 from dataclasses import dataclass, field
@@ -57,26 +58,55 @@ class GestureType(Enum):
     NEUTRAL = "neutral"
 
 
-@dataclass
-class HandLandmark:
-    """Single hand landmark with position and confidence"""
-    x: float  # Normalized (0-1)
-    y: float  # Normalized (0-1)
-    z: float  # Depth (0-1, relative)
-    confidence: float  # 0-1
+# Hand landmarks are a (21, 4) float32 array per hand, one row per MediaPipe
+# landmark; column layout:
+LM_X = 0         # Normalized (0-1)
+LM_Y = 1         # Normalized (0-1)
+LM_Z = 2         # Depth (relative)
+LM_PRESENCE = 3  # 0-1
+NUM_HAND_LANDMARKS = 21
+
+# Landmark indices (MediaPipe hand model)
+WRIST = 0
+THUMB_MCP = 2
+THUMB_TIP = 4
+INDEX_MCP = 5
+INDEX_TIP = 8
+MIDDLE_MCP = 9
+MIDDLE_TIP = 12
+RING_MCP = 13
+RING_TIP = 16
+PINKY_MCP = 17
+PINKY_TIP = 20
+
+# Gesture feature vectors: tip - MCP for thumb, index, middle, ring and pinky,
+# then thumb tip - index tip (pinch); as a (6, 21) matrix so one product with
+# the landmark coordinates yields all of them
+_FEATURE_PAIRS = (
+    (THUMB_TIP, THUMB_MCP), (INDEX_TIP, INDEX_MCP), (MIDDLE_TIP, MIDDLE_MCP),
+    (RING_TIP, RING_MCP), (PINKY_TIP, PINKY_MCP), (THUMB_TIP, INDEX_TIP),
+)
+_FEATURE_MATRIX = (
+    np.eye(NUM_HAND_LANDMARKS, dtype=np.float32)[[a for a, _ in _FEATURE_PAIRS]]
+    - np.eye(NUM_HAND_LANDMARKS, dtype=np.float32)[[b for _, b in _FEATURE_PAIRS]]
+)
+
+# Landmark buffers kept per handedness: the current hand, the previous one
+# (wrist velocity) and one still held by a consumer such as the HUD
+LANDMARK_RING_SIZE = 3
 
 
 @dataclass
 class Hand:
     """Complete hand skeleton with 21 landmarks"""
-    landmarks: List[HandLandmark]
+    landmarks: np.ndarray  # (21, 4) float32: x, y, z, presence
     handedness: str  # "Left" or "Right"
     confidence: float  # Detection confidence 0-1
     timestamp_ms: float = 0.0
     bounding_box: Tuple[float, float, float, float] = (0, 0, 0, 0)  # (x_min, y_min, x_max, y_max) normalized
     
     # Velocity tracking (for swipe detection)
-    prev_landmarks: Optional[List[HandLandmark]] = field(default=None)
+    prev_landmarks: Optional[np.ndarray] = field(default=None)
     wrist_velocity: Tuple[float, float] = (0.0, 0.0)  # (vx, vy)
 
 
@@ -161,6 +191,12 @@ class HandGestureEngine:
         self.palm_hold_start: Dict[str, float] = {"Left": 0.0, "Right": 0.0}
         self.swipe_start: Dict[str, Tuple[float, float]] = {"Left": (0, 0), "Right": (0, 0)}
         self.inference_times = deque(maxlen=100)
+        self._inference_time_sum = 0.0
+        
+        # Preallocated landmark arrays per handedness; a Hand's landmarks stay
+        # valid until LANDMARK_RING_SIZE - 1 newer detections of that hand
+        self._landmark_buffers: Dict[str, List[np.ndarray]] = {}
+        self._landmark_slot: Dict[str, int] = {}
         
         # Attempt to load model
         if MEDIAPIPE_AVAILABLE:
@@ -215,12 +251,18 @@ class HandGestureEngine:
             logger.error(f"Failed to load hand gesture model: {e}")
             self.model_loaded = False
 
-    def process_frame(self, frame: np.ndarray) -> List[GestureResult]:
+    def process_frame(
+        self,
+        frame: Optional[np.ndarray],
+        rgb_frame: Optional[np.ndarray] = None
+    ) -> List[GestureResult]:
         """
         Process a single frame for hand gestures.
         
         Args:
-            frame: BGR video frame (H, W, 3)
+            frame: BGR video frame (H, W, 3); may be None when rgb_frame is given
+            rgb_frame: Already converted RGB frame (e.g. shared with face landmarking);
+                       skips the BGR->RGB conversion. Must not change until this returns.
             
         Returns:
             List of detected gestures
@@ -231,8 +273,9 @@ class HandGestureEngine:
         try:
             start_time = time.time()
             
-            # Convert BGR to RGB for MediaPipe
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            # Convert BGR to RGB for MediaPipe (unless the caller shares its RGB buffer)
+            if rgb_frame is None:
+                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
             
             # Create MediaPipe Image
             mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb_frame)
@@ -241,47 +284,42 @@ class HandGestureEngine:
             detection_result = self.detector.detect(mp_image)
             
             inference_time_ms = (time.time() - start_time) * 1000.0
-            self.inference_times.append(inference_time_ms)
+            self._record_inference_time(inference_time_ms)
             
             # Parse results
             hands = []
             if detection_result.hand_landmarks:
                 for i, landmarks in enumerate(detection_result.hand_landmarks):
-                    handedness = detection_result.handedness[i].category_name if i < len(detection_result.handedness) else "Unknown"
-                    hand_confidence = detection_result.handedness[i].score if i < len(detection_result.handedness) else 0.5
+                    # One list of categories per hand, best first
+                    categories = detection_result.handedness[i] if i < len(detection_result.handedness) else []
+                    handedness = categories[0].category_name if categories else "Unknown"
+                    hand_confidence = categories[0].score if categories else 0.5
                     
-                    # Convert landmarks
-                    hand_landmarks = [
-                        HandLandmark(
-                            x=lm.x,
-                            y=lm.y,
-                            z=lm.z,
-                            confidence=lm.presence
-                        )
-                        for lm in landmarks
-                    ]
+                    if len(landmarks) != NUM_HAND_LANDMARKS:
+                        continue
                     
-                    # Compute bounding box
-                    xs = [lm.x for lm in hand_landmarks]
-                    ys = [lm.y for lm in hand_landmarks]
-                    bbox = (min(xs), min(ys), max(xs), max(ys))
+                    # Copy landmarks into this hand's next preallocated array
+                    points = self._next_landmark_buffer(handedness)
+                    points[:] = [(lm.x, lm.y, lm.z, lm.presence or 0.0) for lm in landmarks]
+                    
+                    # Bounding box
+                    x_min, y_min = points[:, LM_X:LM_Z].min(axis=0).tolist()
+                    x_max, y_max = points[:, LM_X:LM_Z].max(axis=0).tolist()
                     
                     # Create Hand object
+                    prev_hand = self.hands_buffer.get(handedness)
                     hand = Hand(
-                        landmarks=hand_landmarks,
+                        landmarks=points,
                         handedness=handedness,
                         confidence=hand_confidence,
                         timestamp_ms=time.time() * 1000,
-                        bounding_box=bbox,
-                        prev_landmarks=self.hands_buffer.get(handedness, Hand([], handedness, 0)).landmarks if handedness in self.hands_buffer else None
+                        bounding_box=(x_min, y_min, x_max, y_max),
+                        prev_landmarks=prev_hand.landmarks if prev_hand is not None else None
                     )
                     
                     # Calculate wrist velocity
                     if hand.prev_landmarks is not None:
-                        wrist_curr = hand.landmarks[0]
-                        wrist_prev = hand.prev_landmarks[0]
-                        vx = wrist_curr.x - wrist_prev.x
-                        vy = wrist_curr.y - wrist_prev.y
+                        vx, vy = (points[WRIST, LM_X:LM_Z] - hand.prev_landmarks[WRIST, LM_X:LM_Z]).tolist()
                         hand.wrist_velocity = (vx, vy)
                     
                     # Update buffer
@@ -301,42 +339,44 @@ class HandGestureEngine:
             logger.error(f"Hand processing failed: {e}")
             return []
 
+    def _next_landmark_buffer(self, handedness: str) -> np.ndarray:
+        """Next (21, 4) array in this hand's ring (allocated on first use)"""
+        buffers = self._landmark_buffers.get(handedness)
+        if buffers is None:
+            buffers = [
+                np.zeros((NUM_HAND_LANDMARKS, 4), dtype=np.float32)
+                for _ in range(LANDMARK_RING_SIZE)
+            ]
+            self._landmark_buffers[handedness] = buffers
+        slot = (self._landmark_slot.get(handedness, -1) + 1) % LANDMARK_RING_SIZE
+        self._landmark_slot[handedness] = slot
+        return buffers[slot]
+
     def _classify_gesture(self, hand: Hand) -> Optional[GestureResult]:
         """Classify gesture from hand landmarks"""
-        
-        # Utility functions for landmark distances
-        def distance(lm1: HandLandmark, lm2: HandLandmark) -> float:
-            dx = lm1.x - lm2.x
-            dy = lm1.y - lm2.y
-            dz = lm1.z - lm2.z
-            return np.sqrt(dx**2 + dy**2 + dz**2)
-        
-        def hand_size(hand: Hand) -> float:
-            """Normalized hand bounding box diagonal"""
-            x_min, y_min, x_max, y_max = hand.bounding_box
-            return np.sqrt((x_max - x_min)**2 + (y_max - y_min)**2) + 1e-6
-        
-        if len(hand.landmarks) < 21:
+        points = hand.landmarks
+        if points is None or len(points) < NUM_HAND_LANDMARKS:
             return None
         
-        # Landmark indices (MediaPipe hand model)
-        THUMB_TIP = 4
-        INDEX_TIP = 8
-        MIDDLE_TIP = 12
-        RING_TIP = 16
-        PINKY_TIP = 20
-        WRIST = 0
-        THUMB_MCP = 2
-        INDEX_MCP = 5
-        MIDDLE_MCP = 9
-        RING_MCP = 13
-        PINKY_MCP = 17
+        # Normalized hand bounding box diagonal
+        x_min, y_min, x_max, y_max = hand.bounding_box
+        hand_scale = math.hypot(x_max - x_min, y_max - y_min) + 1e-6
         
-        hand_scale = hand_size(hand)
+        # All gesture features at once: tip - MCP vectors per finger and the
+        # thumb-index pinch vector, their lengths in hand-size units
+        vectors = _FEATURE_MATRIX @ points[:, LM_X:LM_PRESENCE]
+        lengths = (np.sqrt(np.einsum("ij,ij->i", vectors, vectors)) / hand_scale).tolist()
+        finger_lengths, pinch_length = lengths[:5], lengths[5]
+        # Finger states: thumb, index, middle, ring, pinky
+        extended = [length > self.config.palm_finger_extension_threshold for length in finger_lengths]
+        curled = [length < self.config.fist_finger_curl_threshold for length in finger_lengths]
+        # Fingertip above its MCP (image y grows downwards)
+        raised = [dy < -self.config.palm_finger_extension_threshold for dy in vectors[:5, LM_Y].tolist()]
+        xy = points[:, LM_X:LM_Z].tolist()
+        landmarks_detected = len(points)
         
         # Check PINCH (thumb + index)
-        thumb_index_dist = distance(hand.landmarks[THUMB_TIP], hand.landmarks[INDEX_TIP])
-        normalized_dist = thumb_index_dist / hand_scale
+        normalized_dist = pinch_length
         
         if normalized_dist < self.config.pinch_threshold:
             self.pinch_frame_count[hand.handedness] += 1
@@ -354,59 +394,45 @@ class HandGestureEngine:
                 confidence = 1.0 - (normalized_dist / self.config.pinch_threshold)
                 return GestureResult(
                     gesture_type=gesture_type,
-                    confidence=np.clip(confidence, 0.0, 1.0),
+                    confidence=min(max(confidence, 0.0), 1.0),
                     hand=hand,
-                    hand_position=(hand.landmarks[INDEX_TIP].x, hand.landmarks[INDEX_TIP].y),
+                    hand_position=tuple(xy[INDEX_TIP]),
                     inference_time_ms=self._get_avg_inference_time(),
-                    landmarks_detected=len(hand.landmarks),
+                    landmarks_detected=landmarks_detected,
                     gesture_metadata={"pinch_distance": normalized_dist}
                 )
         else:
             self.pinch_frame_count[hand.handedness] = 0
         
         # Check FIST (all fingers curled)
-        finger_tips = [hand.landmarks[i] for i in [THUMB_TIP, INDEX_TIP, MIDDLE_TIP, RING_TIP, PINKY_TIP]]
-        finger_mcps = [hand.landmarks[i] for i in [THUMB_MCP, INDEX_MCP, MIDDLE_MCP, RING_MCP, PINKY_MCP]]
-        
-        is_fist = all(
-            distance(finger_tips[i], finger_mcps[i]) < self.config.fist_finger_curl_threshold * hand_scale
-            for i in range(5)
-        )
-        
-        if is_fist:
+        if all(curled):
             return GestureResult(
                 gesture_type=GestureType.FIST,
                 confidence=0.95,
                 hand=hand,
-                hand_position=(hand.landmarks[WRIST].x, hand.landmarks[WRIST].y),
+                hand_position=tuple(xy[WRIST]),
                 inference_time_ms=self._get_avg_inference_time(),
-                landmarks_detected=len(hand.landmarks),
+                landmarks_detected=landmarks_detected,
                 gesture_metadata={"is_fist": True}
             )
         
         # Check OPEN_PALM (all fingers extended)
-        is_palm = all(
-            hand.landmarks[finger_tips[i]].y < hand.landmarks[finger_mcps[i]].y - self.config.palm_finger_extension_threshold
-            for i in range(5)
-        )
-        
-        if is_palm:
+        if all(raised):
             return GestureResult(
                 gesture_type=GestureType.OPEN_PALM_HOLD,
                 confidence=0.90,
                 hand=hand,
-                hand_position=(hand.landmarks[WRIST].x, hand.landmarks[WRIST].y),
+                hand_position=tuple(xy[WRIST]),
                 inference_time_ms=self._get_avg_inference_time(),
-                landmarks_detected=len(hand.landmarks),
+                landmarks_detected=landmarks_detected,
                 gesture_metadata={"is_open_palm": True}
             )
         
+        thumb_ext, index_ext, middle_ext, ring_ext, _ = extended
+        thumb_curl, _, middle_curl, ring_curl, pinky_curl = curled
+        
         # Check TWO_FINGER_SWIPE (index + middle extended)
-        is_two_finger = (
-            distance(hand.landmarks[INDEX_TIP], hand.landmarks[INDEX_MCP]) > self.config.palm_finger_extension_threshold * hand_scale and
-            distance(hand.landmarks[MIDDLE_TIP], hand.landmarks[MIDDLE_MCP]) > self.config.palm_finger_extension_threshold * hand_scale and
-            distance(hand.landmarks[RING_TIP], hand.landmarks[RING_MCP]) < self.config.fist_finger_curl_threshold * hand_scale
-        )
+        is_two_finger = index_ext and middle_ext and ring_curl
         
         vx, vy = hand.wrist_velocity
         speed_x = abs(vx)
@@ -427,33 +453,27 @@ class HandGestureEngine:
                 gesture_type=swipe_direction,
                 confidence=confidence,
                 hand=hand,
-                hand_position=(hand.landmarks[MIDDLE_TIP].x, hand.landmarks[MIDDLE_TIP].y),
+                hand_position=tuple(xy[MIDDLE_TIP]),
                 inference_time_ms=self._get_avg_inference_time(),
-                landmarks_detected=len(hand.landmarks),
+                landmarks_detected=landmarks_detected,
                 gesture_metadata={"swipe_velocity": hand.wrist_velocity}
             )
         
         # Check THUMB_UP / THUMB_DOWN
-        thumb_extension = hand.landmarks[THUMB_TIP].y - hand.landmarks[THUMB_MCP].y
+        thumb_extension = xy[THUMB_TIP][1] - xy[THUMB_MCP][1]
         if abs(thumb_extension) > self.config.thumb_extension_threshold:
             gesture_type = GestureType.THUMB_UP if thumb_extension < 0 else GestureType.THUMB_DOWN
             return GestureResult(
                 gesture_type=gesture_type,
                 confidence=0.85,
                 hand=hand,
-                hand_position=(hand.landmarks[THUMB_TIP].x, hand.landmarks[THUMB_TIP].y),
+                hand_position=tuple(xy[THUMB_TIP]),
                 inference_time_ms=self._get_avg_inference_time(),
-                landmarks_detected=len(hand.landmarks)
+                landmarks_detected=landmarks_detected
             )
         
         # Check INDEX_POINT (index extended, others curled)
-        is_index_point = (
-            distance(hand.landmarks[INDEX_TIP], hand.landmarks[INDEX_MCP]) > self.config.palm_finger_extension_threshold * hand_scale and
-            all(
-                distance(hand.landmarks[tip_idx], hand.landmarks[mcp_idx]) < self.config.fist_finger_curl_threshold * hand_scale
-                for tip_idx, mcp_idx in [(THUMB_TIP, THUMB_MCP), (MIDDLE_TIP, MIDDLE_MCP), (RING_TIP, RING_MCP), (PINKY_TIP, PINKY_MCP)]
-            )
-        )
+        is_index_point = index_ext and thumb_curl and middle_curl and ring_curl and pinky_curl
         
         if is_index_point:
             # Track how long index point is held
@@ -470,9 +490,9 @@ class HandGestureEngine:
                 gesture_type=gesture_t,
                 confidence=0.88,
                 hand=hand,
-                hand_position=(hand.landmarks[INDEX_TIP].x, hand.landmarks[INDEX_TIP].y),
+                hand_position=tuple(xy[INDEX_TIP]),
                 inference_time_ms=self._get_avg_inference_time(),
-                landmarks_detected=len(hand.landmarks),
+                landmarks_detected=landmarks_detected,
                 gesture_metadata={"hold_duration": hold_duration}
             )
         else:
@@ -481,26 +501,18 @@ class HandGestureEngine:
                 del self._index_point_start[hand.handedness]
         
         # Check THREE_FINGER_SPREAD (index, middle, ring extended and spread)
-        is_three_finger = (
-            distance(hand.landmarks[INDEX_TIP], hand.landmarks[INDEX_MCP]) > self.config.palm_finger_extension_threshold * hand_scale and
-            distance(hand.landmarks[MIDDLE_TIP], hand.landmarks[MIDDLE_MCP]) > self.config.palm_finger_extension_threshold * hand_scale and
-            distance(hand.landmarks[RING_TIP], hand.landmarks[RING_MCP]) > self.config.palm_finger_extension_threshold * hand_scale
-        )
-        
-        if is_three_finger:
+        if index_ext and middle_ext and ring_ext:
             # Compute spread angle
-            index_pos = np.array([hand.landmarks[INDEX_TIP].x, hand.landmarks[INDEX_TIP].y])
-            ring_pos = np.array([hand.landmarks[RING_TIP].x, hand.landmarks[RING_TIP].y])
-            spread_dist = np.linalg.norm(ring_pos - index_pos)
+            spread_dist = math.hypot(xy[RING_TIP][0] - xy[INDEX_TIP][0], xy[RING_TIP][1] - xy[INDEX_TIP][1])
             
             if spread_dist > self.config.spread_angle_threshold / 180 * np.pi:
                 return GestureResult(
                     gesture_type=GestureType.THREE_FINGER_SPREAD,
                     confidence=0.92,
                     hand=hand,
-                    hand_position=(hand.landmarks[MIDDLE_TIP].x, hand.landmarks[MIDDLE_TIP].y),
+                    hand_position=tuple(xy[MIDDLE_TIP]),
                     inference_time_ms=self._get_avg_inference_time(),
-                    landmarks_detected=len(hand.landmarks),
+                    landmarks_detected=landmarks_detected,
                     notes="EMERGENCY: Three finger spread detected"
                 )
         
@@ -509,16 +521,23 @@ class HandGestureEngine:
             gesture_type=GestureType.NEUTRAL,
             confidence=0.7,
             hand=hand,
-            hand_position=(hand.landmarks[WRIST].x, hand.landmarks[WRIST].y),
+            hand_position=tuple(xy[WRIST]),
             inference_time_ms=self._get_avg_inference_time(),
-            landmarks_detected=len(hand.landmarks)
+            landmarks_detected=landmarks_detected
         )
 
+    def _record_inference_time(self, inference_time_ms: float) -> None:
+        """Add a latency sample, keeping a running sum over the window"""
+        if len(self.inference_times) == self.inference_times.maxlen:
+            self._inference_time_sum -= self.inference_times[0]
+        self.inference_times.append(inference_time_ms)
+        self._inference_time_sum += inference_time_ms
+
     def _get_avg_inference_time(self) -> float:
         """Get average inference latency"""
         if not self.inference_times:
             return 0.0
-        return np.mean(list(self.inference_times))
+        return self._inference_time_sum / len(self.inference_times)
 
     def get_diagnostics(self) -> Dict[str, Any]:
         """Return diagnostics for logging/HUD"""
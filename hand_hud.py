@@ -22,6 +22,8 @@ from typing import Optional, List, Tuple, Dict, Any
 from dataclasses import dataclass
 from enum import Enum
 
+from hud_layers import LayerCache
+
 logger = logging.getLogger(__name__)
 
 
@@ -84,36 +86,40 @@ class GestureHUDRenderer:
         # State tracking
         self.landmarks_visible = True
         self.gesture_display_info: Optional[GestureDisplayInfo] = None
-        self.last_hand_landmarks: Optional[List] = None
+        self.last_hand_landmarks: Optional[np.ndarray] = None
         self.fps_counter = 0
         
+        # Cached panel overlays, redrawn only when their content changes
+        self.layers = LayerCache(frame_width, frame_height)
+        
         logger.info(f"✓ GestureHUDRenderer initialized ({mode.value} mode)")
 
     def render_hand_overlay(
         self,
         frame: np.ndarray,
-        hand_landmarks: Optional[List[Tuple[float, float]]] = None,
+        hand_landmarks: Optional[np.ndarray] = None,
         gesture_info: Optional[GestureDisplayInfo] = None,
         fusion_mode: str = "eye_leads_hand_confirms",
         diagnostics: Optional[Dict[str, Any]] = None
     ) -> np.ndarray:
         """
-        Render hand gesture overlay on frame.
+        Render hand gesture overlay on frame (in place).
         
         Args:
-            frame: Input video frame (BGR)
-            hand_landmarks: List of (x, y) normalized hand landmarks (0-1 range)
+            frame: Video frame (BGR) to draw on, normally the HUDRenderer output
+            hand_landmarks: (21, >=2) array of normalized hand landmarks (x, y in
+                            the first two columns, as in hand_engine.Hand.landmarks)
             gesture_info: Current gesture information
             fusion_mode: Current fusion mode string
             diagnostics: Diagnostic info dict (for debug mode)
             
         Returns:
-            Frame with hand overlay rendered
+            The same frame with hand overlay rendered
         """
-        display_frame = frame.copy()
+        display_frame = frame
         
         # Store for continuity
-        if hand_landmarks:
+        if hand_landmarks is not None:
             self.last_hand_landmarks = hand_landmarks
         if gesture_info:
             self.gesture_display_info = gesture_info
@@ -127,22 +133,22 @@ class GestureHUDRenderer:
             display_frame = self._render_debug(display_frame, fusion_mode, diagnostics)
         
         # Always render landmarks and gesture if available
-        if self.landmarks_visible and hand_landmarks:
+        if self.landmarks_visible and hand_landmarks is not None:
             display_frame = self._render_landmarks(display_frame, hand_landmarks)
         
         return display_frame
 
-    def _render_landmarks(self, frame: np.ndarray, landmarks: List[Tuple[float, float]]) -> np.ndarray:
+    def _render_landmarks(self, frame: np.ndarray, landmarks: np.ndarray) -> np.ndarray:
         """Render 21 hand landmarks and skeleton"""
-        display_frame = frame.copy()
+        display_frame = frame
         
-        if not landmarks or len(landmarks) < 21:
+        if len(landmarks) < 21:
             return display_frame
         
         # Convert normalized coordinates to pixels
         landmarks_px = [
-            (int(lm[0] * self.frame_width), int(lm[1] * self.frame_height))
-            for lm in landmarks
+            tuple(pt) for pt in
+            (landmarks[:, :2] * (self.frame_width, self.frame_height)).astype(np.int32).tolist()
         ]
         
         # Draw connections (skeleton)
@@ -180,7 +186,7 @@ class GestureHUDRenderer:
 
     def _render_minimal(self, frame: np.ndarray, fusion_mode: str) -> np.ndarray:
         """Minimal HUD: gesture name + confidence only"""
-        display_frame = frame.copy()
+        display_frame = frame
         
         # Gesture name in top-right corner
         if self.gesture_display_info:
@@ -192,9 +198,10 @@ class GestureHUDRenderer:
             # Text background
             text_size = cv2.getTextSize(text, font, font_scale, thickness)[0]
             x, y = self.frame_width - text_size[0] - 15, 30
-            cv2.rectangle(display_frame, (x - 5, y - text_size[1] - 5), 
-                         (x + text_size[0] + 5, y + 5), (50, 50, 50), -1)
-            cv2.putText(display_frame, text, (x, y), font, font_scale, (0, 255, 0), thickness)
+            self.layers.render(display_frame, "gesture_label", (x - 5, y - text_size[1] - 5, self.frame_width, y + 10), [
+                ("rect", (x - 5, y - text_size[1] - 5), (x + text_size[0] + 5, y + 5), (50, 50, 50), -1),
+                ("text", text, (x, y), font, font_scale, (0, 255, 0), thickness),
+            ])
         
         # Fusion mode pill (top-right corner, below gesture)
         fusion_text = fusion_mode.replace("_", " ").upper()
@@ -204,7 +211,7 @@ class GestureHUDRenderer:
 
     def _render_standard(self, frame: np.ndarray, fusion_mode: str) -> np.ndarray:
         """Standard HUD: landmarks + gesture name + confidence bar + mode"""
-        display_frame = frame.copy()
+        display_frame = frame
         
         # Full gesture info panel (top-right)
         if self.gesture_display_info:
@@ -239,44 +246,42 @@ class GestureHUDRenderer:
         x, y = self.frame_width - 200, 30
         panel_height = 80
         panel_width = 180
+        rect = (x - 7, y - 7, x + panel_width + 8, y + panel_height + 8)
         
-        # Background
-        cv2.rectangle(frame, (x - 5, y - 5), (x + panel_width + 5, y + panel_height + 5),
-                     (40, 40, 40), -1)
-        cv2.rectangle(frame, (x - 5, y - 5), (x + panel_width + 5, y + panel_height + 5),
-                     (100, 100, 100), 2)
-        
-        # Gesture name
-        gesture_text = self.gesture_display_info.gesture_name.replace("_", " ").upper()
-        cv2.putText(frame, gesture_text, (x + 5, y + 20), font, font_scale, (0, 255, 0), thickness)
-        
-        # Confidence bar
-        confidence = self.gesture_display_info.confidence
+        # Confidence bar geometry
         bar_width = panel_width - 10
         bar_height = 10
         bar_x = x + 5
         bar_y = y + 35
         
-        # Background bar
-        cv2.rectangle(frame, (bar_x, bar_y), (bar_x + bar_width, bar_y + bar_height),
-                     (50, 50, 50), -1)
+        # Background and empty bar (static)
+        background = [
+            ("rect", (x - 5, y - 5), (x + panel_width + 5, y + panel_height + 5), (40, 40, 40), -1),
+            ("rect", (x - 5, y - 5), (x + panel_width + 5, y + panel_height + 5), (100, 100, 100), 2),
+            ("rect", (bar_x, bar_y), (bar_x + bar_width, bar_y + bar_height), (50, 50, 50), -1),
+        ]
+        
+        # Gesture name
+        gesture_text = self.gesture_display_info.gesture_name.replace("_", " ").upper()
+        items = [("text", gesture_text, (x + 5, y + 20), font, font_scale, (0, 255, 0), thickness)]
         
         # Filled portion
+        confidence = self.gesture_display_info.confidence
         filled_width = int(bar_width * confidence)
         fill_color = (0, 200, 0) if confidence > 0.7 else (0, 165, 255) if confidence > 0.4 else (0, 0, 255)
         if filled_width > 0:
-            cv2.rectangle(frame, (bar_x, bar_y), (bar_x + filled_width, bar_y + bar_height),
-                         fill_color, -1)
+            items.append(("rect", (bar_x, bar_y), (bar_x + filled_width, bar_y + bar_height), fill_color, -1))
         
         # Confidence percentage
         conf_text = f"{confidence:.0%}"
-        cv2.putText(frame, conf_text, (bar_x + bar_width - 30, bar_y + 20), 
-                   font, font_scale * 0.8, (200, 200, 200), 1)
+        items.append(("text", conf_text, (bar_x + bar_width - 30, bar_y + 20),
+                      font, font_scale * 0.8, (200, 200, 200), 1))
         
         # Handedness
         hand_text = self.gesture_display_info.handedness
-        cv2.putText(frame, hand_text, (x + 5, y + 65), font, font_scale * 0.7,
-                   (150, 150, 150), 1)
+        items.append(("text", hand_text, (x + 5, y + 65), font, font_scale * 0.7, (150, 150, 150), 1))
+        
+        self.layers.render(frame, "gesture_panel", rect, items, background)
 
     def _draw_mode_pill(self, frame: np.ndarray, text: str, x: int, y: int):
         """Draw a rounded rectangle "pill" for fusion mode"""
@@ -288,15 +293,13 @@ class GestureHUDRenderer:
         width = text_size[0] + 16
         height = text_size[1] + 8
         
-        # Rounded rectangle background
-        cv2.rectangle(frame, (x - 2, y - 2), (x + width + 2, y + height + 2),
-                     (100, 100, 200), -1)
-        cv2.rectangle(frame, (x - 2, y - 2), (x + width + 2, y + height + 2),
-                     (200, 200, 255), 1)
-        
-        # Text
-        cv2.putText(frame, text, (x + 8, y + text_size[1] + 4), font, font_scale,
-                   (255, 255, 0), thickness)
+        self.layers.render(frame, "mode_pill", (x - 3, y - 3, x + width + 4, y + height + 4), [
+            # Rounded rectangle background
+            ("rect", (x - 2, y - 2), (x + width + 2, y + height + 2), (100, 100, 200), -1),
+            ("rect", (x - 2, y - 2), (x + width + 2, y + height + 2), (200, 200, 255), 1),
+            # Text
+            ("text", text, (x + 8, y + text_size[1] + 4), font, font_scale, (255, 255, 0), thickness),
+        ])
 
     def _draw_diagnostics_panel(self, frame: np.ndarray, diagnostics: Dict):
         """Draw diagnostics info in bottom-left"""
@@ -306,14 +309,14 @@ class GestureHUDRenderer:
         
         x, y = 15, frame.shape[0] - 120
         line_height = 20
+        rect = (x - 6, y - 6, x + 302, y + 122)
         
-        # Background
-        cv2.rectangle(frame, (x - 5, y - 5), (x + 300, y + 120), (20, 20, 20), -1)
-        cv2.rectangle(frame, (x - 5, y - 5), (x + 300, y + 120), (100, 100, 100), 1)
-        
-        # Title
-        cv2.putText(frame, "GESTURE DIAGNOSTICS", (x + 5, y + 15), font, font_scale * 1.2,
-                   (0, 255, 255), 1)
+        # Background and title (static)
+        background = [
+            ("rect", (x - 5, y - 5), (x + 300, y + 120), (20, 20, 20), -1),
+            ("rect", (x - 5, y - 5), (x + 300, y + 120), (100, 100, 100), 1),
+            ("text", "GESTURE DIAGNOSTICS", (x + 5, y + 15), font, font_scale * 1.2, (0, 255, 255), 1),
+        ]
         
         # Info lines
         lines = [
@@ -324,9 +327,10 @@ class GestureHUDRenderer:
             f"Confidence: {diagnostics.get('confidence', 0):.2f}",
         ]
         
-        for i, line in enumerate(lines):
-            cv2.putText(frame, line, (x + 10, y + 35 + i * line_height), font, font_scale,
-                       (200, 200, 200), 1)
+        self.layers.render(frame, "diagnostics_panel", rect, [
+            ("text", line, (x + 10, y + 35 + i * line_height), font, font_scale, (200, 200, 200), thickness)
+            for i, line in enumerate(lines)
+        ], background)
 
     def toggle_landmarks(self):
         """Toggle landmark visibility"""
@@ -367,7 +371,7 @@ gesture_display_info = GestureDisplayInfo(
 
 display_frame = self.gesture_hud.render_hand_overlay(
     frame=display_frame,
-    hand_landmarks=[(lm.x, lm.y) for lm in gesture_result.hand.landmarks],
+    hand_landmarks=gesture_result.hand.landmarks,
     gesture_info=gesture_display_info,
     fusion_mode=self.fusion_engine.config.fusion_mode.value
 )
@@ -0,0 +1,325 @@
+"""
+Gaze Heatmap
+Low-resolution, exponentially decaying fixation map for the HUD overlay (Feature C)
+Samples are splatted with a cached kernel into a downsampled grid; decay is applied
+lazily through a global scale, the running max is tracked incrementally and the
+colour overlay is rebuilt at a throttled rate, only over the region that holds heat
+Part of NeuroGaze Elite
+"""
+
+import math
+import time
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class GazeHeatmap:
+    """
+    Gaze heatmap accumulated on a coarse grid.
+
+    Stored values are scaled by exp((t - t_ref) / tau) instead of decaying the
+    whole grid every frame: a splat at time t adds weight * exp((t - t_ref) / tau)
+    and the true value is the stored one times exp(-(t_now - t_ref) / tau).
+    Uniform decay keeps the argmax, so the running max of stored values only has
+    to be compared against the cells touched by each splat.
+
+    Besides the decaying display map, a per-session count of gaze samples per
+    cell is kept without decay for offline analytics (see export()).
+    """
+
+    # Rebase the lazy decay scale before exp() grows past this exponent
+    MAX_DECAY_EXPONENT = 30.0
+    # Renormalise the colour scale once the max has grown by this ratio;
+    # in between, heat above the previous max saturates
+    RENORMALISE_RATIO = 1.05
+    # Normalised heat (0-255) at which the overlay reaches full opacity
+    ALPHA_RAMP = 48
+    # Blend tile size in grid cells; only tiles with visible heat are blended
+    TILE_CELLS = 4
+
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        cell_px: int = 8,
+        sigma_px: float = 15.0,
+        radius_px: int = 30,
+        weight: float = 10.0,
+        half_life_s: float = 60.0,
+        recolor_hz: float = 4.0,
+        opacity: float = 0.4
+    ):
+        """
+        Initialize heatmap.
+
+        Args:
+            width: Frame width in pixels
+            height: Frame height in pixels
+            cell_px: Grid cell size in pixels
+            sigma_px: Gaussian splat sigma in pixels
+            radius_px: Splat radius in pixels
+            weight: Peak weight added per gaze sample
+            half_life_s: Time for heat to halve (0 = no decay)
+            recolor_hz: Maximum overlay rebuild rate (0 = whenever the grid changed)
+            opacity: Overlay opacity at full heat
+        """
+        self.width = int(width)
+        self.height = int(height)
+        self.cell_px = max(1, int(cell_px))
+        self.weight = float(weight)
+        self.half_life_s = float(half_life_s)
+        self.recolor_hz = float(recolor_hz)
+        self.opacity = float(opacity)
+
+        self.grid_w = -(-self.width // self.cell_px)
+        self.grid_h = -(-self.height // self.cell_px)
+        self.grid = np.zeros((self.grid_h, self.grid_w), dtype=np.float32)
+        self.counts = np.zeros((self.grid_h, self.grid_w), dtype=np.uint32)
+
+        # Splat kernel in grid cells, built once
+        radius = max(1, int(math.ceil(radius_px / self.cell_px)))
+        sigma = max(sigma_px / self.cell_px, 1e-3)
+        yy, xx = np.ogrid[-radius:radius + 1, -radius:radius + 1]
+        self.kernel = np.exp(-(xx ** 2 + yy ** 2) / (2.0 * sigma ** 2)).astype(np.float32)
+        self.kernel_radius = radius
+
+        # Normalised heat (0-255) -> premultiplied JET colour and inverse opacity
+        levels = np.arange(256, dtype=np.uint8)
+        jet = cv2.applyColorMap(levels.reshape(256, 1), cv2.COLORMAP_JET).reshape(256, 3)
+        alpha = np.minimum(levels.astype(np.float32) / self.ALPHA_RAMP, 1.0) * self.opacity
+        self._colour_lut = np.round(jet * alpha[:, None]).astype(np.uint8)
+        self._inv_alpha_lut = np.repeat(np.round((1.0 - alpha) * 255.0), 3).reshape(256, 3).astype(np.uint8)
+
+
+        self._tau = self.half_life_s / math.log(2.0) if self.half_life_s > 0 else 0.0
+        self.samples = 0
+        self.recolors = 0
+        self.session_start: Optional[float] = None
+        self.last_sample: Optional[float] = None
+        self._clear_display()
+
+    def _clear_display(self) -> None:
+        self._t_ref: Optional[float] = None
+        self._max_stored = 0.0
+        self._norm_max = 0.0
+        self._last_recolor = 0.0
+        self._dirty = False
+        # Grid cells holding heat (r0, r1, c0, c1); None until the first splat
+        self._bbox: Optional[Tuple[int, int, int, int]] = None
+        # Overlay patches built by _recolor(): (y0, y1, x0, x1, premultiplied colour,
+        # inverse alpha), blended as frame * inv_alpha / 255 + premultiplied colour
+        self._patches: Optional[List[Tuple[int, int, int, int, np.ndarray, np.ndarray]]] = None
+
+    def _decay_scale(self, now: float) -> float:
+        """Lazy decay scale for a sample at 'now' (rebases the grid when it grows too large)"""
+        if self._tau <= 0:
+            return 1.0
+        if self._t_ref is None:
+            self._t_ref = now
+        exponent = (now - self._t_ref) / self._tau
+        if exponent > self.MAX_DECAY_EXPONENT:
+            factor = math.exp(-exponent)
+            self.grid *= factor
+            self._max_stored *= factor
+            self._norm_max *= factor
+            self._t_ref = now
+            exponent = 0.0
+        return math.exp(exponent)
+
+    def add(self, x: float, y: float, timestamp: Optional[float] = None, splat: bool = True) -> None:
+        """
+        Add one gaze sample.
+
+        Args:
+            x, y: Gaze position in frame pixels (clamped to the frame)
+            timestamp: Sample time in seconds (time.time() if None)
+            splat: Also update the decaying display map; False only counts
+                   the sample for the session export
+        """
+        now = time.time() if timestamp is None else timestamp
+        col = min(self.grid_w - 1, max(0, int(x) // self.cell_px))
+        row = min(self.grid_h - 1, max(0, int(y) // self.cell_px))
+
+        self.counts[row, col] += 1
+        self.samples += 1
+        if self.session_start is None:
+            self.session_start = now
+        self.last_sample = now
+        if not splat:
+            return
+
+        r = self.kernel_radius
+        r0, r1 = max(0, row - r), min(self.grid_h, row + r + 1)
+        c0, c1 = max(0, col - r), min(self.grid_w, col + r + 1)
+        patch = self.grid[r0:r1, c0:c1]
+        patch += self.kernel[r0 - row + r:r1 - row + r, c0 - col + r:c1 - col + r] * (
+            self.weight * self._decay_scale(now)
+        )
+
+        peak = float(patch.max())
+        if peak > self._max_stored:
+            self._max_stored = peak
+
+        if self._bbox is None:
+            self._bbox = (r0, r1, c0, c1)
+        else:
+            b = self._bbox
+            self._bbox = (min(b[0], r0), max(b[1], r1), min(b[2], c0), max(b[3], c1))
+        self._dirty = True
+
+    def _recolor(self) -> None:
+        """Rebuild the full-resolution overlay patches for tiles holding heat"""
+        if self._norm_max <= 0 or self._max_stored > self._norm_max * self.RENORMALISE_RATIO:
+            self._norm_max = self._max_stored
+
+        r0, r1, c0, c1 = self._bbox
+        heat = np.minimum(self.grid[r0:r1, c0:c1] * (255.0 / self._norm_max), 255.0).astype(np.uint8)
+        colour = self._colour_lut[heat]
+        inv_alpha = self._inv_alpha_lut[heat]
+
+        # Upscale each visible block with a one-cell border so that linear
+        # interpolation matches an upscale of the whole grid, then crop it
+        cell = self.cell_px
+        patches = []
+        for b0, b1, a0, a1 in self._visible_blocks(heat):
+            p0, p1 = max(0, b0 - 1), min(heat.shape[0], b1 + 1)
+            q0, q1 = max(0, a0 - 1), min(heat.shape[1], a1 + 1)
+            size = ((q1 - q0) * cell, (p1 - p0) * cell)
+            y0, x0 = (r0 + b0) * cell, (c0 + a0) * cell
+            y1, x1 = min(self.height, (r0 + b1) * cell), min(self.width, (c0 + a1) * cell)
+            oy, ox = (b0 - p0) * cell, (a0 - q0) * cell
+            crop = (slice(oy, oy + y1 - y0), slice(ox, ox + x1 - x0))
+            patches.append((
+                y0, y1, x0, x1,
+                cv2.resize(colour[p0:p1, q0:q1], size, interpolation=cv2.INTER_LINEAR)[crop],
+                cv2.resize(inv_alpha[p0:p1, q0:q1], size, interpolation=cv2.INTER_LINEAR)[crop],
+            ))
+        self._patches = patches
+
+        self._dirty = False
+        self.recolors += 1
+
+    def _visible_blocks(self, heat: np.ndarray) -> List[Tuple[int, int, int, int]]:
+        """
+        Cell rectangles (row0, row1, col0, col1) covering every tile that shows
+        heat after upscaling. Runs of visible tiles in a tile row are merged
+        with an identical run in the row above.
+        """
+        # Linear upscaling spreads each cell into half of its neighbours
+        visible = cv2.dilate((heat > 0).astype(np.uint8), np.ones((3, 3), np.uint8))
+        t = self.TILE_CELLS
+        height, width = visible.shape
+        rows, cols = -(-height // t), -(-width // t)
+        tiles = np.zeros((rows, t, cols + 2, t), dtype=np.uint8)
+        tiles.reshape(rows * t, (cols + 2) * t)[:height, t:t + width] = visible
+        tiles = tiles.max(axis=(1, 3)).astype(np.int8)
+
+        # Row-major (row, col) of run starts and ends, paired per row
+        edge_rows, edge_cols = np.nonzero(np.diff(tiles, axis=1))
+        blocks: List[List[int]] = []
+        open_runs: Dict[Tuple[int, int], int] = {}
+        runs: Dict[Tuple[int, int], int] = {}
+        current_row = -1
+        for row, start, end in zip(edge_rows[::2].tolist(), edge_cols[::2].tolist(), edge_cols[1::2].tolist()):
+            if row != current_row:
+                open_runs = runs if row == current_row + 1 else {}
+                runs = {}
+                current_row = row
+            key = (start, end)
+            index = open_runs.get(key)
+            if index is None:
+                index = len(blocks)
+                blocks.append([row, row + 1, start, end])
+            else:
+                blocks[index][1] = row + 1
+            runs[key] = index
+
+        return [
+            (b0 * t, min(height, b1 * t), a0 * t, min(width, a1 * t))
+            for b0, b1, a0, a1 in blocks
+        ]
+
+    def render(self, frame: np.ndarray, now: Optional[float] = None) -> np.ndarray:
+        """
+        Blend the heatmap into a frame (in place, only over tiles holding heat).
+
+        Args:
+            frame: BGR frame of the size given at construction
+            now: Current time in seconds (time.time() if None), used for throttling
+
+        Returns:
+            The same frame
+        """
+        if self._bbox is None or frame.shape[:2] != (self.height, self.width):
+            return frame
+
+        now = time.time() if now is None else now
+        if self._dirty and (
+            self._patches is None
+            or self.recolor_hz <= 0
+            or now - self._last_recolor >= 1.0 / self.recolor_hz
+        ):
+            self._recolor()
+            self._last_recolor = now
+
+        for y0, y1, x0, x1, premultiplied, inv_alpha in self._patches:
+            roi = frame[y0:y1, x0:x1]
+            cv2.multiply(roi, inv_alpha, dst=roi, scale=1.0 / 255.0)
+            cv2.add(roi, premultiplied, dst=roi)
+        return frame
+
+    def snapshot(self, now: Optional[float] = None) -> np.ndarray:
+        """Decayed heat per grid cell at 'now' (float32, grid_h x grid_w)"""
+        if self._tau <= 0 or self._t_ref is None:
+            return self.grid.copy()
+        now = time.time() if now is None else now
+        return self.grid * np.float32(math.exp(-(now - self._t_ref) / self._tau))
+
+    def reset(self) -> None:
+        """Clear the display map (session counts are kept for export)"""
+        self.grid.fill(0)
+        self._clear_display()
+
+    def export(self, path: Path) -> bool:
+        """
+        Save the session heatmap as a compressed .npz for analytics.
+
+        Arrays: counts (uint32 gaze samples per cell, no decay), heat (float16
+        decayed display map at export time), plus grid geometry and timing.
+
+        Returns:
+            True if saved
+        """
+        if self.samples == 0:
+            return False
+        try:
+            np.savez_compressed(
+                Path(path),
+                counts=self.counts,
+                heat=self.snapshot().astype(np.float16),
+                cell_px=np.int32(self.cell_px),
+                frame_size=np.array([self.width, self.height], dtype=np.int32),
+                half_life_s=np.float32(self.half_life_s),
+                session_start=np.float64(self.session_start or 0.0),
+                session_end=np.float64(self.last_sample or 0.0),
+            )
+        except OSError as exc:
+            logger.warning(f"Could not save heatmap: {exc}")
+            return False
+        return True
+
+    def get_stats(self) -> Dict[str, object]:
+        """Heatmap diagnostics"""
+        return {
+            "grid": f"{self.grid_w}x{self.grid_h}",
+            "cell_px": self.cell_px,
+            "samples": self.samples,
+            "recolors": self.recolors,
+            "cells_visited": int(np.count_nonzero(self.counts)),
+        }
@@ -9,10 +9,13 @@ Part of NeuroGaze Elite
 import cv2
 import numpy as np
 import logging
-from typing import Optional, Tuple
+from typing import Dict, Optional, Sequence, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
+from heatmap import GazeHeatmap
+from hud_layers import LayerCache
+
 logger = logging.getLogger(__name__)
 
 
@@ -43,6 +46,16 @@ class HUDColors:
     heatmap_warm = (0, 0, 255)         # Red
 
 
+# Blue-light filter levels (Feature D): per-channel gains (B, G, R), roughly by
+# the colour temperature they shift a daylight display towards
+BLUE_LIGHT_LEVELS: Dict[str, Tuple[float, float, float]] = {
+    "mild": (0.85, 1.00, 1.07),      # ~5000K
+    "warm": (0.70, 1.00, 1.15),      # ~4000K (default)
+    "night": (0.50, 0.88, 1.15),     # ~3000K
+    "candle": (0.30, 0.72, 1.15),    # ~2000K
+}
+
+
 class HUDRenderer:
     """
     Comprehensive HUD rendering engine.
@@ -53,7 +66,9 @@ class HUDRenderer:
         self,
         frame_width: int = 1280,
         frame_height: int = 720,
-        mode: HUDMode = HUDMode.STANDARD
+        mode: HUDMode = HUDMode.STANDARD,
+        blue_light_level: str = "warm",
+        blue_light_levels: Optional[Dict[str, Tuple[float, float, float]]] = None
     ):
         """
         Initialize HUD renderer.
@@ -62,18 +77,27 @@ class HUDRenderer:
             frame_width: Video frame width
             frame_height: Video frame height
             mode: HUD display mode
+            blue_light_level: Blue-light filter level name
+            blue_light_levels: Extra or overriding levels, name -> (B, G, R) gains
         """
         self.frame_width = frame_width
         self.frame_height = frame_height
         self.mode = mode
         self.colors = HUDColors()
         
-        # Heatmap buffer (Feature C: Gaze heatmap)
-        self.heatmap = np.zeros((frame_height, frame_width, 1), dtype=np.float32)
+        # Heatmap (Feature C: Gaze heatmap); samples are always counted for the
+        # session export, the decaying display map only while enabled
+        self.heatmap = GazeHeatmap(frame_width, frame_height)
         self.heatmap_enabled = False
         
-        # Blue-light filter (Feature D)
+        # Blue-light filter (Feature D): one cached 256-entry LUT per level
         self.blue_light_filter_enabled = False
+        self.blue_light_levels = dict(BLUE_LIGHT_LEVELS)
+        if blue_light_levels:
+            self.blue_light_levels.update(blue_light_levels)
+        self._blue_light_luts: Dict[str, np.ndarray] = {}
+        self.blue_light_level = "warm"
+        self.set_blue_light_level(blue_light_level)
         
         # Font settings
         self.font = cv2.FONT_HERSHEY_SIMPLEX
@@ -83,6 +107,9 @@ class HUDRenderer:
         self.font_thickness_normal = 1
         self.font_thickness_bold = 2
         
+        # Cached panel overlays, redrawn only when their content changes
+        self.layers = LayerCache(frame_width, frame_height)
+        
         logger.info(f"✓ HUDRenderer initialized ({frame_width}x{frame_height}, mode: {mode.value})")
     
     def render_frame(
@@ -94,7 +121,9 @@ class HUDRenderer:
         strain_metrics: Optional[dict] = None,
         fps: Optional[float] = None,
         backend_info: Optional[dict] = None,
-        mode_info: Optional[str] = None
+        mode_info: Optional[str] = None,
+        stage_timings: Optional[dict] = None,
+        gaze_samples: Optional[Sequence[Tuple[float, float, float]]] = None
     ) -> np.ndarray:
         """
         Render complete HUD on frame.
@@ -108,6 +137,10 @@ class HUDRenderer:
             fps: Frames per second
             backend_info: GPU/CUDA info
             mode_info: Current mode string
+            stage_timings: Per-stage latency stats from StageProfiler (DEBUG mode)
+            gaze_samples: Gaze samples (x, y, timestamp) for the heatmap, used
+                          instead of gaze_position (e.g. every sample since the
+                          last rendered frame)
             
         Returns:
             Frame with HUD overlaid
@@ -119,8 +152,13 @@ class HUDRenderer:
             output = self._apply_blue_light_filter(output)
         
         # Render gaze heatmap if enabled (Feature C)
-        if self.heatmap_enabled and gaze_position is not None:
-            output = self._render_heatmap(output, gaze_position)
+        if gaze_samples is not None:
+            for x, y, timestamp in gaze_samples:
+                self.heatmap.add(x, y, timestamp, splat=self.heatmap_enabled)
+        elif gaze_position is not None:
+            self.heatmap.add(gaze_position[0], gaze_position[1], splat=self.heatmap_enabled)
+        if self.heatmap_enabled:
+            output = self.heatmap.render(output)
         
         # Render gaze cursor
         if gaze_position is not None:
@@ -140,84 +178,39 @@ class HUDRenderer:
             output = self._render_debug_hud(
                 output, gaze_position, gaze_velocity,
                 intent_confidence, strain_metrics, fps,
-                backend_info, mode_info
+                backend_info, mode_info, stage_timings
             )
         
         return output
     
+    def _blue_light_lut(self, level: str) -> np.ndarray:
+        """Per-channel lookup table for a filter level (built once per level)"""
+        lut = self._blue_light_luts.get(level)
+        if lut is None:
+            values = np.arange(256, dtype=np.float32)
+            gains = self.blue_light_levels[level]
+            lut = np.stack(
+                [np.clip(values * np.float32(gain), 0, 255).astype(np.uint8) for gain in gains],
+                axis=-1
+            ).reshape(1, 256, 3)
+            self._blue_light_luts[level] = lut
+        return lut
+    
     def _apply_blue_light_filter(self, frame: np.ndarray) -> np.ndarray:
         """
-        Apply blue-light filter to reduce eye strain.
+        Apply blue-light filter to reduce eye strain (in place).
         Feature D: Toggle-able blue-light filter.
         
         Args:
-            frame: Input frame (BGR)
+            frame: Input frame (BGR), modified in place
             
         Returns:
             Filtered frame
         """
-        if frame.shape[2] < 3:
+        if frame.ndim < 3 or frame.shape[2] != 3 or frame.dtype != np.uint8:
             return frame
         
-        # Reduce blue channel (index 0 in BGR), boost red (index 2)
-        filtered = frame.copy().astype(np.float32)
-        filtered[:, :, 0] = filtered[:, :, 0] * 0.70  # Reduce blue by 30%
-        filtered[:, :, 2] = np.minimum(filtered[:, :, 2] * 1.15, 255)  # Boost red by 15%
-        
-        return np.clip(filtered, 0, 255).astype(np.uint8)
-    
-    def _render_heatmap(
-        self,
-        frame: np.ndarray,
-        gaze_position: Tuple[float, float]
-    ) -> np.ndarray:
-        """
-        Render gaze heatmap overlay.
-        Feature C: Shows which screen zones user fixates most.
-        
-        Args:
-            frame: Input frame
-            gaze_position: Current gaze (x, y)
-            
-        Returns:
-            Frame with heatmap overlay
-        """
-        x, y = int(gaze_position[0]), int(gaze_position[1])
-        
-        # Clamp to bounds
-        x = max(0, min(self.frame_width - 1, x))
-        y = max(0, min(self.frame_height - 1, y))
-        
-        # Draw gaussian blob at gaze position
-        radius = 30
-        y_start = max(0, y - radius)
-        y_end = min(self.frame_height, y + radius)
-        x_start = max(0, x - radius)
-        x_end = min(self.frame_width, x + radius)
-        
-        # Create gaussian kernel
-        kernel_h = y_end - y_start
-        kernel_w = x_end - x_start
-        
-        if kernel_h > 0 and kernel_w > 0:
-            yy, xx = np.ogrid[-radius:radius+1, -radius:radius+1]
-            gaussian = np.exp(-(xx**2 + yy**2) / (2.0 * 15.0**2))
-            
-            gaussian_region = gaussian[
-                max(0, -y_start):max(0, -y_start) + kernel_h,
-                max(0, -x_start):max(0, -x_start) + kernel_w
-            ]
-            
-            self.heatmap[y_start:y_end, x_start:x_end, 0] += gaussian_region * 10.0
-        
-        # Normalize and colorize heatmap
-        heatmap_norm = np.clip(self.heatmap / np.max(self.heatmap + 1e-6) * 255, 0, 255).astype(np.uint8)
-        heatmap_color = cv2.applyColorMap(heatmap_norm, cv2.COLORMAP_JET)
-        
-        # Blend with frame (40% heatmap, 60% frame)
-        output = cv2.addWeighted(frame, 0.6, heatmap_color, 0.4, 0)
-        
-        return output
+        return cv2.LUT(frame, self._blue_light_lut(self.blue_light_level), dst=frame)
     
     def _render_gaze_cursor(
         self,
@@ -271,13 +264,14 @@ class HUDRenderer:
         intent_confidence: Optional[float] = None
     ) -> np.ndarray:
         """Minimal HUD - just FPS and intent"""
+        items = []
         y_offset = 30
         
         # FPS
         if fps is not None:
             fps_text = f"FPS: {fps:.0f}"
-            cv2.putText(frame, fps_text, (10, y_offset), self.font,
-                       self.font_size_normal, self.colors.normal, self.font_thickness_normal)
+            items.append(("text", fps_text, (10, y_offset), self.font,
+                          self.font_size_normal, self.colors.normal, self.font_thickness_normal))
         
         # Intent confidence
         if intent_confidence is not None:
@@ -285,9 +279,10 @@ class HUDRenderer:
             confidence_pct = int(intent_confidence * 100)
             conf_text = f"INTENT: {confidence_pct}%"
             color = self.colors.normal if intent_confidence >= 0.7 else self.colors.warning
-            cv2.putText(frame, conf_text, (10, y_offset), self.font,
-                       self.font_size_normal, color, self.font_thickness_normal)
+            items.append(("text", conf_text, (10, y_offset), self.font,
+                          self.font_size_normal, color, self.font_thickness_normal))
         
+        self.layers.render(frame, "minimal", (0, 0, 400, 80), items)
         return frame
     
     def _render_standard_hud(
@@ -303,44 +298,50 @@ class HUDRenderer:
         """Standard HUD with strain panel and status"""
         
         # Top-left: Mode and backend info
+        items = []
         y = 25
         x = 10
         
         if mode_info:
-            cv2.putText(frame, mode_info, (x, y), self.font,
-                       self.font_size_normal, self.colors.text_primary, self.font_thickness_normal)
+            items.append(("text", mode_info, (x, y), self.font,
+                          self.font_size_normal, self.colors.text_primary, self.font_thickness_normal))
             y += 25
         
         if backend_info:
             backend_str = f"GPU: {backend_info.get('backend', 'CPU')}"
-            cv2.putText(frame, backend_str, (x, y), self.font,
-                       self.font_size_small, self.colors.text_secondary, self.font_thickness_normal)
+            items.append(("text", backend_str, (x, y), self.font,
+                          self.font_size_small, self.colors.text_secondary, self.font_thickness_normal))
             y += 20
         
         if fps is not None:
             fps_text = f"FPS: {fps:.0f}"
-            cv2.putText(frame, fps_text, (x, y), self.font,
-                       self.font_size_small, self.colors.text_secondary, self.font_thickness_normal)
+            items.append(("text", fps_text, (x, y), self.font,
+                          self.font_size_small, self.colors.text_secondary, self.font_thickness_normal))
+        
+        self.layers.render(frame, "status", (0, 0, 640, 90), items)
         
         # Bottom-right: Strain panel
         if strain_metrics:
             self._render_strain_panel(frame, strain_metrics)
         
         # Bottom-left: Gaze position and intent
+        items = []
         y = self.frame_height - 60
         
         if gaze_position is not None:
             pos_text = f"Gaze: ({int(gaze_position[0])}, {int(gaze_position[1])})"
-            cv2.putText(frame, pos_text, (10, y), self.font,
-                       self.font_size_small, self.colors.text_secondary, self.font_thickness_normal)
+            items.append(("text", pos_text, (10, y), self.font,
+                          self.font_size_small, self.colors.text_secondary, self.font_thickness_normal))
             y += 20
         
         if intent_confidence is not None:
             confidence_pct = int(intent_confidence * 100)
             conf_text = f"INTENT: {confidence_pct}%"
             color = self.colors.normal if intent_confidence >= 0.7 else self.colors.warning
-            cv2.putText(frame, conf_text, (10, y), self.font,
-                       self.font_size_normal, color, self.font_thickness_normal)
+            items.append(("text", conf_text, (10, y), self.font,
+                          self.font_size_normal, color, self.font_thickness_normal))
+        
+        self.layers.render(frame, "gaze", (0, self.frame_height - 85, 420, self.frame_height - 25), items)
         
         return frame
     
@@ -350,17 +351,17 @@ class HUDRenderer:
         panel_height = 150
         x = self.frame_width - panel_width - 10
         y = self.frame_height - panel_height - 10
+        rect = (x - 2, y - 2, x + panel_width + 3, y + panel_height + 3)
         
-        # Background
-        cv2.rectangle(frame, (x, y), (x + panel_width, y + panel_height),
-                     self.colors.background_dark, -1)
-        cv2.rectangle(frame, (x, y), (x + panel_width, y + panel_height),
-                     self.colors.text_secondary, 2)
-        
-        # Title
-        cv2.putText(frame, "STRAIN GUARD", (x + 10, y + 20), self.font,
-                   self.font_size_normal, self.colors.info, self.font_thickness_bold)
+        # Background and title (static)
+        background = [
+            ("rect", (x, y), (x + panel_width, y + panel_height), self.colors.background_dark, -1),
+            ("rect", (x, y), (x + panel_width, y + panel_height), self.colors.text_secondary, 2),
+            ("text", "STRAIN GUARD", (x + 10, y + 20), self.font,
+             self.font_size_normal, self.colors.info, self.font_thickness_bold),
+        ]
         
+        items = []
         y_offset = y + 50
         
         # Blink rate
@@ -368,8 +369,8 @@ class HUDRenderer:
             br = strain_metrics["blink_rate"]
             br_text = f"Blink: {br:.1f}/min"
             color = self.colors.normal if 8 <= br <= 20 else self.colors.warning
-            cv2.putText(frame, br_text, (x + 10, y_offset), self.font,
-                       self.font_size_small, color, self.font_thickness_normal)
+            items.append(("text", br_text, (x + 10, y_offset), self.font,
+                          self.font_size_small, color, self.font_thickness_normal))
             y_offset += 25
         
         # PERCLOS
@@ -377,8 +378,8 @@ class HUDRenderer:
             perclos = strain_metrics["perclos"]
             perclos_text = f"PERCLOS: {perclos:.1f}%"
             color = self.colors.normal if perclos < 10 else self.colors.warning
-            cv2.putText(frame, perclos_text, (x + 10, y_offset), self.font,
-                       self.font_size_small, color, self.font_thickness_normal)
+            items.append(("text", perclos_text, (x + 10, y_offset), self.font,
+                          self.font_size_small, color, self.font_thickness_normal))
             y_offset += 25
         
         # Fatigue level
@@ -392,8 +393,10 @@ class HUDRenderer:
                 "ALERT": self.colors.alert
             }
             color = color_map.get(fatigue, self.colors.text_secondary)
-            cv2.putText(frame, fatigue_text, (x + 10, y_offset), self.font,
-                       self.font_size_small, color, self.font_thickness_normal)
+            items.append(("text", fatigue_text, (x + 10, y_offset), self.font,
+                          self.font_size_small, color, self.font_thickness_normal))
+        
+        self.layers.render(frame, "strain_panel", rect, items, background)
     
     def _render_debug_hud(
         self,
@@ -404,7 +407,8 @@ class HUDRenderer:
         strain_metrics: Optional[dict] = None,
         fps: Optional[float] = None,
         backend_info: Optional[dict] = None,
-        mode_info: Optional[str] = None
+        mode_info: Optional[str] = None,
+        stage_timings: Optional[dict] = None
     ) -> np.ndarray:
         """Debug HUD with comprehensive diagnostics"""
         
@@ -418,12 +422,19 @@ class HUDRenderer:
         y = 25
         x = self.frame_width - 300
         
-        cv2.rectangle(frame, (x - 10, 15), (self.frame_width - 5, 300),
-                     self.colors.background_semi, -1)
+        panel_bottom = 300
+        if stage_timings:
+            panel_bottom = max(panel_bottom, 170 + 16 * (len(stage_timings) + 1))
+        rect = (x - 10, 0, self.frame_width, panel_bottom + 5)
         
-        # Debug title
-        cv2.putText(frame, "DEBUG", (x, y), self.font,
-                   self.font_size_small, self.colors.info, self.font_thickness_bold)
+        # Background and title (static)
+        background = [
+            ("rect", (x - 10, 15), (self.frame_width - 5, panel_bottom), self.colors.background_semi, -1),
+            ("text", "DEBUG", (x, y), self.font,
+             self.font_size_small, self.colors.info, self.font_thickness_bold),
+        ]
+        
+        items = []
         y += 25
         
         # Velocity
@@ -431,12 +442,12 @@ class HUDRenderer:
             vx, vy = gaze_velocity
             vel_text = f"Vel: ({vx:.1f}, {vy:.1f}) px/fr"
             speed = np.sqrt(vx**2 + vy**2)
-            cv2.putText(frame, vel_text, (x, y), self.font,
-                       self.font_size_small, self.colors.text_secondary, 1)
+            items.append(("text", vel_text, (x, y), self.font,
+                          self.font_size_small, self.colors.text_secondary, 1))
             y += 18
             speed_text = f"Speed: {speed:.1f} px/fr"
-            cv2.putText(frame, speed_text, (x, y), self.font,
-                       self.font_size_small, self.colors.text_secondary, 1)
+            items.append(("text", speed_text, (x, y), self.font,
+                          self.font_size_small, self.colors.text_secondary, 1))
         
         y += 25
         
@@ -444,11 +455,25 @@ class HUDRenderer:
         if backend_info:
             backend_text = f"Backend: {backend_info.get('backend', 'CPU')}"
             cuda_status = "✓ CUDA" if backend_info.get('cuda_enabled') else "✗ CPU"
-            cv2.putText(frame, backend_text, (x, y), self.font,
-                       self.font_size_small, self.colors.text_secondary, 1)
+            items.append(("text", backend_text, (x, y), self.font,
+                          self.font_size_small, self.colors.text_secondary, 1))
             y += 18
-            cv2.putText(frame, cuda_status, (x, y), self.font,
-                       self.font_size_small, self.colors.normal if backend_info.get('cuda_enabled') else self.colors.warning, 1)
+            items.append(("text", cuda_status, (x, y), self.font,
+                          self.font_size_small, self.colors.normal if backend_info.get('cuda_enabled') else self.colors.warning, 1))
+        
+        # Per-stage latency (ms p50/p95/p99)
+        if stage_timings:
+            y = 170
+            items.append(("text", "Stage ms p50/p95/p99", (x, y), self.font,
+                          self.font_size_small, self.colors.info, 1))
+            for name, stats in stage_timings.items():
+                y += 16
+                stage_text = f"{name[:11]:<11} {stats['p50']:5.1f} {stats['p95']:5.1f} {stats['p99']:5.1f}"
+                color = self.colors.warning if stats['p95'] > 33.0 else self.colors.text_secondary
+                items.append(("text", stage_text, (x, y), self.font,
+                              self.font_size_small, color, 1))
+        
+        self.layers.render(frame, "debug_panel", rect, items, background)
         
         return frame
     
@@ -464,9 +489,17 @@ class HUDRenderer:
         status = "ON" if self.blue_light_filter_enabled else "OFF"
         logger.info(f"Blue-light filter toggled: {status}")
     
+    def set_blue_light_level(self, level: str) -> None:
+        """Select blue-light filter level (see BLUE_LIGHT_LEVELS)"""
+        if level not in self.blue_light_levels:
+            logger.warning(f"Unknown blue-light level '{level}', keeping {self.blue_light_level}")
+            return
+        self.blue_light_level = level
+        self._blue_light_lut(level)
+    
     def reset_heatmap(self) -> None:
-        """Clear heatmap data"""
-        self.heatmap.fill(0)
+        """Clear heatmap display (session counts are kept for export)"""
+        self.heatmap.reset()
         logger.info("Heatmap reset")
     
     def set_mode(self, mode: HUDMode) -> None:
@@ -0,0 +1,233 @@
+"""
+HUD Layer Cache
+Cached overlays for HUD panels that only change when their content does
+A layer is redrawn when its content key changes and is composited into the output
+frame through the tight bounding box of what was drawn, with no full-frame copies
+Part of NeuroGaze Elite
+"""
+
+import logging
+from typing import Dict, Hashable, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+Color = Tuple[int, int, int]
+
+# Draw items for HUDLayer.draw():
+#   ("text", text, org, font, scale, color, thickness)
+#   ("rect", pt1, pt2, color, thickness)
+DrawItem = Tuple
+
+
+class HUDLayer:
+    """
+    One cached overlay covering a fixed region of the frame.
+
+    Usage:
+        if layer.begin(key):            # content changed (or first use)
+            layer.rectangle(...)        # frame coordinates
+            layer.text(...)
+            layer.end()
+        layer.composite(frame)
+
+    Draw calls take the same arguments as their cv2 counterparts, in frame
+    coordinates; anything outside the region is clipped. Each call is drawn
+    onto a black BGR canvas, which leaves premultiplied colour, and in white
+    onto a single-channel coverage mask. (Drawing into the alpha channel of a
+    BGRA image is not usable: antialiased text overwrites alpha with coverage
+    instead of blending it.) Compositing with "over" then matches drawing
+    straight onto the frame to within rounding.
+    """
+
+    # Mostly opaque layers (panels with a few antialiased corner pixels) are
+    # copied and then patched when at most this fraction of pixels is translucent
+    SPARSE_FRACTION = 0.02
+
+    def __init__(self, rect: Tuple[int, int, int, int], frame_size: Tuple[int, int]):
+        """
+        Initialize layer.
+
+        Args:
+            rect: Region (x0, y0, x1, y1) the layer may draw into
+            frame_size: (width, height) of the frames it is composited into
+        """
+        width, height = frame_size
+        x0, y0, x1, y1 = rect
+        self.rect = rect
+        self.x0, self.y0 = max(0, x0), max(0, y0)
+        self.x1, self.y1 = min(width, x1), min(height, y1)
+        shape = (max(0, self.y1 - self.y0), max(0, self.x1 - self.x0))
+        self.canvas = np.zeros(shape + (3,), dtype=np.uint8)
+        self.coverage = np.zeros(shape, dtype=np.uint8)
+        self.key: Optional[Hashable] = None
+        self.redraws = 0
+
+        # Static background (panel box, title) drawn once; redraws start from it
+        self._background_key: Optional[Hashable] = None
+        self._background: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+        # Composite data for the drawn bounding box: frame origin, premultiplied
+        # BGR, and either a dense inverse alpha or the few non-opaque pixels
+        # (both None when every pixel is opaque)
+        self._origin = (0, 0)
+        self._bgr: Optional[np.ndarray] = None
+        self._inv_alpha: Optional[np.ndarray] = None
+        self._sparse: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+
+    def begin(self, key: Hashable, background: Optional[List[DrawItem]] = None) -> bool:
+        """
+        Start a redraw if the content key (or the background) changed.
+
+        Args:
+            key: Content key, compared with the last drawn one
+            background: Static draw items under the content; kept as a
+                        separate cached canvas and only redrawn when they change
+
+        Returns:
+            True if the caller should draw the layer and call end()
+        """
+        background_key = tuple(background) if background else None
+        if key == self.key and background_key == self._background_key:
+            return False
+        self.key = key
+
+        if background_key != self._background_key:
+            self._background_key = background_key
+            self._background = None
+            if background_key is not None:
+                self.canvas.fill(0)
+                self.coverage.fill(0)
+                self.draw(background)
+                self._background = (self.canvas.copy(), self.coverage.copy())
+
+        if self._background is None:
+            self.canvas.fill(0)
+            self.coverage.fill(0)
+        else:
+            np.copyto(self.canvas, self._background[0])
+            np.copyto(self.coverage, self._background[1])
+        return True
+
+    def _local(self, point: Tuple[int, int]) -> Tuple[int, int]:
+        return (int(point[0]) - self.x0, int(point[1]) - self.y0)
+
+    def text(
+        self,
+        text: str,
+        org: Tuple[int, int],
+        font: int,
+        scale: float,
+        color: Color,
+        thickness: int = 1
+    ) -> None:
+        """cv2.putText in frame coordinates"""
+        org = self._local(org)
+        cv2.putText(self.canvas, text, org, font, scale, color, thickness)
+        cv2.putText(self.coverage, text, org, font, scale, 255, thickness)
+
+    def rectangle(
+        self,
+        pt1: Tuple[int, int],
+        pt2: Tuple[int, int],
+        color: Color,
+        thickness: int = 1
+    ) -> None:
+        """cv2.rectangle in frame coordinates"""
+        pt1, pt2 = self._local(pt1), self._local(pt2)
+        cv2.rectangle(self.canvas, pt1, pt2, color, thickness)
+        cv2.rectangle(self.coverage, pt1, pt2, 255, thickness)
+
+    def draw(self, items: List[DrawItem]) -> None:
+        """Draw a list of text / rectangle items in order"""
+        for item in items:
+            if item[0] == "text":
+                self.text(*item[1:])
+            else:
+                self.rectangle(*item[1:])
+
+    def end(self) -> None:
+        """Finish a redraw: crop the drawn pixels for compositing"""
+        self.redraws += 1
+        if self.canvas.size == 0:
+            self._bgr = None
+            return
+        x, y, w, h = cv2.boundingRect(self.coverage)
+        if w == 0 or h == 0:
+            self._bgr = None
+            return
+        self._origin = (self.x0 + x, self.y0 + y)
+        self._bgr = np.ascontiguousarray(self.canvas[y:y + h, x:x + w])
+        inv_alpha = 255 - self.coverage[y:y + h, x:x + w]
+        translucent = cv2.countNonZero(inv_alpha)
+        self._inv_alpha = None
+        self._sparse = None
+        if translucent > self.SPARSE_FRACTION * w * h:
+            self._inv_alpha = cv2.merge((inv_alpha, inv_alpha, inv_alpha))
+        elif translucent > 0:
+            ys, xs = np.nonzero(inv_alpha)
+            self._sparse = (ys, xs, inv_alpha[ys, xs].astype(np.uint16)[:, None])
+
+    def composite(self, frame: np.ndarray) -> None:
+        """Draw the cached overlay onto a frame (in place)"""
+        if self._bgr is None:
+            return
+        x, y = self._origin
+        h, w = self._bgr.shape[:2]
+        roi = frame[y:y + h, x:x + w]
+        if self._inv_alpha is not None:
+            cv2.multiply(roi, self._inv_alpha, dst=roi, scale=1.0 / 255.0)
+            cv2.add(roi, self._bgr, dst=roi)
+        elif self._sparse is not None:
+            ys, xs, inv_alpha = self._sparse
+            under = roi[ys, xs].astype(np.uint16)
+            roi[...] = self._bgr
+            roi[ys, xs] = np.minimum((under * inv_alpha + 127) // 255 + self._bgr[ys, xs], 255)
+        else:
+            roi[...] = self._bgr
+
+
+class LayerCache:
+    """Named HUDLayers for one renderer; a layer is rebuilt when its region changes"""
+
+    def __init__(self, frame_width: int, frame_height: int):
+        self.frame_size = (frame_width, frame_height)
+        self.layers: Dict[str, HUDLayer] = {}
+
+    def get(self, name: str, rect: Tuple[int, int, int, int]) -> HUDLayer:
+        """Layer for 'name' covering rect (x0, y0, x1, y1)"""
+        layer = self.layers.get(name)
+        if layer is None or layer.rect != rect:
+            layer = HUDLayer(rect, self.frame_size)
+            self.layers[name] = layer
+        return layer
+
+    def render(
+        self,
+        frame: np.ndarray,
+        name: str,
+        rect: Tuple[int, int, int, int],
+        items: List[DrawItem],
+        background: Optional[List[DrawItem]] = None
+    ) -> None:
+        """
+        Composite a layer whose content is fully described by its draw items;
+        the items double as the content key, so the layer is redrawn only
+        when a text, colour or position changes. A static background (drawn
+        first) keeps panels opaque, which composites as a plain copy.
+        """
+        layer = self.get(name, rect)
+        if layer.begin(tuple(items), background):
+            layer.draw(items)
+            layer.end()
+        layer.composite(frame)
+
+    def clear(self) -> None:
+        """Drop all cached layers (e.g. after a mode change)"""
+        self.layers.clear()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Redraw count per layer"""
+        return {name: layer.redraws for name, layer in self.layers.items()}
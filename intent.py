@@ -6,14 +6,23 @@ Feature F: Intent confidence score for command execution
 Part of NeuroGaze Elite
 """
 
+import math
+import heapq
 import numpy as np
 import logging
 import time
-from typing import Optional, Tuple
-from collections import deque
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Tuple
+from collections import OrderedDict, deque
 from dataclasses import dataclass
 from enum import Enum
 
+try:
+    import yaml
+    _YAML_AVAILABLE = True
+except ImportError:
+    _YAML_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
 
@@ -35,6 +44,32 @@ class IntentScore:
     reason: str
 
 
+# Integer codes used by the batch scorer (IntentEngine.analyze_intent_batch)
+LEVEL_CODES = {IntentLevel.GLANCE: 0, IntentLevel.NORMAL: 1, IntentLevel.DELIBERATE: 2}
+LEVELS_BY_CODE = {code: level for level, code in LEVEL_CODES.items()}
+
+
+@dataclass
+class IntentBatchScores:
+    """Per-frame intent scores for a whole trajectory (arrays of length T)"""
+    levels: np.ndarray              # int8 codes, see LEVEL_CODES
+    confidence: np.ndarray
+    velocity_score: np.ndarray
+    duration_score: np.ndarray
+    consistency_score: np.ndarray
+    should_execute: np.ndarray      # bool, same rule as should_execute_command
+
+
+@dataclass
+class IntentBatchFeatures:
+    """Threshold-independent per-frame inputs to the batch scorer (arrays of length T)"""
+    speed: np.ndarray
+    speed_stability: np.ndarray
+    dwell_ms: np.ndarray
+    duration_score: np.ndarray
+    consistency_score: np.ndarray
+
+
 class IntentEngine:
     """
     Advanced intent detection engine.
@@ -49,15 +84,44 @@ class IntentEngine:
     # Dwell thresholds
     MIN_DELIBERATE_DWELL_MS = 300.0     # Minimum time for deliberate gaze
     MIN_COMMAND_CONFIDENCE = 0.70       # 70% confidence needed for command
+    DELIBERATE_COMMAND_CONFIDENCE = 0.60
+    
+    # Dwell scoring breakpoints (ms)
+    MIN_FIXATION_MS = 100.0
+    DELIBERATE_FIXATION_MS = 500.0
+    LONG_FIXATION_MS = 1500.0
+    
+    # Position variance thresholds (pixels^2)
+    STABLE_VARIANCE = 100.0
+    NORMAL_VARIANCE = 500.0
+    ERRATIC_VARIANCE = 2000.0
+    
+    # Confidence = weighted velocity / dwell / consistency scores
+    SCORE_WEIGHTS = (0.4, 0.35, 0.25)
+    DELIBERATE_BOOST = 0.2
+    
+    # History windows (frames)
+    HISTORY_SIZE = 30                   # 1 second at 30fps
+    STABILITY_WINDOW = 3                # Speeds used for the stability term
+    MIN_CONSISTENCY_SAMPLES = 5
+    RESYNC_INTERVAL = 1024              # Recompute running stats exactly every N frames
     
     def __init__(self):
         """Initialize intent engine"""
-        # Velocity history for trend analysis
-        self.velocity_history = deque(maxlen=30)  # Last 30 frames (1 second at 30fps)
-        self.speed_history = deque(maxlen=30)
+        # Circular history buffers (preallocated; written in place every frame)
+        n = self.HISTORY_SIZE
+        self._velocity_buf = np.zeros((n, 2))
+        self._speed_buf = np.zeros(n)
+        self._position_buf = np.zeros((n, 2))
+        self._history_index = 0         # Next slot to write
+        self._history_count = 0
         
-        # Gaze position history
-        self.position_history = deque(maxlen=30)
+        # Running mean / M2 (Welford) of the positions in the window, per axis
+        self._mean_x = 0.0
+        self._mean_y = 0.0
+        self._m2_x = 0.0
+        self._m2_y = 0.0
+        self._updates_since_resync = 0
         
         # Dwell tracking
         self.dwell_start_time: Optional[float] = None
@@ -94,12 +158,10 @@ class IntentEngine:
             IntentScore with confidence and reasoning
         """
         vx, vy = current_velocity
-        speed = np.sqrt(vx**2 + vy**2)
+        speed = math.hypot(vx, vy)
         
         # Update history
-        self.velocity_history.append((vx, vy))
-        self.speed_history.append(speed)
-        self.position_history.append(current_position)
+        self._push_history(vx, vy, speed, current_position[0], current_position[1])
         
         # ========== VELOCITY ANALYSIS (GAP 2 FIX) ==========
         velocity_score, velocity_reason = self._analyze_velocity(speed)
@@ -112,7 +174,8 @@ class IntentEngine:
         
         # ========== COMBINED INTENT CLASSIFICATION ==========
         # Weighted combination of indicators
-        confidence = (velocity_score * 0.4 + duration_score * 0.35 + consistency_score * 0.25)
+        w_velocity, w_duration, w_consistency = self.SCORE_WEIGHTS
+        confidence = (velocity_score * w_velocity + duration_score * w_duration + consistency_score * w_consistency)
         
         # Classify intent level
         if speed > self.VELOCITY_THRESHOLD_FAST:
@@ -129,7 +192,7 @@ class IntentEngine:
             # Slow + sustained fixation = deliberate
             level = IntentLevel.DELIBERATE
             reason = f"Deliberate fixation ({dwell_duration_ms:.0f}ms dwell)"
-            confidence = min(1.0, confidence + 0.2)  # Boost confidence for deliberate fixations
+            confidence = min(1.0, confidence + self.DELIBERATE_BOOST)  # Boost confidence for deliberate fixations
             
         else:
             # Ambiguous
@@ -145,6 +208,88 @@ class IntentEngine:
             reason=reason
         )
     
+    def _push_history(self, vx: float, vy: float, speed: float, x: float, y: float) -> None:
+        """Write one frame into the circular buffers and update running statistics (O(1))"""
+        i = self._history_index
+        x = float(x)
+        y = float(y)
+        
+        if self._history_count < self.HISTORY_SIZE:
+            # Window growing: Welford add
+            self._history_count += 1
+            n = self._history_count
+            dx = x - self._mean_x
+            dy = y - self._mean_y
+            self._mean_x += dx / n
+            self._mean_y += dy / n
+            self._m2_x += dx * (x - self._mean_x)
+            self._m2_y += dy * (y - self._mean_y)
+        else:
+            # Window full: replace the oldest sample (same slot) in one step
+            n = self.HISTORY_SIZE
+            old_x = self._position_buf[i, 0]
+            old_y = self._position_buf[i, 1]
+            new_mean_x = self._mean_x + (x - old_x) / n
+            new_mean_y = self._mean_y + (y - old_y) / n
+            self._m2_x += (x - old_x) * (x - new_mean_x + old_x - self._mean_x)
+            self._m2_y += (y - old_y) * (y - new_mean_y + old_y - self._mean_y)
+            self._mean_x = new_mean_x
+            self._mean_y = new_mean_y
+        
+        self._velocity_buf[i, 0] = vx
+        self._velocity_buf[i, 1] = vy
+        self._speed_buf[i] = speed
+        self._position_buf[i, 0] = x
+        self._position_buf[i, 1] = y
+        self._history_index = (i + 1) % self.HISTORY_SIZE
+        
+        # Bound floating-point drift of the sliding updates
+        self._updates_since_resync += 1
+        if self._updates_since_resync >= self.RESYNC_INTERVAL:
+            self._resync_statistics()
+    
+    def _resync_statistics(self) -> None:
+        """Recompute running mean / M2 exactly from the buffer"""
+        self._updates_since_resync = 0
+        n = self._history_count
+        if n == 0:
+            return
+        window = self._position_buf[:n] if n < self.HISTORY_SIZE else self._position_buf
+        self._mean_x = float(window[:, 0].mean())
+        self._mean_y = float(window[:, 1].mean())
+        self._m2_x = float(window[:, 0].var()) * n
+        self._m2_y = float(window[:, 1].var()) * n
+    
+    def _ordered(self, buf: np.ndarray) -> np.ndarray:
+        """Copy of a history buffer in chronological order"""
+        n = self._history_count
+        if n < self.HISTORY_SIZE:
+            return buf[:n].copy()
+        return np.roll(buf, -self._history_index, axis=0)
+    
+    @property
+    def velocity_history(self) -> np.ndarray:
+        """Recent (vx, vy) velocities, oldest first"""
+        return self._ordered(self._velocity_buf)
+    
+    @property
+    def speed_history(self) -> np.ndarray:
+        """Recent speeds, oldest first"""
+        return self._ordered(self._speed_buf)
+    
+    @property
+    def position_history(self) -> np.ndarray:
+        """Recent gaze positions, oldest first"""
+        return self._ordered(self._position_buf)
+    
+    def reset_history(self) -> None:
+        """Clear velocity / position history"""
+        self._history_index = 0
+        self._history_count = 0
+        self._mean_x = self._mean_y = 0.0
+        self._m2_x = self._m2_y = 0.0
+        self._updates_since_resync = 0
+    
     def _analyze_velocity(self, current_speed: float) -> Tuple[float, str]:
         """
         Analyze velocity to determine intentionality.
@@ -156,13 +301,17 @@ class IntentEngine:
         Returns:
             Tuple of (score 0-1, reason)
         """
-        # Calculate trend (is speed increasing/decreasing?)
-        if len(self.speed_history) > 2:
-            recent_speeds = list(self.speed_history)[-3:]
-            speed_trend = recent_speeds[-1] - recent_speeds[0]
-            speed_stability = 1.0 - np.std(recent_speeds) if recent_speeds else 0.5
+        # Stability of the last three speeds (population std, closed form)
+        if self._history_count >= self.STABILITY_WINDOW:
+            last = self._history_index - 1
+            s0 = self._speed_buf[last - 2]
+            s1 = self._speed_buf[last - 1]
+            s2 = self._speed_buf[last]
+            mean = (s0 + s1 + s2) / 3.0
+            speed_stability = 1.0 - math.sqrt(
+                ((s0 - mean) ** 2 + (s1 - mean) ** 2 + (s2 - mean) ** 2) / 3.0
+            )
         else:
-            speed_trend = 0
             speed_stability = 0.5
         
         # Scoring logic
@@ -199,9 +348,9 @@ class IntentEngine:
             Tuple of (score 0-1, reason)
         """
         # Thresholds
-        min_fixation_ms = 100
-        deliberate_fixation_ms = 500
-        long_fixation_ms = 1500
+        min_fixation_ms = self.MIN_FIXATION_MS
+        deliberate_fixation_ms = self.DELIBERATE_FIXATION_MS
+        long_fixation_ms = self.LONG_FIXATION_MS
         
         if dwell_duration_ms < min_fixation_ms:
             dwell_score = 0.2  # Too short to be intentional
@@ -235,20 +384,22 @@ class IntentEngine:
         Returns:
             Tuple of (score 0-1, reason)
         """
-        positions = previous_positions or self.position_history
-        
-        if len(positions) < 5:
-            return 0.5, "Insufficient history"
-        
-        # Calculate variance in recent positions
-        positions_array = np.array(list(positions))
-        position_variance = np.var(positions_array, axis=0)
-        total_variance = np.sum(position_variance)
+        if previous_positions:
+            if len(previous_positions) < self.MIN_CONSISTENCY_SAMPLES:
+                return 0.5, "Insufficient history"
+            # External history: compute directly
+            total_variance = float(np.sum(np.var(np.array(list(previous_positions)), axis=0)))
+        else:
+            n = self._history_count
+            if n < self.MIN_CONSISTENCY_SAMPLES:
+                return 0.5, "Insufficient history"
+            # Running (Welford) variance of the window, O(1)
+            total_variance = (self._m2_x + self._m2_y) / n
         
         # Variance thresholds
-        stable_variance = 100  # Pixels^2 - very stable
-        normal_variance = 500
-        erratic_variance = 2000
+        stable_variance = self.STABLE_VARIANCE
+        normal_variance = self.NORMAL_VARIANCE
+        erratic_variance = self.ERRATIC_VARIANCE
         
         if total_variance < stable_variance:
             consistency_score = 0.95
@@ -268,6 +419,236 @@ class IntentEngine:
         
         return consistency_score, reason
     
+    def analyze_intent_batch(
+        self,
+        velocities: np.ndarray,
+        positions: np.ndarray,
+        dwell_durations_ms: np.ndarray,
+        velocity_slow: Optional[float] = None,
+        velocity_fast: Optional[float] = None,
+        min_deliberate_dwell_ms: Optional[float] = None,
+        weights: Optional[Sequence[float]] = None
+    ) -> IntentBatchScores:
+        """
+        Score a whole recorded trajectory in one vectorised call.
+        Frame t gets the same result as analyze_intent() on a fresh engine fed
+        frames 0..t in order; the engine's own history is not touched.
+        
+        Args:
+            velocities: (T, 2) Kalman velocities in pixels/frame
+            positions: (T, 2) gaze positions
+            dwell_durations_ms: (T,) dwell durations (see compute_dwell_batch)
+            velocity_slow: Override VELOCITY_THRESHOLD_SLOW
+            velocity_fast: Override VELOCITY_THRESHOLD_FAST
+            min_deliberate_dwell_ms: Override MIN_DELIBERATE_DWELL_MS
+            weights: Override SCORE_WEIGHTS (velocity, dwell, consistency)
+            
+        Returns:
+            IntentBatchScores with arrays of length T
+        """
+        features = self.precompute_batch(velocities, positions, dwell_durations_ms)
+        return self.score_batch(
+            features,
+            velocity_slow=velocity_slow,
+            velocity_fast=velocity_fast,
+            min_deliberate_dwell_ms=min_deliberate_dwell_ms,
+            weights=weights
+        )
+    
+    def precompute_batch(
+        self,
+        velocities: np.ndarray,
+        positions: np.ndarray,
+        dwell_durations_ms: np.ndarray
+    ) -> IntentBatchFeatures:
+        """
+        Threshold-independent part of the batch scorer (speed, stability,
+        dwell and consistency scores). Compute once per trajectory, then call
+        score_batch() for each parameter set.
+        """
+        velocities = np.asarray(velocities, dtype=np.float64).reshape(-1, 2)
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+        dwell = np.asarray(dwell_durations_ms, dtype=np.float64).reshape(-1)
+        T = len(velocities)
+        if len(positions) != T or len(dwell) != T:
+            raise ValueError("velocities, positions and dwell_durations_ms must have the same length")
+        
+        speed = np.hypot(velocities[:, 0], velocities[:, 1])
+        
+        # Stability of the last three speeds
+        stability = np.full(T, 0.5)
+        if T >= self.STABILITY_WINDOW:
+            s0, s1, s2 = speed[:-2], speed[1:-1], speed[2:]
+            mean = (s0 + s1 + s2) / 3.0
+            stability[2:] = 1.0 - np.sqrt(((s0 - mean) ** 2 + (s1 - mean) ** 2 + (s2 - mean) ** 2) / 3.0)
+        
+        # Dwell score
+        partial = 0.3 + (dwell - self.MIN_FIXATION_MS) / (self.DELIBERATE_FIXATION_MS - self.MIN_FIXATION_MS) * 0.4
+        duration_score = np.select(
+            [dwell < self.MIN_FIXATION_MS, dwell < self.DELIBERATE_FIXATION_MS, dwell < self.LONG_FIXATION_MS],
+            [0.2, partial, 0.85],
+            0.9
+        )
+        
+        # Consistency score from windowed position variance (centred prefix sums)
+        centred = positions - positions.mean(axis=0) if T else positions
+        csum = np.zeros((T + 1, 2))
+        csq = np.zeros((T + 1, 2))
+        np.cumsum(centred, axis=0, out=csum[1:])
+        np.cumsum(centred * centred, axis=0, out=csq[1:])
+        end = np.arange(1, T + 1)
+        start = np.maximum(0, end - self.HISTORY_SIZE)
+        count = (end - start)[:, None].astype(np.float64)
+        mean = (csum[end] - csum[start]) / count
+        variance = np.maximum(0.0, (csq[end] - csq[start]) / count - mean * mean)
+        total_variance = variance.sum(axis=1)
+        consistency_score = np.select(
+            [total_variance < self.STABLE_VARIANCE,
+             total_variance < self.NORMAL_VARIANCE,
+             total_variance < self.ERRATIC_VARIANCE],
+            [0.95, 0.8, 0.5],
+            0.2
+        )
+        consistency_score[end < self.MIN_CONSISTENCY_SAMPLES] = 0.5
+        
+        return IntentBatchFeatures(
+            speed=speed,
+            speed_stability=stability,
+            dwell_ms=dwell,
+            duration_score=duration_score,
+            consistency_score=consistency_score
+        )
+    
+    def score_batch(
+        self,
+        features: IntentBatchFeatures,
+        velocity_slow: Optional[float] = None,
+        velocity_fast: Optional[float] = None,
+        min_deliberate_dwell_ms: Optional[float] = None,
+        weights: Optional[Sequence[float]] = None,
+        min_command_confidence: Optional[float] = None,
+        deliberate_command_confidence: Optional[float] = None
+    ) -> IntentBatchScores:
+        """
+        Classify precomputed features with the given thresholds (defaults: engine attributes).
+        
+        Args:
+            features: Output of precompute_batch()
+            velocity_slow: Override VELOCITY_THRESHOLD_SLOW
+            velocity_fast: Override VELOCITY_THRESHOLD_FAST
+            min_deliberate_dwell_ms: Override MIN_DELIBERATE_DWELL_MS
+            weights: Override SCORE_WEIGHTS (velocity, dwell, consistency)
+            min_command_confidence: Override MIN_COMMAND_CONFIDENCE
+            deliberate_command_confidence: Override DELIBERATE_COMMAND_CONFIDENCE
+            
+        Returns:
+            IntentBatchScores with arrays of length T
+        """
+        slow = self.VELOCITY_THRESHOLD_SLOW if velocity_slow is None else velocity_slow
+        fast = self.VELOCITY_THRESHOLD_FAST if velocity_fast is None else velocity_fast
+        min_dwell = self.MIN_DELIBERATE_DWELL_MS if min_deliberate_dwell_ms is None else min_deliberate_dwell_ms
+        w_velocity, w_duration, w_consistency = self.SCORE_WEIGHTS if weights is None else weights
+        normal_min = self.MIN_COMMAND_CONFIDENCE if min_command_confidence is None else min_command_confidence
+        deliberate_min = (
+            self.DELIBERATE_COMMAND_CONFIDENCE if deliberate_command_confidence is None
+            else deliberate_command_confidence
+        )
+        speed = features.speed
+        
+        velocity_base = np.where(
+            speed < slow, 0.9,
+            np.where(speed < fast, 0.5 + (1.0 - speed / fast) * 0.3, 0.1)
+        )
+        velocity_score = np.minimum(1.0, velocity_base * 0.7 + features.speed_stability * 0.3)
+        
+        confidence = (
+            velocity_score * w_velocity
+            + features.duration_score * w_duration
+            + features.consistency_score * w_consistency
+        )
+        glance = speed > fast
+        deliberate = ~glance & (speed < slow) & (features.dwell_ms >= min_dwell)
+        levels = np.full(len(speed), LEVEL_CODES[IntentLevel.NORMAL], dtype=np.int8)
+        levels[glance] = LEVEL_CODES[IntentLevel.GLANCE]
+        levels[deliberate] = LEVEL_CODES[IntentLevel.DELIBERATE]
+        confidence = np.minimum(1.0, np.where(deliberate, confidence + self.DELIBERATE_BOOST, confidence))
+        
+        should_execute = np.where(
+            deliberate,
+            confidence >= deliberate_min,
+            ~glance & (confidence >= normal_min)
+        )
+        
+        return IntentBatchScores(
+            levels=levels,
+            confidence=confidence,
+            velocity_score=velocity_score,
+            duration_score=features.duration_score,
+            consistency_score=features.consistency_score,
+            should_execute=should_execute
+        )
+    
+    def apply_params(self, params: Dict[str, object]) -> None:
+        """
+        Override thresholds on this engine (e.g. tuned values from a UserProfile).
+        
+        Args:
+            params: Any of velocity_slow, velocity_fast, min_deliberate_dwell_ms,
+                    weights, min_command_confidence, deliberate_command_confidence
+        """
+        attributes = {
+            "velocity_slow": "VELOCITY_THRESHOLD_SLOW",
+            "velocity_fast": "VELOCITY_THRESHOLD_FAST",
+            "min_deliberate_dwell_ms": "MIN_DELIBERATE_DWELL_MS",
+            "min_command_confidence": "MIN_COMMAND_CONFIDENCE",
+            "deliberate_command_confidence": "DELIBERATE_COMMAND_CONFIDENCE",
+        }
+        for key, value in params.items():
+            if key == "weights":
+                self.SCORE_WEIGHTS = tuple(float(w) for w in value)
+            elif key in attributes:
+                setattr(self, attributes[key], float(value))
+            else:
+                logger.warning(f"Unknown intent parameter '{key}' ignored")
+    
+    @staticmethod
+    def compute_dwell_batch(
+        positions: np.ndarray,
+        timestamps: np.ndarray,
+        dwell_radius: float = 50
+    ) -> np.ndarray:
+        """
+        Dwell durations for a recorded trajectory (same rule as update_dwell).
+        
+        Args:
+            positions: (T, 2) gaze positions
+            timestamps: (T,) timestamps in seconds
+            dwell_radius: Radius to consider as same fixation point
+            
+        Returns:
+            (T,) dwell durations in milliseconds
+        """
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+        timestamps = np.asarray(timestamps, dtype=np.float64).reshape(-1)
+        dwell = np.zeros(len(positions))
+        if len(positions) == 0:
+            return dwell
+        
+        # Anchor resets are sequential; loop over plain floats
+        xs = positions[:, 0].tolist()
+        ys = positions[:, 1].tolist()
+        ts = timestamps.tolist()
+        anchor_x, anchor_y, anchor_t = xs[0], ys[0], ts[0]
+        radius_sq = dwell_radius * dwell_radius
+        for i in range(1, len(xs)):
+            dx = xs[i] - anchor_x
+            dy = ys[i] - anchor_y
+            if dx * dx + dy * dy > radius_sq:
+                anchor_x, anchor_y, anchor_t = xs[i], ys[i], ts[i]
+            else:
+                dwell[i] = (ts[i] - anchor_t) * 1000.0
+        return dwell
+    
     def should_execute_command(self, intent_score: IntentScore) -> Tuple[bool, str]:
         """
         Determine if command should be executed based on intent analysis.
@@ -285,7 +666,7 @@ class IntentEngine:
             reason = "Quick glance detected - suppressed"
             
         elif intent_score.level == IntentLevel.DELIBERATE:
-            should_execute = intent_score.confidence >= 0.60
+            should_execute = intent_score.confidence >= self.DELIBERATE_COMMAND_CONFIDENCE
             reason = f"Deliberate gaze (confidence {intent_score.confidence:.0%})"
             
         else:  # NORMAL
@@ -297,7 +678,8 @@ class IntentEngine:
     def update_dwell(
         self,
         current_position: Tuple[float, float],
-        dwell_radius: int = 50
+        dwell_radius: int = 50,
+        timestamp: Optional[float] = None
     ) -> float:
         """
         Update dwell tracking and return dwell duration.
@@ -305,11 +687,12 @@ class IntentEngine:
         Args:
             current_position: Current gaze position
             dwell_radius: Radius to consider as same fixation point
+            timestamp: Sample time in seconds on the frame clock (time.time() if None)
             
         Returns:
             Dwell duration in milliseconds
         """
-        current_time = time.time()
+        current_time = time.time() if timestamp is None else timestamp
         
         if self.dwell_position is None:
             # Start new fixation
@@ -375,23 +758,80 @@ class IntentEngine:
         self.false_positives = 0
 
 
+def load_command_cooldowns(path: Optional[Path] = None) -> Dict[str, float]:
+    """
+    Read per-command cooldowns from the command_cooldowns section of gestures.yaml.
+    
+    Args:
+        path: YAML file (defaults to gestures.yaml next to this module)
+        
+    Returns:
+        {command: cooldown_ms}; the "default" key, if present, is the global cooldown
+    """
+    path = Path(path) if path is not None else Path(__file__).parent / "gestures.yaml"
+    if not _YAML_AVAILABLE or not path.exists():
+        return {}
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            section = (yaml.safe_load(f) or {}).get("command_cooldowns") or {}
+        return {str(name): float(ms) for name, ms in section.items()}
+    except Exception as exc:
+        logger.warning(f"Could not read command cooldowns from {path}: {exc}")
+        return {}
+
+
 class CommandGatekeeper:
     """
     Smart command queue with deduplication and priority system.
     Feature G: Deduplicates rapid-fire commands and prioritizes critical commands.
+    
+    Commands are kept in a heap ordered by (priority, arrival), so push/pop are
+    O(log n) and equal-priority commands leave in FIFO order. A second heap
+    finds the eviction victim when the queue is full; removed entries are
+    marked dead and skipped lazily. Critical commands (priority >= CRITICAL_PRIORITY)
+    are never evicted, may exceed max_queue_depth, and a pending critical command
+    is not queued twice.
     """
     
-    def __init__(self, max_queue_depth: int = 5, cooldown_ms: float = 300.0):
+    CRITICAL_PRIORITY = 900
+    DEDUP_CAPACITY = 256  # Max commands tracked for cooldown
+    
+    def __init__(
+        self,
+        max_queue_depth: int = 5,
+        cooldown_ms: float = 300.0,
+        cooldown_overrides: Optional[Dict[str, float]] = None
+    ):
         """
         Initialize command gatekeeper.
         
         Args:
             max_queue_depth: Maximum queue length before dropping low-priority
             cooldown_ms: Minimum time between identical commands
+            cooldown_overrides: Per-command cooldowns in ms (see load_command_cooldowns)
         """
-        self.queue = deque(maxlen=max_queue_depth)
+        self.max_queue_depth = max_queue_depth
         self.cooldown_ms = cooldown_ms
-        self.last_commands = {}  # Track command timestamps
+        self.cooldown_overrides = dict(cooldown_overrides or {})
+        
+        # Both heaps hold (key, seq, entry) with entry = [name, alive, timestamps, position]
+        # shared between them
+        self._pop_heap: list = []       # key = -priority
+        self._evict_heap: list = []     # key = priority
+        self._seq = 0
+        self._size = 0
+        self._pending_critical: Dict[str, list] = {}
+        
+        # Last accepted time per command, oldest first (bounded, expired lazily)
+        self.last_commands: "OrderedDict[str, float]" = OrderedDict()
+        self._max_cooldown_ms = max([cooldown_ms, *self.cooldown_overrides.values()])
+        
+        # Monitoring counters
+        self.accepted = 0
+        self.deduplicated = 0
+        self.evicted = 0
+        self.rejected = 0
+        self.max_depth_seen = 0
         
         # Priority levels
         self.priority = {
@@ -411,59 +851,155 @@ class CommandGatekeeper:
             "VOLUME_DOWN": 200,
         }
     
-    def add_command(self, command_name: str) -> bool:
+    def cooldown_for(self, command_name: str) -> float:
+        """Cooldown in ms for a command"""
+        return self.cooldown_overrides.get(command_name, self.cooldown_ms)
+    
+    def _expire_cooldowns(self, now_ms: float) -> None:
+        last = self.last_commands
+        while last:
+            stamp = next(iter(last.values()))
+            if now_ms - stamp < self._max_cooldown_ms and len(last) <= self.DEDUP_CAPACITY:
+                break
+            last.popitem(last=False)
+    
+    def add_command(
+        self,
+        command_name: str,
+        timestamps: Optional[Dict[str, float]] = None,
+        now: Optional[float] = None,
+        position: Optional[Tuple[float, float]] = None
+    ) -> bool:
         """
         Add command to queue if not duplicate.
         
         Args:
             command_name: Name of command to add
+            timestamps: Optional latency timestamps (time.time() clock) carried with
+                        the command; "enqueue" is added on acceptance
+            now: Decision time in seconds for cooldowns (e.g. the frame clock);
+                 time.monotonic() if None. Use one clock per gatekeeper.
+            position: Optional screen target (pixels) for pointer commands
             
         Returns:
             True if command was added, False if deduplicated/dropped
         """
-        current_time = time.time() * 1000  # milliseconds
+        current_time = (time.monotonic() if now is None else now) * 1000.0  # milliseconds
+        self._expire_cooldowns(current_time)
+        priority = self.priority.get(command_name, 0)
+        critical = priority >= self.CRITICAL_PRIORITY
         
         # Check for recent duplicate
-        if command_name in self.last_commands:
-            time_since_last = current_time - self.last_commands[command_name]
-            if time_since_last < self.cooldown_ms:
-                return False  # Deduplicated
-        
-        # If queue is full, drop lowest priority command
-        if len(self.queue) >= self.queue.maxlen:
-            # Remove lowest priority
-            if self.queue:
-                lowest = min(self.queue, key=lambda cmd: self.priority.get(cmd, 0))
-                self.queue.remove(lowest)
-        
-        self.queue.append(command_name)
+        last_time = self.last_commands.get(command_name)
+        if last_time is not None and current_time - last_time < self.cooldown_for(command_name):
+            self.deduplicated += 1
+            return False
+        if critical and command_name in self._pending_critical:
+            self.deduplicated += 1
+            return False
+        
+        # If queue is full, drop lowest priority command (critical ones are never dropped)
+        if self._size >= self.max_queue_depth and not critical:
+            victim = self._peek(self._evict_heap)
+            if victim is None or victim[0] >= self.CRITICAL_PRIORITY or victim[0] > priority:
+                self.rejected += 1
+                return False
+            self._discard(victim[2])
+            self.evicted += 1
+        
+        timestamps = dict(timestamps) if timestamps else {}
+        timestamps["enqueue"] = time.time()
+        entry = [command_name, True, timestamps, position]
+        heapq.heappush(self._pop_heap, (-priority, self._seq, entry))
+        heapq.heappush(self._evict_heap, (priority, self._seq, entry))
+        self._seq += 1
+        self._size += 1
+        if critical:
+            self._pending_critical[command_name] = entry
+        
         self.last_commands[command_name] = current_time
+        self.last_commands.move_to_end(command_name)
+        self.accepted += 1
+        if self._size > self.max_depth_seen:
+            self.max_depth_seen = self._size
         
         return True
     
+    @staticmethod
+    def _peek(heap: list) -> Optional[tuple]:
+        """Top live item of a heap (dead entries are popped on the way)"""
+        while heap:
+            if heap[0][2][1]:
+                return heap[0]
+            heapq.heappop(heap)
+        return None
+    
+    def _discard(self, entry: list) -> None:
+        entry[1] = False
+        self._size -= 1
+        if self._pending_critical.get(entry[0]) is entry:
+            del self._pending_critical[entry[0]]
+        
+        # Dead entries below the top are only skipped lazily; rebuild if they pile up
+        for heap in (self._pop_heap, self._evict_heap):
+            if len(heap) > 2 * self._size + 16:
+                heap[:] = [item for item in heap if item[2][1]]
+                heapq.heapify(heap)
+    
     def get_next_command(self) -> Optional[str]:
         """
-        Get next command from queue (highest priority).
+        Get next command from queue (highest priority, oldest first).
         
         Returns:
             Next command name or None if queue is empty
         """
-        if not self.queue:
-            return None
+        entry = self.get_next_entry()
+        return entry[0] if entry is not None else None
+    
+    def get_next_entry(
+        self
+    ) -> Optional[Tuple[str, Dict[str, float], Optional[Tuple[float, float]]]]:
+        """
+        Like get_next_command, but also returns the command's timestamps and target.
         
-        # Find highest priority command
-        next_cmd = max(self.queue, key=lambda cmd: self.priority.get(cmd, 0))
-        self.queue.remove(next_cmd)
+        Returns:
+            (command name, timestamps, screen position or None) or None if queue is empty
+        """
+        item = self._peek(self._pop_heap)
+        if item is None:
+            return None
+        heapq.heappop(self._pop_heap)
+        self._discard(item[2])
         
-        return next_cmd
+        return item[2][0], item[2][2], item[2][3]
     
     def queue_size(self) -> int:
         """Get current queue size"""
-        return len(self.queue)
+        return self._size
     
     def clear_queue(self) -> None:
         """Clear all queued commands"""
-        self.queue.clear()
+        for item in self._pop_heap:
+            item[2][1] = False
+        self._pop_heap.clear()
+        self._evict_heap.clear()
+        self._pending_critical.clear()
+        self._size = 0
+    
+    def reset_cooldowns(self) -> None:
+        """Forget recent commands so they can be issued again immediately"""
+        self.last_commands.clear()
+    
+    def get_stats(self) -> dict:
+        """Queue depth and drop counters for monitoring"""
+        return {
+            "depth": self._size,
+            "max_depth": self.max_depth_seen,
+            "accepted": self.accepted,
+            "deduplicated": self.deduplicated,
+            "evicted": self.evicted,
+            "rejected": self.rejected,
+        }
 
 
 if __name__ == "__main__":
@@ -0,0 +1,409 @@
+"""
+Intent Threshold Autotuner
+Searches IntentEngine thresholds and score weights against labelled recorded
+gaze sessions and stores the best set in the user's profile
+
+Usage:
+  python intent_tuner.py sessions/ --user default_user
+  python intent_tuner.py a.npz b.npz --grid grid.json --workers 8 --report tuning.json --dry-run
+
+Session files (.npz or .csv), one row per frame:
+  timestamps  (T,)    capture time in seconds
+  positions   (T, 2)  gaze position in screen pixels
+  labels      (T,)    1 where the user meant to issue a command, else 0
+  velocities  (T, 2)  optional Kalman velocity (px/frame); when absent the
+                      positions are treated as raw gaze and run through the
+                      same adaptive Kalman filter as the live app
+CSV columns: timestamp,x,y,label[,vx,vy]. An .npz may also carry
+screen_width / screen_height for the Kalman clamp.
+
+Each session's threshold-independent features are computed once
+(IntentEngine.precompute_batch); every configuration is then a handful of
+array operations (IntentEngine.score_batch) on the concatenated sessions,
+with configurations split across worker processes.
+
+Frames are scored with the live app's rule: a command fires when the intent
+confidence reaches the fusion engine's confidence_threshold, which the app
+takes from the tuned min_command_confidence. Untuned parameters, and the
+baseline, use the values the app runs with (dwell time from config.yaml).
+
+Part of NeuroGaze Elite
+"""
+
+from __future__ import annotations
+
+import os
+import json
+import time
+import logging
+import argparse
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Any
+
+import numpy as np
+
+from fusion import FusionConfig
+from intent import IntentEngine, IntentBatchFeatures
+from smoother import BatchKalmanGaze
+
+try:
+    import yaml
+    _YAML_AVAILABLE = True
+except Exception:
+    _YAML_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Search space; weights are (velocity, dwell, consistency) and sum to 1
+DEFAULT_GRID: Dict[str, List[Any]] = {
+    "velocity_slow": [4.0, 6.0, 8.0, 10.0, 12.0, 15.0, 20.0],
+    "velocity_fast": [40.0, 60.0, 80.0, 100.0, 120.0],
+    "min_deliberate_dwell_ms": [150.0, 200.0, 300.0, 400.0, 500.0, 700.0, 900.0],
+    "min_command_confidence": [0.60, 0.65, 0.70, 0.75, 0.80],
+    "weights": [
+        (round(wv, 2), round(wd, 2), round(1.0 - wv - wd, 2))
+        for wv in (0.2, 0.3, 0.4, 0.5, 0.6)
+        for wd in (0.2, 0.3, 0.4, 0.5, 0.6)
+        if 1.0 - wv - wd >= 0.1 - 1e-9
+    ],
+}
+
+# Precision-weighted objective: a false command costs more than a missed one
+DEFAULT_BETA = 0.5
+
+# main_app.AppConfig.DWELL_TIME default (seconds), used when config.yaml has none
+APP_DWELL_TIME_S = 1.2
+
+
+def app_params(config_path: Optional[Path] = None) -> Dict[str, Any]:
+    """
+    Intent parameters the live app runs with before tuning.
+
+    Args:
+        config_path: App config (config.yaml next to this file if None)
+
+    Returns:
+        Params for IntentEngine.apply_params: min_deliberate_dwell_ms from
+        gaze.dwell_time, min_command_confidence from the fusion threshold
+    """
+    dwell_time = APP_DWELL_TIME_S
+    config_path = Path(__file__).parent / "config.yaml" if config_path is None else Path(config_path)
+    if config_path.exists() and _YAML_AVAILABLE:
+        try:
+            with config_path.open("r", encoding="utf-8") as f:
+                gaze = (yaml.safe_load(f) or {}).get("gaze", {})
+            dwell_time = float(gaze.get("dwell_time", dwell_time))
+        except Exception as exc:
+            logger.warning(f"Could not read {config_path.name}: {exc}")
+    return {
+        "min_deliberate_dwell_ms": dwell_time * 1000.0,
+        "min_command_confidence": FusionConfig().confidence_threshold,
+    }
+
+
+@dataclass
+class LabelledSession:
+    """One recorded trajectory with per-frame intent labels"""
+    name: str
+    timestamps: np.ndarray
+    positions: np.ndarray
+    velocities: np.ndarray
+    labels: np.ndarray
+
+
+def load_session(path: Path) -> LabelledSession:
+    """
+    Load a labelled gaze session (.npz or .csv).
+
+    Args:
+        path: Session file
+
+    Returns:
+        LabelledSession with Kalman positions / velocities
+    """
+    path = Path(path)
+    screen_width = screen_height = None
+    if path.suffix == ".npz":
+        with np.load(path) as data:
+            timestamps = np.asarray(data["timestamps"], dtype=np.float64)
+            positions = np.asarray(data["positions"], dtype=np.float64).reshape(-1, 2)
+            labels = np.asarray(data["labels"]).astype(bool)
+            velocities = (
+                np.asarray(data["velocities"], dtype=np.float64).reshape(-1, 2)
+                if "velocities" in data.files else None
+            )
+            if "screen_width" in data.files and "screen_height" in data.files:
+                screen_width = float(data["screen_width"])
+                screen_height = float(data["screen_height"])
+    elif path.suffix == ".csv":
+        table = np.genfromtxt(path, delimiter=",", names=True)
+        timestamps = np.asarray(table["timestamp"], dtype=np.float64)
+        positions = np.column_stack([table["x"], table["y"]]).astype(np.float64)
+        labels = np.asarray(table["label"]).astype(bool)
+        names = table.dtype.names
+        velocities = (
+            np.column_stack([table["vx"], table["vy"]]).astype(np.float64)
+            if "vx" in names and "vy" in names else None
+        )
+    else:
+        raise ValueError(f"Unsupported session format: {path}")
+
+    if not (len(timestamps) == len(positions) == len(labels)):
+        raise ValueError(f"{path.name}: timestamps, positions and labels differ in length")
+
+    if velocities is None:
+        # Raw gaze: filter it the way the live app does
+        tracker = BatchKalmanGaze(1, screen_width=screen_width, screen_height=screen_height, use_adaptive=True)
+        filtered, velocity = tracker.filter_sequence(positions[:, None, :])
+        positions = filtered[:, 0]
+        velocities = velocity[:, 0]
+    elif len(velocities) != len(positions):
+        raise ValueError(f"{path.name}: velocities and positions differ in length")
+
+    return LabelledSession(
+        name=path.stem,
+        timestamps=timestamps,
+        positions=positions,
+        velocities=velocities,
+        labels=labels
+    )
+
+
+def find_sessions(paths: Sequence[Path]) -> List[Path]:
+    """Expand directories into their .npz / .csv session files"""
+    files: List[Path] = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            files.extend(sorted(p for p in path.iterdir() if p.suffix in (".npz", ".csv")))
+        else:
+            files.append(path)
+    return files
+
+
+def expand_grid(grid: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    """
+    Cartesian product of a parameter grid.
+    Combinations with velocity_slow >= velocity_fast are skipped.
+    """
+    keys = list(grid)
+    configs = []
+    for values in itertools.product(*(grid[k] for k in keys)):
+        config = dict(zip(keys, values))
+        if config.get("velocity_slow", 0.0) >= config.get("velocity_fast", float("inf")):
+            continue
+        if "weights" in config:
+            config["weights"] = tuple(float(w) for w in config["weights"])
+        configs.append(config)
+    return configs
+
+
+def concatenate_features(
+    engine: IntentEngine,
+    sessions: Sequence[LabelledSession],
+    dwell_radius: float = 50
+) -> Tuple[IntentBatchFeatures, np.ndarray]:
+    """
+    Threshold-independent features for all sessions, concatenated.
+    Features are computed per session, so history never crosses a session boundary.
+    """
+    parts = []
+    for session in sessions:
+        dwell = IntentEngine.compute_dwell_batch(session.positions, session.timestamps, dwell_radius)
+        parts.append(engine.precompute_batch(session.velocities, session.positions, dwell))
+    features = IntentBatchFeatures(
+        speed=np.concatenate([p.speed for p in parts]),
+        speed_stability=np.concatenate([p.speed_stability for p in parts]),
+        dwell_ms=np.concatenate([p.dwell_ms for p in parts]),
+        duration_score=np.concatenate([p.duration_score for p in parts]),
+        consistency_score=np.concatenate([p.consistency_score for p in parts])
+    )
+    labels = np.concatenate([s.labels for s in sessions])
+    return features, labels
+
+
+def evaluate(
+    engine: IntentEngine,
+    features: IntentBatchFeatures,
+    labels: np.ndarray,
+    config: Dict[str, Any],
+    beta: float = DEFAULT_BETA
+) -> Tuple[float, float, float]:
+    """
+    Score one configuration.
+
+    Returns:
+        (f_beta, precision, recall) of fired commands against the labels
+    """
+    config = dict(config)
+    # The app fires on fusion's rule: intent confidence >= confidence_threshold
+    threshold = config.pop("min_command_confidence", engine.MIN_COMMAND_CONFIDENCE)
+    should_execute = engine.score_batch(features, **config).confidence >= threshold
+    true_pos = int(np.count_nonzero(should_execute & labels))
+    predicted = int(np.count_nonzero(should_execute))
+    actual = int(np.count_nonzero(labels))
+    precision = true_pos / predicted if predicted else 0.0
+    recall = true_pos / actual if actual else 0.0
+    beta_sq = beta * beta
+    denom = beta_sq * precision + recall
+    f_beta = (1.0 + beta_sq) * precision * recall / denom if denom > 0 else 0.0
+    return f_beta, precision, recall
+
+
+# Worker process state, set once by _init_worker (features are pickled once per worker)
+_WORKER_STATE: Dict[str, Any] = {}
+
+
+def _init_worker(
+    features: IntentBatchFeatures,
+    labels: np.ndarray,
+    beta: float,
+    base_params: Dict[str, Any]
+) -> None:
+    engine = IntentEngine()
+    engine.apply_params(base_params)
+    _WORKER_STATE["engine"] = engine
+    _WORKER_STATE["features"] = features
+    _WORKER_STATE["labels"] = labels
+    _WORKER_STATE["beta"] = beta
+
+
+def _evaluate_chunk(configs: List[Dict[str, Any]]) -> np.ndarray:
+    state = _WORKER_STATE
+    results = np.empty((len(configs), 3))
+    for i, config in enumerate(configs):
+        results[i] = evaluate(state["engine"], state["features"], state["labels"], config, state["beta"])
+    return results
+
+
+def search(
+    sessions: Sequence[LabelledSession],
+    grid: Optional[Dict[str, List[Any]]] = None,
+    workers: Optional[int] = None,
+    beta: float = DEFAULT_BETA,
+    dwell_radius: float = 50,
+    base_params: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Exhaustive search over a parameter grid.
+
+    Args:
+        sessions: Labelled sessions
+        grid: Parameter grid (DEFAULT_GRID if None; missing keys keep engine defaults)
+        workers: Worker processes (os.cpu_count() if None, 1 = in-process)
+        beta: F-beta objective weight (< 1 favours precision)
+        dwell_radius: Dwell radius in pixels (as in IntentEngine.update_dwell)
+        base_params: Values for the baseline and for keys missing from the grid
+                     (app_params() if None)
+
+    Returns:
+        Report dict with the best parameters, baseline and search statistics
+    """
+    if not sessions:
+        raise ValueError("No sessions to tune on")
+    grid = DEFAULT_GRID if grid is None else grid
+    configs = expand_grid(grid)
+    if not configs:
+        raise ValueError("Parameter grid is empty")
+    workers = max(1, workers or os.cpu_count() or 1)
+
+    base_params = app_params() if base_params is None else base_params
+
+    engine = IntentEngine()
+    engine.apply_params(base_params)
+    features, labels = concatenate_features(engine, sessions, dwell_radius)
+    baseline = evaluate(engine, features, labels, {}, beta)
+
+    start = time.perf_counter()
+    if workers == 1:
+        _init_worker(features, labels, beta, base_params)
+        results = _evaluate_chunk(configs)
+    else:
+        # A few chunks per worker keeps the pool balanced
+        chunk_size = max(1, len(configs) // (workers * 4))
+        chunks = [configs[i:i + chunk_size] for i in range(0, len(configs), chunk_size)]
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(features, labels, beta, base_params)
+        ) as pool:
+            results = np.concatenate(list(pool.map(_evaluate_chunk, chunks)))
+    elapsed = time.perf_counter() - start
+
+    best = int(np.argmax(results[:, 0]))
+    best_params = dict(configs[best])
+    if "weights" in best_params:
+        best_params["weights"] = list(best_params["weights"])
+
+    return {
+        "sessions": [s.name for s in sessions],
+        "frames": int(len(labels)),
+        "labelled_frames": int(np.count_nonzero(labels)),
+        "configurations": len(configs),
+        "workers": workers,
+        "search_s": round(elapsed, 3),
+        "beta": beta,
+        "base_params": dict(base_params),
+        "baseline": dict(zip(("f_beta", "precision", "recall"), baseline)),
+        "best": dict(zip(("f_beta", "precision", "recall"), results[best].tolist())),
+        "params": best_params,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="NeuroGaze intent threshold autotuner")
+    parser.add_argument("sessions", nargs="+", type=Path, help="Session files or directories")
+    parser.add_argument("--user", default="default_user", help="Profile to update")
+    parser.add_argument("--profile-dir", type=Path, default=None, help="Profile directory (default ~/.neurogaze/profiles)")
+    parser.add_argument("--grid", type=Path, default=None, help="JSON parameter grid (overrides DEFAULT_GRID keys)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--beta", type=float, default=DEFAULT_BETA, help="F-beta objective (<1 favours precision)")
+    parser.add_argument("--report", type=Path, default=None, help="Write the tuning report as JSON")
+    parser.add_argument("--dry-run", action="store_true", help="Do not update the profile")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+
+    grid = dict(DEFAULT_GRID)
+    if args.grid is not None:
+        with args.grid.open("r", encoding="utf-8") as f:
+            grid.update(json.load(f))
+
+    files = find_sessions(args.sessions)
+    if not files:
+        logger.error("No session files found")
+        return 1
+    sessions = [load_session(path) for path in files]
+    logger.info(f"Loaded {len(sessions)} session(s), {sum(len(s.labels) for s in sessions)} frames")
+
+    report = search(sessions, grid=grid, workers=args.workers, beta=args.beta)
+    logger.info(
+        f"{report['configurations']} configurations in {report['search_s']:.1f}s "
+        f"on {report['workers']} worker(s)"
+    )
+    logger.info(
+        f"Baseline F{args.beta:g} {report['baseline']['f_beta']:.3f} -> "
+        f"best {report['best']['f_beta']:.3f} "
+        f"(precision {report['best']['precision']:.3f}, recall {report['best']['recall']:.3f})"
+    )
+    logger.info(f"Parameters: {report['params']}")
+
+    if args.report is not None:
+        with args.report.open("w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if not args.dry_run:
+        from calibration import UserProfileManager
+
+        manager = UserProfileManager(args.profile_dir)
+        profile = manager.load_profile(args.user) or manager.create_new_profile(args.user)
+        manager.update_profile_intent(profile, report["params"], report["best"]["f_beta"])
+        manager.save_profile(profile)
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
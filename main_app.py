@@ -5,12 +5,15 @@ Part of the NeuroGaze Elite comprehensive rebuild
 """
 
 import os
+import sys
 import time
 import logging
+import threading
 import argparse
 import platform
+from concurrent.futures import ThreadPoolExecutor, Future
 from pathlib import Path
-from typing import Optional, Tuple, Dict
+from typing import Optional, Tuple, Dict, List
 from collections import deque
 from dataclasses import dataclass, field
 
@@ -22,13 +25,19 @@ from mediapipe.tasks.python import vision
 
 # Import all NeuroGaze Elite modules
 from pipeline import CUDAPipeline
+from capture import ThreadedCameraCapture
+from profiler import StageProfiler
+from scheduler import StageScheduler
+from control import ControlChannel, COMMAND_KEYS
+from dispatcher import CommandDispatcher
 from eye_health import StrainGuard, StrainGuardConfig
 from calibration import AdaptiveEARCalibrator, UserProfileManager, CalibrationScreenManager
 from smoother import KalmanGaze, KalmanState
-from intent import IntentEngine, CommandGatekeeper, IntentLevel
+from intent import IntentEngine, CommandGatekeeper, IntentLevel, load_command_cooldowns
 from worker import CommandWorkerProcess, CommandType, cross_platform_beep
 from hud import HUDRenderer, HUDMode
-from gaze_inference import DLInferenceEngine, CrossValidationResult
+from display import HUDDisplay, RenderState
+from gaze_inference import DLInferenceEngine, CrossValidationResult, GazeInferenceResult
 
 # Hand gesture modules
 from hand_engine import HandGestureEngine, GestureConfig as HandGestureConfig
@@ -80,6 +89,23 @@ class AppConfig:
     DWELL_TIME: float = 1.2
     SMOOTHING_FRAMES: int = 3
     SIMULATION_MODE: bool = True
+    CAPTURE_RING_SIZE: int = 3
+    DL_ASYNC: bool = True
+    FACE_RUNNING_MODE: str = "VIDEO"
+    GAZE_PREDICTION: bool = True
+    STAGE_TRACE_FRAMES: int = 0
+    MAX_MOVE_HZ: float = 60.0
+    BLUE_LIGHT_LEVEL: str = "warm"
+    BLUE_LIGHT_LEVELS: Dict[str, Tuple[float, float, float]] = field(default_factory=dict)
+    DISPLAY_THREAD: bool = True
+    SCHEDULER_ENABLED: bool = True
+    SCHEDULER_ADAPTIVE: bool = True
+    LATENCY_SLO_MS: float = 30.0
+    HANDS_HZ: float = 15.0
+    DL_HZ: float = 5.0
+    STRAIN_HZ: float = 10.0
+    DISPATCH_HZ: float = 30.0
+    PARALLEL_LANDMARKS: bool = True
 
 
 @dataclass
@@ -88,6 +114,7 @@ class AppState:
     session_start_time: float = field(default_factory=time.time)
     commands_fired: int = 0
     commands_by_type: Dict[str, int] = field(default_factory=dict)
+    command_log: List[Tuple[int, str]] = field(default_factory=list)  # (frame, command)
     fatigue_events: int = 0
     breaks_taken: int = 0
     last_microsleep: bool = False
@@ -108,13 +135,39 @@ def load_config_yaml(config_obj: AppConfig) -> AppConfig:
 
         cam = yaml_cfg.get("camera", {})
         config_obj.CAMERA_INDEX = cam.get("index", config_obj.CAMERA_INDEX)
+        config_obj.CAPTURE_RING_SIZE = cam.get("ring_buffer_size", config_obj.CAPTURE_RING_SIZE)
 
         gaze = yaml_cfg.get("gaze", {})
         config_obj.DWELL_TIME = gaze.get("dwell_time", config_obj.DWELL_TIME)
         config_obj.SMOOTHING_FRAMES = gaze.get("smoothing_frames", config_obj.SMOOTHING_FRAMES)
+        config_obj.DL_ASYNC = gaze.get("dl_async", config_obj.DL_ASYNC)
+        config_obj.GAZE_PREDICTION = gaze.get("latency_prediction", config_obj.GAZE_PREDICTION)
+        config_obj.FACE_RUNNING_MODE = str(
+            gaze.get("face_running_mode", config_obj.FACE_RUNNING_MODE)
+        ).upper()
 
         app = yaml_cfg.get("app", {})
         config_obj.SIMULATION_MODE = app.get("simulation_mode", config_obj.SIMULATION_MODE)
+        config_obj.STAGE_TRACE_FRAMES = app.get("stage_trace_frames", config_obj.STAGE_TRACE_FRAMES)
+        config_obj.MAX_MOVE_HZ = float(app.get("max_cursor_move_hz", config_obj.MAX_MOVE_HZ))
+        config_obj.BLUE_LIGHT_LEVEL = str(app.get("blue_light_level", config_obj.BLUE_LIGHT_LEVEL))
+        config_obj.BLUE_LIGHT_LEVELS = {
+            str(name): tuple(float(g) for g in gains)
+            for name, gains in (app.get("blue_light_levels") or {}).items()
+        }
+        config_obj.DISPLAY_THREAD = app.get("display_thread", config_obj.DISPLAY_THREAD)
+
+        hands = yaml_cfg.get("hand_gestures", {})
+        config_obj.PARALLEL_LANDMARKS = hands.get("parallel", config_obj.PARALLEL_LANDMARKS)
+
+        sched = yaml_cfg.get("scheduler", {})
+        config_obj.SCHEDULER_ENABLED = sched.get("enable", config_obj.SCHEDULER_ENABLED)
+        config_obj.SCHEDULER_ADAPTIVE = sched.get("adaptive", config_obj.SCHEDULER_ADAPTIVE)
+        config_obj.LATENCY_SLO_MS = float(sched.get("latency_slo_ms", config_obj.LATENCY_SLO_MS))
+        config_obj.HANDS_HZ = float(sched.get("hands_hz", config_obj.HANDS_HZ))
+        config_obj.DL_HZ = float(sched.get("dl_hz", config_obj.DL_HZ))
+        config_obj.STRAIN_HZ = float(sched.get("strain_hz", config_obj.STRAIN_HZ))
+        config_obj.DISPATCH_HZ = float(sched.get("dispatch_hz", config_obj.DISPATCH_HZ))
 
         logger.info(f"Config loaded from {config_path}")
     except Exception as exc:
@@ -140,7 +193,13 @@ class NeuroGazeElite:
         enable_live_mode: bool = False,
         simulation_mode: bool = True,
         hud_mode: str = "standard",
-        config: Optional[AppConfig] = None
+        config: Optional[AppConfig] = None,
+        frame_source=None,
+        screen_size: Optional[Tuple[int, int]] = None,
+        show_window: bool = True,
+        record_dir: Optional[Path] = None,
+        headless: bool = False,
+        control_channel: Optional[ControlChannel] = None
     ):
         """
         Initialize NeuroGaze Elite.
@@ -150,6 +209,13 @@ class NeuroGazeElite:
             enable_live_mode: Start in live mode (vs simulation)
             simulation_mode: Mock mouse/keyboard (don't actually send commands)
             hud_mode: "minimal", "standard", or "debug"
+            frame_source: Object with the ThreadedCameraCapture interface used instead
+                          of the webcam (e.g. session_replay.ReplayFrameSource)
+            screen_size: Override detected screen size (for reproducible replays)
+            show_window: Show the preview window and read keys via cv2.waitKey
+            record_dir: Record raw camera frames to this directory (session_replay format)
+            headless: Skip frame copies, HUD rendering and the preview window entirely
+            control_channel: Optional ControlChannel providing keyboard-equivalent commands
         """
         logger.info("=" * 60)
         logger.info("🚀 NeuroGaze Elite - Initialization")
@@ -160,17 +226,43 @@ class NeuroGazeElite:
         self.enable_gpu = enable_gpu
         self.live_mode = enable_live_mode
         self.simulation_mode = simulation_mode
+        self.headless = headless
+        self.show_window = show_window and not headless
+        self.control_channel = control_channel
         self.running = True
 
         # Session state
         self.state = AppState()
         
+        # Per-stage latency profiler (frame loop timing)
+        self.profiler = StageProfiler(trace_frames=int(self.config.STAGE_TRACE_FRAMES))
+        
+        # Per-stage rate scheduler: expensive models run at their own cadence
+        # and are slowed down under load to hold the latency SLO
+        self.scheduler = StageScheduler(
+            latency_slo_ms=self.config.LATENCY_SLO_MS,
+            enabled=self.config.SCHEDULER_ENABLED,
+            adaptive=self.config.SCHEDULER_ADAPTIVE
+        )
+        self.scheduler.add_stage("face", 0.0)  # camera rate
+        self.scheduler.add_stage("hands", self.config.HANDS_HZ, min_hz=5.0, priority=1)
+        self.scheduler.add_stage("dl_inference", self.config.DL_HZ, min_hz=1.0, priority=0)
+        # Blink detection needs >=10 Hz EAR samples, so strain is not degraded below that
+        self.scheduler.add_stage("strain", self.config.STRAIN_HZ, min_hz=min(10.0, self.config.STRAIN_HZ), priority=2)
+        # Command dispatch directly adds to intent-to-action latency: never degraded
+        self.scheduler.add_stage("dispatch", self.config.DISPATCH_HZ)
+        self._dl_cached_result: Optional[GazeInferenceResult] = None
+        self._dl_cached_timestamp = 0.0
+        
         # Screen info
-        try:
-            import pyautogui
-            self.screen_width, self.screen_height = pyautogui.size()
-        except:
-            self.screen_width, self.screen_height = 1920, 1080
+        if screen_size is not None:
+            self.screen_width, self.screen_height = screen_size
+        else:
+            try:
+                import pyautogui
+                self.screen_width, self.screen_height = pyautogui.size()
+            except:
+                self.screen_width, self.screen_height = 1920, 1080
         
         logger.info(f"Screen resolution: {self.screen_width}x{self.screen_height}")
         
@@ -180,8 +272,17 @@ class NeuroGazeElite:
         # CUDA Pipeline (GPU preprocessing)
         self.cuda_pipeline = CUDAPipeline(enable_cuda=enable_gpu)
         
-        # Camera
-        self._init_camera()
+        # Camera (or injected frame source)
+        self._init_camera(frame_source)
+        
+        # Optional raw session recording for offline replay
+        self.recorder = None
+        if record_dir is not None:
+            from session_replay import SessionRecorder
+            self.recorder = SessionRecorder(
+                record_dir, self.camera_width, self.camera_height,
+                metadata={"screen_width": self.screen_width, "screen_height": self.screen_height}
+            )
         
         # MediaPipe FaceLandmarker (with GPU delegate if available)
         self._init_mediapipe()
@@ -190,7 +291,8 @@ class NeuroGazeElite:
         self.dl_engine = DLInferenceEngine(
             model_name="l2cs-net-gaze360",
             agreement_threshold_px=15.0,
-            enable_gpu=enable_gpu
+            enable_gpu=enable_gpu,
+            async_mode=self.config.DL_ASYNC
         )
         
         # Gaze tracking (Kalman filter with velocity)
@@ -198,12 +300,17 @@ class NeuroGazeElite:
             screen_width=self.screen_width,
             screen_height=self.screen_height,
             use_adaptive=True,
-            use_gpu=enable_gpu
+            use_gpu=enable_gpu,
+            prediction=self.config.GAZE_PREDICTION
         )
         
         # Intent detection
         self.intent_engine = IntentEngine()
-        self.command_gatekeeper = CommandGatekeeper()
+        cooldowns = load_command_cooldowns()
+        self.command_gatekeeper = CommandGatekeeper(
+            cooldown_ms=cooldowns.pop("default", 300.0),
+            cooldown_overrides=cooldowns
+        )
         self.intent_engine.MIN_DELIBERATE_DWELL_MS = self.config.DWELL_TIME * 1000.0
         
         # Strain monitoring
@@ -222,6 +329,11 @@ class NeuroGazeElite:
             )
             self.profile_manager.save_profile(self.current_profile)
         
+        # Per-user intent thresholds (from intent_tuner.py)
+        if self.current_profile.intent_params:
+            self.intent_engine.apply_params(self.current_profile.intent_params)
+            logger.info(f"✓ Tuned intent parameters loaded for '{self.current_user_id}'")
+        
         # EAR Calibrator
         self.ear_calibrator = AdaptiveEARCalibrator()
         self.ear_threshold = self.current_profile.ear_threshold
@@ -229,10 +341,18 @@ class NeuroGazeElite:
         # Command execution (multiprocessing worker)
         self.command_worker = CommandWorkerProcess(
             enable_audio=True,
-            enable_execution=not simulation_mode
+            enable_execution=not simulation_mode,
+            max_move_hz=self.config.MAX_MOVE_HZ
         )
         self.command_worker.start()
         
+        # Gatekeeper -> worker drain with end-to-end latency accounting
+        self.command_dispatcher = CommandDispatcher(
+            self.command_gatekeeper,
+            self.command_worker,
+            latency_observer=self.gaze_tracker.observe_downstream_latency
+        )
+        
         # HUD Renderer
         hud_mode_map = {
             "minimal": HUDMode.MINIMAL,
@@ -242,7 +362,9 @@ class NeuroGazeElite:
         self.hud_renderer = HUDRenderer(
             frame_width=int(self.camera_width),
             frame_height=int(self.camera_height),
-            mode=hud_mode_map.get(hud_mode, HUDMode.STANDARD)
+            mode=hud_mode_map.get(hud_mode, HUDMode.STANDARD),
+            blue_light_level=self.config.BLUE_LIGHT_LEVEL,
+            blue_light_levels=self.config.BLUE_LIGHT_LEVELS
         )
         
         # Hand Gesture Modules (NEW: eye-hand fusion for safer control)
@@ -255,6 +377,15 @@ class NeuroGazeElite:
             enable_gpu=enable_gpu
         )
         
+        # Hand landmarking runs next to face landmarking on the same RGB buffer
+        # (both MediaPipe calls release the GIL); joined before fusion
+        self.hand_executor: Optional[ThreadPoolExecutor] = None
+        if self.config.PARALLEL_LANDMARKS and self.hand_engine.model_loaded:
+            self.hand_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="HandLandmarker")
+        self._hand_future: Optional[Future] = None
+        self._hand_rgb: Optional[np.ndarray] = None
+        self._rgb_buffer: Optional[np.ndarray] = None
+        
         # Gesture command mapper (YAML-driven mapping)
         self.gesture_mapper = GestureCommandMapper()
         
@@ -263,6 +394,10 @@ class NeuroGazeElite:
             fusion_mode=FusionMode.EYE_LEADS_HAND_CONFIRMS  # Safest for paralysis patients
         )
         self.fusion_engine = GazeFusionEngine(fusion_config)
+        # Fusion decides whether eye intent fires, so the tuned command threshold applies here
+        tuned_confidence = (self.current_profile.intent_params or {}).get("min_command_confidence")
+        if tuned_confidence is not None:
+            self.fusion_engine.config.confidence_threshold = float(tuned_confidence)
         
         # Hand calibration (per-user normalization)
         self.hand_calibrator = HandProfileCalibrator()
@@ -276,6 +411,17 @@ class NeuroGazeElite:
             frame_height=int(self.camera_height),
             mode=GestureHUDMode.STANDARD
         )
+        
+        # HUD rendering + preview window, off the tracking loop (Cocoa HighGUI
+        # only works on the main thread, so macOS renders inline)
+        self.hud_display: Optional[HUDDisplay] = None
+        if not self.headless:
+            self.hud_display = HUDDisplay(
+                self.hud_renderer,
+                self.gesture_hud,
+                show_window=self.show_window,
+                threaded=self.config.DISPLAY_THREAD and sys.platform != "darwin"
+            )
 
         # Caregiver alerts (webhook + audio)
         self.caregiver = None
@@ -290,6 +436,9 @@ class NeuroGazeElite:
         self.hand_calibration_active = False
         self.gesture_overlay_visible = True
         self.current_gesture_result = None
+        # Hand results joined on a frame without a new face result (LIVE_STREAM),
+        # handed to fusion on the next frame that has one
+        self._carried_gesture_results: Optional[List] = None
         
         # State tracking
         self.frame_count = 0
@@ -305,12 +454,19 @@ class NeuroGazeElite:
         
         logger.info("✓ Initialization complete\n")
     
-    def _init_camera(self) -> None:
-        """Initialize camera"""
+    def _init_camera(self, frame_source=None) -> None:
+        """Initialize camera with a dedicated capture thread"""
         logger.info("Initializing camera...")
-        self.cap = self._open_camera(self.config.CAMERA_INDEX)
-        self.camera_width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-        self.camera_height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        if frame_source is not None:
+            self.capture = frame_source
+        else:
+            self.capture = ThreadedCameraCapture(
+                open_camera=lambda: self._open_camera(self.config.CAMERA_INDEX),
+                ring_size=self.config.CAPTURE_RING_SIZE
+            )
+        self.camera_width = self.capture.frame_width
+        self.camera_height = self.capture.frame_height
+        self.capture.start()
         logger.info(f"✓ Camera initialized ({self.camera_width}x{self.camera_height})")
 
     def _open_camera(self, index: int, max_retries: int = 5) -> cv2.VideoCapture:
@@ -321,6 +477,8 @@ class NeuroGazeElite:
                 cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
                 cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
                 cap.set(cv2.CAP_PROP_FPS, 30)
+                # Keep the driver queue short; the capture thread always takes the newest frame
+                cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
                 logger.info(f"Camera {index} opened on attempt {attempt}")
                 return cap
             logger.warning(f"Camera {index} not found (attempt {attempt}/{max_retries})")
@@ -366,26 +524,133 @@ class NeuroGazeElite:
             base_options = mp_python.BaseOptions(model_asset_path=model_path)
             logger.info("GPU delegate not available, using CPU")
         
+        # Running mode: IMAGE (detect every frame), VIDEO (landmark tracking),
+        # LIVE_STREAM (tracking + asynchronous results via callback)
+        running_modes = {
+            "IMAGE": vision.RunningMode.IMAGE,
+            "VIDEO": vision.RunningMode.VIDEO,
+            "LIVE_STREAM": vision.RunningMode.LIVE_STREAM,
+        }
+        mode_name = self.config.FACE_RUNNING_MODE
+        if mode_name not in running_modes:
+            logger.warning(f"Unknown face running mode '{mode_name}', using VIDEO")
+            mode_name = "VIDEO"
+        self.face_running_mode = running_modes[mode_name]
+        self._face_timestamp_ms = -1
+        self._live_result_lock = threading.Lock()
+        self._live_result: Optional[vision.FaceLandmarkerResult] = None
+        self._live_result_new = False
+        self.last_face_detected = False
+        
         options = vision.FaceLandmarkerOptions(
             base_options=base_options,
             num_faces=1,
-            running_mode=vision.RunningMode.IMAGE
+            running_mode=self.face_running_mode,
+            result_callback=(
+                self._on_face_result
+                if self.face_running_mode == vision.RunningMode.LIVE_STREAM else None
+            )
         )
         
         self.face_landmarker = vision.FaceLandmarker.create_from_options(options)
-        logger.info("✓ MediaPipe FaceLandmarker initialized")
+        logger.info(f"✓ MediaPipe FaceLandmarker initialized (mode: {mode_name})")
+    
+    def _on_face_result(
+        self,
+        result: vision.FaceLandmarkerResult,
+        output_image: mp.Image,
+        timestamp_ms: int
+    ) -> None:
+        """LIVE_STREAM result callback (runs on a MediaPipe thread)"""
+        with self._live_result_lock:
+            self._live_result = result
+            self._live_result_new = True
+    
+    def _next_face_timestamp_ms(self) -> int:
+        """Monotonically increasing timestamp required by VIDEO/LIVE_STREAM modes"""
+        timestamp_ms = int(time.monotonic() * 1000)
+        if timestamp_ms <= self._face_timestamp_ms:
+            timestamp_ms = self._face_timestamp_ms + 1
+        self._face_timestamp_ms = timestamp_ms
+        return timestamp_ms
     
-    def _process_frame(self, frame: np.ndarray) -> Optional[vision.FaceLandmarkerResult]:
-        """Process frame with MediaPipe"""
+    def _process_frame(
+        self,
+        frame: np.ndarray,
+        run_hands: bool = False
+    ) -> Optional[vision.FaceLandmarkerResult]:
+        """
+        Process frame with MediaPipe.
+        
+        Args:
+            frame: BGR camera frame
+            run_hands: Also run hand landmarking on the same RGB frame; with the
+                       hand executor it runs concurrently and is collected by
+                       _collect_hand_results()
+        
+        Returns:
+            Landmarker result; in LIVE_STREAM mode this is the newest result delivered
+            by the callback, or None if no new result has arrived since the last call
+        """
         # Preprocess with CUDA pipeline
-        processed_frame = self.cuda_pipeline.process_frame(frame)
+        with self.profiler.stage("preprocess"):
+            processed_frame = self.cuda_pipeline.process_frame(frame)
+            self._rgb_buffer = cv2.cvtColor(processed_frame, cv2.COLOR_BGR2RGB, dst=self._rgb_buffer)
+            rgb_frame = self._rgb_buffer
+            mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb_frame)
+        
+        # Hand landmarking: dispatched before face detection so both overlap
+        if run_hands:
+            if self.hand_executor is not None:
+                self._hand_future = self.hand_executor.submit(self._run_hand_landmarker, rgb_frame)
+            else:
+                self._hand_rgb = rgb_frame
         
         # Detect face
-        rgb_frame = cv2.cvtColor(processed_frame, cv2.COLOR_BGR2RGB)
-        mp_image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb_frame)
-        results = self.face_landmarker.detect(mp_image)
+        with self.profiler.stage("face"):
+            if self.face_running_mode == vision.RunningMode.IMAGE:
+                return self.face_landmarker.detect(mp_image)
+            
+            timestamp_ms = self._next_face_timestamp_ms()
+            if self.face_running_mode == vision.RunningMode.VIDEO:
+                return self.face_landmarker.detect_for_video(mp_image, timestamp_ms)
+            
+            self.face_landmarker.detect_async(mp_image, timestamp_ms)
+        with self._live_result_lock:
+            if not self._live_result_new:
+                return None
+            self._live_result_new = False
+            return self._live_result
+    
+    def _run_hand_landmarker(self, rgb_frame: np.ndarray) -> Tuple[List, int, int]:
+        """Hand landmarking on the shared RGB frame; returns (results, start_ns, end_ns)"""
+        start_ns = time.perf_counter_ns()
+        gesture_results = self.hand_engine.process_frame(None, rgb_frame=rgb_frame)
+        return gesture_results, start_ns, time.perf_counter_ns()
+    
+    def _collect_hand_results(self) -> Optional[List]:
+        """
+        Join the hand landmarking dispatched by _process_frame.
         
-        return results
+        Returns:
+            Gesture results, or None if hands were not run this frame
+        """
+        if self._hand_future is not None:
+            wait_start_ns = time.perf_counter_ns()
+            gesture_results, start_ns, end_ns = self._hand_future.result()
+            self._hand_future = None
+            self.profiler.record("hands", start_ns, end_ns)
+            self.profiler.record("hands_wait", wait_start_ns, time.perf_counter_ns())
+            return gesture_results
+        
+        if self._hand_rgb is not None:
+            # Sequential fallback (no executor): still reuses the shared RGB frame
+            gesture_results, start_ns, end_ns = self._run_hand_landmarker(self._hand_rgb)
+            self._hand_rgb = None
+            self.profiler.record("hands", start_ns, end_ns)
+            return gesture_results
+        
+        return None
     
     def _extract_gaze_position(self, face_landmarks) -> Optional[Tuple[float, float]]:
         """Extract gaze position from face landmarks"""
@@ -473,20 +738,38 @@ class NeuroGazeElite:
             # Fallback to neutral pose
             return (0.0, 0.0, 0.0)
 
-    def _enqueue_command(self, command_name: str) -> bool:
+    def _enqueue_command(
+        self,
+        command_name: str,
+        timestamps: Optional[Dict[str, float]] = None,
+        decision_ts: Optional[float] = None,
+        position: Optional[Tuple[float, float]] = None
+    ) -> bool:
         """Enqueue a command using the gatekeeper, supporting older API names."""
         if hasattr(self.command_gatekeeper, "enqueue"):
             return bool(self.command_gatekeeper.enqueue(command_name))
-        return bool(self.command_gatekeeper.add_command(command_name))
+        return bool(self.command_gatekeeper.add_command(
+            command_name, timestamps=timestamps, now=decision_ts, position=position
+        ))
+
+    def _handle_fusion_command(
+        self,
+        command_name: str,
+        capture_ts: Optional[float] = None,
+        fusion_ts: Optional[float] = None,
+        decision_ts: Optional[float] = None,
+        target: Optional[Tuple[float, float]] = None
+    ) -> None:
+        """Handle high-priority commands before queueing.
 
-    def _handle_fusion_command(self, command_name: str) -> None:
-        """Handle high-priority commands before queueing."""
+        capture_ts / fusion_ts (time.time() clock) travel with the command for
+        intent-to-action latency accounting in CommandDispatcher. decision_ts
+        (frame clock) drives the gatekeeper cooldowns. target is the fused
+        position in screen pixels; pointer commands are sent there.
+        """
         if command_name == "CANCEL_COMMAND":
-            try:
-                self.command_gatekeeper.queue.clear()
-                self.command_gatekeeper.last_commands.clear()
-            except Exception:
-                pass
+            self.command_gatekeeper.clear_queue()
+            self.command_gatekeeper.reset_cooldowns()
             return
 
         if command_name in {"EMERGENCY_ALERT", "CALL_NURSE"}:
@@ -503,8 +786,14 @@ class NeuroGazeElite:
                 except Exception as exc:
                     logger.error(f"Caregiver alert failed: {exc}")
 
-        if self._enqueue_command(command_name):
+        timestamps = {}
+        if capture_ts:
+            timestamps["capture"] = capture_ts
+        if fusion_ts:
+            timestamps["fusion"] = fusion_ts
+        if self._enqueue_command(command_name, timestamps, decision_ts=decision_ts, position=target):
             self.state.commands_fired += 1
+            self.state.command_log.append((self.frame_count, command_name))
             self.state.commands_by_type[command_name] = self.state.commands_by_type.get(command_name, 0) + 1
     
     def _handle_keyboard_input(self, key: int) -> bool:
@@ -570,6 +859,20 @@ class NeuroGazeElite:
         
         return True
     
+    def _handle_keys(self, keys: List[int]) -> bool:
+        """
+        Handle forwarded key presses (HUD state only changes between renders).
+        
+        Returns:
+            False if ESC pressed (exit signal)
+        """
+        if not keys:
+            return True
+        if self.hud_display is None:
+            return all(self._handle_keyboard_input(k) for k in keys)
+        with self.hud_display.lock:
+            return all(self._handle_keyboard_input(k) for k in keys)
+    
     def _start_calibration(self) -> None:
         """Start 5-point gaze calibration"""
         self.calibration_active = True
@@ -635,8 +938,16 @@ class NeuroGazeElite:
         logger.info("  R - Reset session")
         logger.info("  SPACE - Cycle HUD modes")
         logger.info("  ESC - Exit")
+        if self.control_channel is not None:
+            logger.info("Control channel commands: " + ", ".join(sorted(COMMAND_KEYS)))
         logger.info("=" * 60 + "\n")
         
+        if self.control_channel is not None:
+            self.control_channel.start()
+        
+        if self.hud_display is not None:
+            self.hud_display.start()
+        
         # Start strain guard session
         self.strain_guard.start_session()
         session_start = time.time()
@@ -644,26 +955,38 @@ class NeuroGazeElite:
         try:
             while self.running:
                 frame_start = time.time()
+                self.profiler.begin_frame()
                 
-                # Read frame
-                ret, frame = self.cap.read()
+                # Newest frame from the capture thread (reconnects happen there)
+                with self.profiler.stage("capture"):
+                    ret, frame = self.capture.read()
                 if not ret:
-                    logger.warning("Frame read failed - attempting camera reconnect...")
-                    self.cap.release()
-                    try:
-                        self.cap = self._open_camera(self.config.CAMERA_INDEX)
-                        self.camera_width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-                        self.camera_height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-                    except RuntimeError as exc:
-                        logger.error(str(exc))
+                    if self.capture.failed:
                         break
                     continue
                 
+                if self.recorder is not None:
+                    self.recorder.write(frame, self.capture.last_timestamp)
+                
+                # Processing latency (fed to the scheduler) excludes the wait for the camera
+                process_start = time.perf_counter()
+                frame_clock = self.capture.last_timestamp
+                # Frame clock is virtual during replay; latency stamps stay on the wall clock
+                capture_wall_ts = frame_clock + (time.time() - self.capture.clock())
+                
                 # Resize for processing
                 frame = cv2.resize(frame, (int(self.camera_width), int(self.camera_height)))
                 
-                # Process with MediaPipe
-                results = self._process_frame(frame)
+                # Process with MediaPipe (None = no new face result this frame)
+                # Hands only run while a face is present (fusion needs both)
+                results = None
+                if self.scheduler.should_run("face", frame_clock):
+                    run_hands = (
+                        self.hand_engine.model_loaded
+                        and self.last_face_detected
+                        and self.scheduler.should_run("hands", frame_clock)
+                    )
+                    results = self._process_frame(frame, run_hands=run_hands)
                 
                 gaze_position = None
                 gaze_velocity = None
@@ -671,8 +994,13 @@ class NeuroGazeElite:
                 intent_score = None
                 strain_metrics = None
                 
-                face_detected = bool(results and results.face_landmarks)
-                if face_detected:
+                if results is None:
+                    # LIVE_STREAM: no new result yet, keep the last face state for the HUD
+                    face_detected = self.last_face_detected
+                else:
+                    face_detected = bool(results.face_landmarks)
+                    self.last_face_detected = face_detected
+                if results is not None and face_detected:
                     face_landmarks = results.face_landmarks[0]
                     
                     # Extract gaze
@@ -680,7 +1008,8 @@ class NeuroGazeElite:
                     
                     if gaze_pos:
                         # Update Kalman tracker
-                        kalman_state = self.gaze_tracker.update_gaze(gaze_pos[0], gaze_pos[1])
+                        with self.profiler.stage("kalman"):
+                            kalman_state = self.gaze_tracker.update_gaze(gaze_pos[0], gaze_pos[1], timestamp=frame_clock)
                         gaze_position = kalman_state.position
                         gaze_velocity = kalman_state.velocity
                         
@@ -688,19 +1017,56 @@ class NeuroGazeElite:
                         # Extract head pose from face landmarks if available
                         head_pose_euler = self._estimate_head_pose(face_landmarks)
                         
-                        # Run DL inference for secondary validation
-                        dl_result = self.dl_engine.infer(
-                            face_frame=cv2.cvtColor(frame, cv2.COLOR_BGR2RGB) if CV2_AVAILABLE else frame,
-                            head_pose_euler=head_pose_euler
-                        )
+                        # Run DL inference for secondary validation on the landmark face crop
+                        # (single crop+resize, no second face detector, no full-frame colour conversion)
+                        dl_result = None
+                        dl_result_age_ms = 0.0
+                        dl_start_ns = time.perf_counter_ns()
+                        if self.dl_engine.model_loaded and not self.scheduler.should_run("dl_inference", frame_clock):
+                            # Not due: validate against the last result while it is fresh enough
+                            if self.dl_engine.async_mode:
+                                dl_result, dl_result_age_ms = self.dl_engine.get_latest_result(
+                                    reference_time=frame_clock
+                                )
+                            elif self._dl_cached_result is not None:
+                                dl_result = self._dl_cached_result
+                                dl_result_age_ms = max(0.0, (frame_clock - self._dl_cached_timestamp) * 1000.0)
+                        elif self.dl_engine.model_loaded:
+                            face_bbox = DLInferenceEngine.face_bbox_from_landmarks(
+                                face_landmarks,
+                                int(self.camera_width),
+                                int(self.camera_height)
+                            )
+                            face_crop = self.dl_engine.crop_face(frame, face_bbox)
+                            if self.dl_engine.async_mode:
+                                # Never block on the secondary model: submit the newest crop
+                                # and validate against whatever result finished last
+                                if face_crop is not None:
+                                    self.dl_engine.submit_async(
+                                        face_crop,
+                                        head_pose_euler=head_pose_euler,
+                                        timestamp=frame_clock
+                                    )
+                                dl_result, dl_result_age_ms = self.dl_engine.get_latest_result(
+                                    reference_time=frame_clock
+                                )
+                            elif face_crop is not None:
+                                dl_result = self.dl_engine.infer(
+                                    face_frame=face_crop,
+                                    head_pose_euler=head_pose_euler
+                                )
+                                self._dl_cached_result = dl_result
+                                self._dl_cached_timestamp = frame_clock
                         
                         # Cross-validate DL vs MediaPipe
                         validation_result = self.dl_engine.cross_validate(
                             dl_result=dl_result,
                             mediapipe_point=gaze_pos,
                             screen_width=int(self.camera_width),
-                            screen_height=int(self.camera_height)
+                            screen_height=int(self.camera_height),
+                            dl_result_age_ms=dl_result_age_ms
                         )
+                        self.profiler.record("dl_inference", dl_start_ns, time.perf_counter_ns())
                         
                         # Use consensus point if models disagree
                         if not validation_result.is_confident and dl_result is not None:
@@ -714,8 +1080,12 @@ class NeuroGazeElite:
                         # Calculate EAR (blink detection)
                         ear_value = self._calculate_ear(face_landmarks)
                         
-                        # Update strain guard
-                        strain_metrics = self.strain_guard.update(ear_value)
+                        # Update strain guard (between runs the last metrics stay current)
+                        if self.scheduler.should_run("strain", frame_clock):
+                            with self.profiler.stage("strain"):
+                                strain_metrics = self.strain_guard.update(ear_value)
+                        else:
+                            strain_metrics = self.strain_guard.current_metrics
                         if strain_metrics.microsleep_detected and not self.state.last_microsleep:
                             self.state.fatigue_events += 1
                         self.state.last_microsleep = bool(strain_metrics.microsleep_detected)
@@ -724,17 +1094,25 @@ class NeuroGazeElite:
                         self.state.last_break_due = bool(strain_metrics.break_due)
                         
                         # Intent analysis
-                        dwell_duration_ms = self.intent_engine.update_dwell(gaze_position)
-                        intent_score = self.intent_engine.analyze_intent(
-                            current_velocity=gaze_velocity,
-                            current_position=gaze_position,
-                            dwell_duration_ms=dwell_duration_ms
-                        )
+                        with self.profiler.stage("intent"):
+                            dwell_duration_ms = self.intent_engine.update_dwell(gaze_position, timestamp=frame_clock)
+                            intent_score = self.intent_engine.analyze_intent(
+                                current_velocity=gaze_velocity,
+                                current_position=gaze_position,
+                                dwell_duration_ms=dwell_duration_ms
+                            )
                         
                         # Hand Gesture Detection & Fusion (NEW)
-                        gesture_results = self.hand_engine.process_frame(frame)
-                        gesture_result = gesture_results[0] if gesture_results else None
-                        self.current_gesture_result = gesture_result
+                        # Between hand runs the HUD keeps the last gesture; fusion gets None
+                        # because it already holds the last gesture for its confirmation window
+                        gesture_result = None
+                        gesture_results = self._collect_hand_results()
+                        if gesture_results is None:
+                            gesture_results = self._carried_gesture_results
+                        self._carried_gesture_results = None
+                        if gesture_results is not None:
+                            gesture_result = gesture_results[0] if gesture_results else None
+                            self.current_gesture_result = gesture_result
                         
                         # Process hand calibration if active
                         if self.hand_calibration_active and gesture_result:
@@ -744,24 +1122,33 @@ class NeuroGazeElite:
                             ) ** 0.5
                             self.hand_calibrator.add_sample(gesture_result.hand.landmarks, hand_size)
                         
-                        # Fuse eye and hand signals
+                        # Fuse eye and hand signals; the cursor target is extrapolated by
+                        # the measured capture-to-now latency so it does not trail the eye
+                        cursor_position = gaze_position
+                        if validation_result.is_confident or dl_result is None:
+                            cursor_position = self.gaze_tracker.predict_position(now=self.capture.clock())
+                        prediction_time = time.time()
                         if intent_score:
                             fusion_intent = FusionIntentScore(
                                 confidence=intent_score.confidence,
                                 level=intent_score.level,
-                                position=gaze_position,
+                                position=cursor_position,
                                 velocity=gaze_velocity,
                                 dwell_duration_ms=dwell_duration_ms
                             )
                         else:
                             fusion_intent = None
                         
-                        fusion_result = self.fusion_engine.fuse(
-                            intent_score=fusion_intent,
-                            gesture_result=gesture_result,
-                            screen_width=int(self.camera_width),
-                            screen_height=int(self.camera_height)
-                        )
+                        # Screen size: hand targets come out in the same screen pixels as gaze
+                        with self.profiler.stage("fusion"):
+                            fusion_result = self.fusion_engine.fuse(
+                                intent_score=fusion_intent,
+                                gesture_result=gesture_result,
+                                screen_width=int(self.screen_width),
+                                screen_height=int(self.screen_height),
+                                timestamp=frame_clock
+                            )
+                        fusion_time = time.time()
                         
                         # Route fused command to gatekeeper
                         if fusion_result.should_execute and fusion_result.command:
@@ -781,13 +1168,43 @@ class NeuroGazeElite:
                                 "cursor_override_end": "CURSOR_OVERRIDE_END",
                             }
                             command_name = command_map.get(command_key, command_key.upper())
-                            self._handle_fusion_command(command_name)
+                            self._handle_fusion_command(
+                                command_name,
+                                capture_ts=capture_wall_ts,
+                                fusion_ts=fusion_time,
+                                decision_ts=frame_clock,
+                                target=fusion_result.position
+                            )
                             logger.debug(f"Fused command: {command_name} (source: {fusion_result.source})")
                         
+                        # Cursor follows the predicted position (the worker coalesces moves)
+                        if not self.calibration_active:
+                            self.command_dispatcher.move_cursor(
+                                cursor_position,
+                                capture_ts=capture_wall_ts,
+                                predict_ts=prediction_time,
+                                live=self.live_mode
+                            )
+                        
                         # Process calibration if active
                         if self.calibration_active:
                             self._process_calibration(gaze_pos[0], gaze_pos[1])
                 
+                # Face lost or no new face result this frame: still join the hand task so it
+                # never overlaps the next frame. With the face still present (LIVE_STREAM
+                # between face results) keep the gestures for the HUD and the next fused frame
+                gesture_results = self._collect_hand_results()
+                if not self.last_face_detected:
+                    self._carried_gesture_results = None
+                elif gesture_results is not None:
+                    self.current_gesture_result = gesture_results[0] if gesture_results else None
+                    self._carried_gesture_results = gesture_results
+                
+                # Hand accepted commands to the worker
+                if self.scheduler.should_run("dispatch", frame_clock):
+                    with self.profiler.stage("dispatch"):
+                        self.command_dispatcher.dispatch(live=self.live_mode)
+                
                 # Calculate FPS
                 frame_end = time.time()
                 frame_time = frame_end - frame_start
@@ -795,67 +1212,67 @@ class NeuroGazeElite:
                 self.fps_history.append(fps)
                 avg_fps = np.mean(self.fps_history) if self.fps_history else 0
                 
-                # Render HUD (always use raw frame as base)
-                display_frame = frame.copy()
-                display_frame = self.hud_renderer.render_frame(
-                    display_frame,
-                    gaze_position=gaze_position,
-                    gaze_velocity=gaze_velocity,
-                    intent_confidence=intent_score.confidence if intent_score else None,
-                    strain_metrics={
-                        "blink_rate": strain_metrics.blink_rate_per_minute,
-                        "perclos": strain_metrics.perclos_score,
-                        "fatigue_level": strain_metrics.fatigue_level.value.upper()
-                    } if strain_metrics else None,
-                    fps=avg_fps,
-                    backend_info=self.cuda_pipeline.get_backend_info(),
-                    mode_info=f"{'LIVE' if self.live_mode else 'SIM'} - {self.cuda_pipeline.backend.value}"
-                )
-
-                if not face_detected:
-                    cv2.putText(
-                        display_frame,
-                        "No face detected - look at camera",
-                        (20, 50),
-                        cv2.FONT_HERSHEY_SIMPLEX,
-                        0.7,
-                        (0, 255, 255),
-                        2,
+                # Hand the HUD snapshot to the display (rendered and shown on the
+                # display thread; the resized frame is not touched after this);
+                # headless runs only count the session heatmap
+                if self.hud_display is not None:
+                    if not self.hud_display.alive:
+                        self.hud_display.fall_back_inline()
+                    stage_timings = None
+                    if self.hud_renderer.mode == HUDMode.DEBUG:
+                        stage_timings = self.profiler.get_stage_stats()
+                        stage_timings.update(self.hud_display.get_stage_stats())
+                    render_state = RenderState(
+                        frame=frame,
+                        gaze_position=gaze_position,
+                        gaze_velocity=gaze_velocity,
+                        intent_confidence=intent_score.confidence if intent_score else None,
+                        strain_metrics={
+                            "blink_rate": strain_metrics.blink_rate_per_minute,
+                            "perclos": strain_metrics.perclos_score,
+                            "fatigue_level": strain_metrics.fatigue_level.value.upper()
+                        } if strain_metrics else None,
+                        fps=avg_fps,
+                        backend_info=self.cuda_pipeline.get_backend_info(),
+                        mode_info=f"{'LIVE' if self.live_mode else 'SIM'} - {self.cuda_pipeline.backend.value}",
+                        stage_timings=stage_timings,
+                        face_detected=face_detected,
+                        gaze_samples=[(gaze_position[0], gaze_position[1], time.time())] if gaze_position else []
                     )
                 
-                # Add Hand Gesture Overlay (NEW)
-                if self.gesture_overlay_visible and self.current_gesture_result:
-                    gesture_display_info = GestureDisplayInfo(
-                        gesture_name=self.current_gesture_result.gesture_type.value,
-                        confidence=self.current_gesture_result.confidence,
-                        hand_position=self.current_gesture_result.hand_position,
-                        handedness=self.current_gesture_result.hand.handedness
-                    )
-                    
-                    hand_landmarks = [
-                        (lm.x, lm.y) for lm in self.current_gesture_result.hand.landmarks
-                    ]
-                    
-                    display_frame = self.gesture_hud.render_hand_overlay(
-                        frame=display_frame,
-                        hand_landmarks=hand_landmarks,
-                        gesture_info=gesture_display_info,
-                        fusion_mode=self.fusion_engine.config.fusion_mode.value,
-                        diagnostics={
+                    # Hand Gesture Overlay (NEW)
+                    if self.gesture_overlay_visible and self.current_gesture_result:
+                        render_state.gesture_info = GestureDisplayInfo(
+                            gesture_name=self.current_gesture_result.gesture_type.value,
+                            confidence=self.current_gesture_result.confidence,
+                            hand_position=self.current_gesture_result.hand_position,
+                            handedness=self.current_gesture_result.hand.handedness
+                        )
+                        # Engine-owned array; it is not reused until two newer detections
+                        render_state.hand_landmarks = self.current_gesture_result.hand.landmarks
+                        render_state.fusion_mode = self.fusion_engine.config.fusion_mode.value
+                        render_state.gesture_diagnostics = {
                             "hands_detected": 1,
                             "fps": avg_fps,
                             "inference_ms": self.hand_engine._get_avg_inference_time(),
                             "confidence": self.current_gesture_result.confidence
                         }
-                    )
+                    
+                    self.hud_display.submit(render_state)
+                elif gaze_position:
+                    # Headless: nothing renders the HUD, so count the session heatmap here
+                    self.hud_renderer.heatmap.add(gaze_position[0], gaze_position[1], time.time(), splat=False)
                 
-                # Display
-                cv2.imshow("NeuroGaze Elite", display_frame)
+                self.profiler.end_frame()
+                self.scheduler.observe_frame((time.perf_counter() - process_start) * 1000.0)
                 
-                # Keyboard handling
-                key = cv2.waitKey(1) & 0xFF
-                if key != 255:
-                    if not self._handle_keyboard_input(key):
+                # Keys from the preview window, then keyboard-equivalent commands
+                # from the local control channel
+                if self.hud_display is not None:
+                    if not self._handle_keys(self.hud_display.poll_keys()):
+                        break
+                if self.control_channel is not None:
+                    if not self._handle_keys(self.control_channel.poll_keys()):
                         break
                 
                 self.frame_count += 1
@@ -863,9 +1280,14 @@ class NeuroGazeElite:
                 # Periodic logging
                 if self.frame_count % 300 == 0:
                     elapsed = (time.time() - session_start) / 60.0
+                    capture_stats = self.capture.get_stats()
                     logger.info(f"[{self.frame_count} frames, {elapsed:.1f}min] FPS: {avg_fps:.1f} | "
                               f"EAR: {ear_value:.3f} | "
-                              f"Intent: {intent_score.level.value if intent_score else 'N/A'}")
+                              f"Intent: {intent_score.level.value if intent_score else 'N/A'} | "
+                              f"Dropped: {capture_stats['frames_dropped']}")
+                    logger.info(self.profiler.format_summary())
+                    logger.info(self.scheduler.format_summary())
+                    logger.info(self.command_dispatcher.format_summary())
         
         except KeyboardInterrupt:
             logger.info("\nInterrupted by user")
@@ -887,6 +1309,14 @@ class NeuroGazeElite:
             "fatigue_events": self.state.fatigue_events,
             "breaks_taken": self.state.breaks_taken,
             "session_date": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "stage_latency_ms": {
+                name: {k: round(v, 3) for k, v in stats.items()}
+                for name, stats in self.profiler.get_stage_stats().items()
+            },
+            "schedule": self.scheduler.get_stats(),
+            "command_queue": self.command_gatekeeper.get_stats(),
+            "command_dispatch": self.command_dispatcher.get_stats(),
+            "heatmap": self.hud_renderer.heatmap.get_stats(),
         }
 
         logger.info("-" * 45)
@@ -905,6 +1335,13 @@ class NeuroGazeElite:
             logger.info(f"Saved -> {log_path.name}")
         except Exception as exc:
             logger.warning(f"Could not save session log: {exc}")
+
+        heatmap_path = Path(__file__).parent / "session_heatmap.npz"
+        if self.hud_renderer.heatmap.export(heatmap_path):
+            logger.info(f"Saved -> {heatmap_path.name}")
+
+        if self.profiler.trace_frames > 0:
+            self.profiler.export_chrome_trace(Path(__file__).parent / "stage_trace.json")
     
     def _cleanup(self) -> None:
         """Clean up resources"""
@@ -912,6 +1349,13 @@ class NeuroGazeElite:
         logger.info("🛑 Shutting down...")
         logger.info("=" * 60)
         
+        # Stop the display first (it renders from the HUD state saved below)
+        if self.hud_display is not None:
+            display_stats = self.hud_display.get_stats()
+            logger.info(f"Display: {display_stats['frames_rendered']} rendered, "
+                       f"{display_stats['frames_dropped']} dropped")
+            self.hud_display.stop()
+        
         # Stop strain guard session
         session_stats = self.strain_guard.end_session()
         
@@ -936,16 +1380,37 @@ class NeuroGazeElite:
                        f"{worker_stats['commands_failed']} failed")
             self.command_worker.stop()
         
+        # Stop async DL inference worker
+        if self.dl_engine:
+            self.dl_engine.stop_async_worker()
+        
         # Clean up GPU
         if self.cuda_pipeline:
             self.cuda_pipeline.cleanup()
         
-        # Close camera
-        if self.cap:
-            self.cap.release()
+        # Stop capture thread and close camera
+        if self.capture:
+            capture_stats = self.capture.get_stats()
+            logger.info(f"Capture: {capture_stats['frames_captured']} captured, "
+                       f"{capture_stats['frames_dropped']} dropped, "
+                       f"{capture_stats['reconnects']} reconnects")
+            self.capture.stop()
+        
+        # Stop control channel readers
+        if self.control_channel is not None:
+            self.control_channel.stop()
+        
+        # Finish session recording
+        if self.recorder is not None:
+            self.recorder.close()
         
-        # Close windows
-        cv2.destroyAllWindows()
+        # Stop hand landmarking worker
+        if self.hand_executor is not None:
+            self.hand_executor.shutdown(wait=True)
+        
+        # Close face landmarker (stops LIVE_STREAM callbacks)
+        if self.face_landmarker:
+            self.face_landmarker.close()
         
         logger.info(f"Session stats: {session_stats}")
         logger.info("✓ Shutdown complete\n")
@@ -960,10 +1425,20 @@ def main():
     parser.add_argument("--simulate", action="store_true", default=True, help="Simulation mode (no actual commands)")
     parser.add_argument("--execute", action="store_true", help="Execute actual commands (live mode)")
     parser.add_argument("--hud", choices=["minimal", "standard", "debug"], default="standard", help="HUD display mode")
+    parser.add_argument("--record", type=Path, default=None, metavar="DIR",
+                        help="Record raw camera frames for offline replay (see session_replay.py)")
+    parser.add_argument("--face-mode", choices=["image", "video", "live_stream"], default=None,
+                        help="FaceLandmarker running mode (overrides config.yaml)")
+    parser.add_argument("--headless", action="store_true",
+                        help="No preview window or HUD; control via stdin (and --control-socket)")
+    parser.add_argument("--control-socket", type=Path, default=None, metavar="PATH",
+                        help="Accept control commands on this UNIX socket")
     
     args = parser.parse_args()
     
     config = load_config_yaml(AppConfig())
+    if args.face_mode:
+        config.FACE_RUNNING_MODE = args.face_mode.upper()
     enable_gpu = not args.no_gpu
     live_mode = args.live
     simulation_mode = config.SIMULATION_MODE
@@ -973,6 +1448,10 @@ def main():
         simulation_mode = True
     hud_mode = args.hud
     
+    control_channel = None
+    if args.headless or args.control_socket is not None:
+        control_channel = ControlChannel(use_stdin=args.headless, socket_path=args.control_socket)
+    
     try:
         app = NeuroGazeElite(
             enable_gpu=enable_gpu,
@@ -980,6 +1459,9 @@ def main():
             simulation_mode=simulation_mode,
             hud_mode=hud_mode,
             config=config,
+            record_dir=args.record,
+            headless=args.headless,
+            control_channel=control_channel,
         )
         app.run()
     
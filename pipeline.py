@@ -1,6 +1,8 @@
 """
 CUDA-Accelerated Frame Processing Pipeline
 Handles GPU preprocessing, CLAHE enhancement, and automatic CPU fallback
+Per-frame buffers, CLAHE instances and morphology kernels are preallocated and
+reused; they are rebuilt only when the input geometry changes
 Part of NeuroGaze Elite
 """
 
@@ -54,6 +56,23 @@ class CUDAPipeline:
         self.clahe_gpu: Optional[cv2.cuda.CLAHE] = None
         self.cuda_enabled = False
 
+        # Persistent CPU resources (geometry independent)
+        self.clahe_cpu = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+        self.sharpen_kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
+
+        # Per-resolution buffers, rebuilt only when input geometry changes
+        self._buffer_geometry: Optional[Tuple[int, int, int, int]] = None
+        self._cpu_buffers: dict = {}
+        self._gpu_buffers: dict = {}
+        self._gpu_morph_filter = None
+        self._gpu_stream = None
+
+        # Allocation accounting (see get_backend_info)
+        self.frames_processed = 0
+        self.buffer_allocations = 0
+        self.geometry_rebuilds = 0
+        self.steady_state_allocations = 0
+
         # Detect and initialize CUDA if requested
         if enable_cuda:
             self._init_cuda()
@@ -130,54 +149,132 @@ class CUDAPipeline:
         Returns:
             Processed frame ready for MediaPipe (np.ndarray)
         """
+        geometry = (frame.shape[0], frame.shape[1], self.target_width, self.target_height)
+        if geometry != self._buffer_geometry:
+            self._rebuild_buffers(frame)
+        self.frames_processed += 1
+
         if self.cuda_enabled:
             return self._process_frame_gpu(frame)
         else:
             return self._process_frame_cpu(frame)
 
+    def _rebuild_buffers(self, frame: np.ndarray) -> None:
+        """(Re)allocate all per-resolution buffers for the given input geometry"""
+        h, w = frame.shape[:2]
+        tw, th = self.target_width, self.target_height
+        self._buffer_geometry = (h, w, tw, th)
+        self.geometry_rebuilds += 1
+
+        cpu = {
+            "ycrcb": np.empty((th, tw, 3), dtype=np.uint8),
+            "y": np.empty((th, tw), dtype=np.uint8),
+            "y_enhanced": np.empty((th, tw), dtype=np.uint8),
+            "bgr_enhanced": np.empty((th, tw, 3), dtype=np.uint8),
+            "sharpened": np.empty((th, tw, 3), dtype=np.uint8),
+            "output": np.empty((th, tw, 3), dtype=np.uint8),
+        }
+        if w != tw or h != th:
+            cpu["resized"] = np.empty((th, tw, 3), dtype=np.uint8)
+        self._cpu_buffers = cpu
+        self.buffer_allocations += len(cpu)
+
+        if self.cuda_enabled:
+            try:
+                self._rebuild_gpu_buffers(h, w)
+            except Exception as e:
+                logger.error(f"GPU buffer allocation failed: {e}, falling back to CPU")
+                self.backend = DeviceBackend.CPU
+                self.cuda_enabled = False
+
+        logger.info(f"Pipeline buffers built for {w}x{h} -> {tw}x{th} "
+                    f"({self.buffer_allocations} allocations, rebuild #{self.geometry_rebuilds})")
+
+    def _rebuild_gpu_buffers(self, h: int, w: int) -> None:
+        """Allocate persistent GpuMat targets and the morphology filter"""
+        tw, th = self.target_width, self.target_height
+        gpu = {
+            "input": cv2.cuda_GpuMat(h, w, cv2.CV_8UC3),
+            "resized": cv2.cuda_GpuMat(th, tw, cv2.CV_8UC3),
+            "ycrcb": cv2.cuda_GpuMat(th, tw, cv2.CV_8UC3),
+            "channels": [cv2.cuda_GpuMat(th, tw, cv2.CV_8UC1) for _ in range(3)],
+            "y_enhanced": cv2.cuda_GpuMat(th, tw, cv2.CV_8UC1),
+            "ycrcb_enhanced": cv2.cuda_GpuMat(th, tw, cv2.CV_8UC3),
+            "bgr_enhanced": cv2.cuda_GpuMat(th, tw, cv2.CV_8UC3),
+            # CUDA morphology filters only accept 1- or 4-channel 8-bit images
+            "bgra_enhanced": cv2.cuda_GpuMat(th, tw, cv2.CV_8UC4),
+            "sharpened": cv2.cuda_GpuMat(th, tw, cv2.CV_8UC4),
+            "blended": cv2.cuda_GpuMat(th, tw, cv2.CV_8UC4),
+            "output": cv2.cuda_GpuMat(th, tw, cv2.CV_8UC3),
+        }
+        self._gpu_buffers = gpu
+        self.buffer_allocations += len(gpu) + 2
+        self._gpu_morph_filter = cv2.cuda.createMorphologyFilter(
+            cv2.MORPH_GRADIENT, cv2.CV_8UC4, self.sharpen_kernel
+        )
+        self._gpu_stream = cv2.cuda.Stream_Null()
+        self.buffer_allocations += 1
+
+    def _track_output(self, result: np.ndarray, buffer: np.ndarray) -> None:
+        """Count cases where OpenCV ignored the preallocated dst and allocated a new array"""
+        if result is not buffer:
+            self.steady_state_allocations += 1
+
     def _process_frame_gpu(self, frame: np.ndarray) -> np.ndarray:
-        """GPU-accelerated frame processing pipeline"""
+        """
+        GPU-accelerated frame processing pipeline.
+        The returned array is a pipeline-owned buffer reused by the next call.
+        """
         try:
-            # Upload to GPU
-            gpu_frame = cv2.cuda_GpuMat()
-            gpu_frame.upload(frame)
+            gpu = self._gpu_buffers
+            stream = self._gpu_stream
+
+            # Upload to GPU (reuses the persistent device allocation)
+            gpu["input"].upload(frame)
 
             # Resize on GPU
             h, w = frame.shape[:2]
             if w != self.target_width or h != self.target_height:
-                gpu_resized = cv2.cuda.resize(
-                    gpu_frame,
-                    (self.target_width, self.target_height)
+                cv2.cuda.resize(
+                    gpu["input"],
+                    (self.target_width, self.target_height),
+                    dst=gpu["resized"]
                 )
+                gpu_resized = gpu["resized"]
             else:
-                gpu_resized = gpu_frame
+                gpu_resized = gpu["input"]
 
             # Convert BGR to YCrCb on GPU for CLAHE processing
-            gpu_ycrcb = cv2.cuda.cvtColor(gpu_resized, cv2.COLOR_BGR2YCrCb)
+            cv2.cuda.cvtColor(gpu_resized, cv2.COLOR_BGR2YCrCb, dst=gpu["ycrcb"])
 
-            # Extract Y channel
-            gpu_y_channel = cv2.cuda.split(gpu_ycrcb)[0]
+            # Split once into persistent Y/Cr/Cb planes
+            cv2.cuda.split(gpu["ycrcb"], gpu["channels"])
+            gpu_y, gpu_cr, gpu_cb = gpu["channels"]
 
             # Apply CLAHE (Contrast Limited Adaptive Histogram Equalization) on GPU
             # Improves visibility in low-light conditions
-            gpu_clahe_y = self.clahe_gpu.apply(gpu_y_channel)
+            self.clahe_gpu.apply(gpu_y, stream, dst=gpu["y_enhanced"])
 
             # Merge channels back
-            gpu_cr, gpu_cb = cv2.cuda.split(gpu_ycrcb)[1:]
-            gpu_ycrcb_enhanced = cv2.cuda.merge([gpu_clahe_y, gpu_cr, gpu_cb])
+            cv2.cuda.merge([gpu["y_enhanced"], gpu_cr, gpu_cb], gpu["ycrcb_enhanced"])
 
             # Convert back to BGR on GPU
-            gpu_bgr_enhanced = cv2.cuda.cvtColor(gpu_ycrcb_enhanced, cv2.COLOR_YCrCb2BGR)
+            cv2.cuda.cvtColor(gpu["ycrcb_enhanced"], cv2.COLOR_YCrCb2BGR, dst=gpu["bgr_enhanced"])
+            cv2.cuda.cvtColor(gpu["bgr_enhanced"], cv2.COLOR_BGR2BGRA, dst=gpu["bgra_enhanced"])
 
             # Apply slight sharpening on GPU
-            kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
-            gpu_sharpened = cv2.cuda.morphologyEx(gpu_bgr_enhanced, cv2.MORPH_GRADIENT, kernel)
+            self._gpu_morph_filter.apply(gpu["bgra_enhanced"], gpu["sharpened"])
 
             # Blend sharpened result (20% sharpening)
-            gpu_output = cv2.cuda.addWeighted(gpu_bgr_enhanced, 0.8, gpu_sharpened, 0.2, 0)
+            cv2.cuda.addWeighted(
+                gpu["bgra_enhanced"], 0.8, gpu["sharpened"], 0.2, 0, dst=gpu["blended"]
+            )
+            cv2.cuda.cvtColor(gpu["blended"], cv2.COLOR_BGRA2BGR, dst=gpu["output"])
 
-            # Download from GPU
-            processed_frame = gpu_output.download()
+            # Download from GPU into the persistent host buffer
+            host_output = self._cpu_buffers["output"]
+            processed_frame = gpu["output"].download(host_output)
+            self._track_output(processed_frame, host_output)
 
             return processed_frame
 
@@ -188,32 +285,44 @@ class CUDAPipeline:
             return self._process_frame_cpu(frame)
 
     def _process_frame_cpu(self, frame: np.ndarray) -> np.ndarray:
-        """CPU-based frame processing pipeline (fallback)"""
+        """
+        CPU-based frame processing pipeline (fallback).
+        The returned array is a pipeline-owned buffer reused by the next call.
+        """
+        buf = self._cpu_buffers
+
         # Resize
         h, w = frame.shape[:2]
         if w != self.target_width or h != self.target_height:
-            resized = cv2.resize(frame, (self.target_width, self.target_height))
+            resized = cv2.resize(frame, (self.target_width, self.target_height), dst=buf["resized"])
+            self._track_output(resized, buf["resized"])
         else:
-            resized = frame.copy()
+            resized = frame
 
         # Convert to YCrCb
-        ycrcb = cv2.cvtColor(resized, cv2.COLOR_BGR2YCrCb)
+        ycrcb = cv2.cvtColor(resized, cv2.COLOR_BGR2YCrCb, dst=buf["ycrcb"])
+        self._track_output(ycrcb, buf["ycrcb"])
 
         # Apply CLAHE to Y channel
-        clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
-        y_channel = ycrcb[:, :, 0]
-        y_enhanced = clahe.apply(y_channel)
+        y_channel = cv2.extractChannel(ycrcb, 0, dst=buf["y"])
+        self._track_output(y_channel, buf["y"])
+        y_enhanced = self.clahe_cpu.apply(y_channel, dst=buf["y_enhanced"])
+        self._track_output(y_enhanced, buf["y_enhanced"])
 
         # Merge back
-        ycrcb[:, :, 0] = y_enhanced
-        bgr_enhanced = cv2.cvtColor(ycrcb, cv2.COLOR_YCrCb2BGR)
+        cv2.insertChannel(y_enhanced, ycrcb, 0)
+        bgr_enhanced = cv2.cvtColor(ycrcb, cv2.COLOR_YCrCb2BGR, dst=buf["bgr_enhanced"])
+        self._track_output(bgr_enhanced, buf["bgr_enhanced"])
 
         # Apply slight sharpening
-        kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
-        sharpened = cv2.morphologyEx(bgr_enhanced, cv2.MORPH_GRADIENT, kernel)
+        sharpened = cv2.morphologyEx(
+            bgr_enhanced, cv2.MORPH_GRADIENT, self.sharpen_kernel, dst=buf["sharpened"]
+        )
+        self._track_output(sharpened, buf["sharpened"])
 
         # Blend sharpened result (20% sharpening)
-        output = cv2.addWeighted(bgr_enhanced, 0.8, sharpened, 0.2, 0)
+        output = cv2.addWeighted(bgr_enhanced, 0.8, sharpened, 0.2, 0, dst=buf["output"])
+        self._track_output(output, buf["output"])
 
         return output
 
@@ -296,9 +405,8 @@ class CUDAPipeline:
     def _apply_clahe_cpu(self, frame: np.ndarray) -> np.ndarray:
         """CPU-based CLAHE"""
         ycrcb = cv2.cvtColor(frame, cv2.COLOR_BGR2YCrCb)
-        clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
         y_channel = ycrcb[:, :, 0]
-        ycrcb[:, :, 0] = clahe.apply(y_channel)
+        ycrcb[:, :, 0] = self.clahe_cpu.apply(y_channel)
         return cv2.cvtColor(ycrcb, cv2.COLOR_YCrCb2BGR)
 
     def get_backend_info(self) -> dict:
@@ -313,6 +421,10 @@ class CUDAPipeline:
             "cuda_enabled": self.cuda_enabled,
             "target_width": self.target_width,
             "target_height": self.target_height,
+            "frames_processed": self.frames_processed,
+            "buffer_allocations": self.buffer_allocations,
+            "geometry_rebuilds": self.geometry_rebuilds,
+            "steady_state_allocations": self.steady_state_allocations,
         }
 
         if self.device_info:
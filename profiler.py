@@ -0,0 +1,222 @@
+"""
+Stage Latency Profiler
+Per-stage frame-loop timing with fixed-size histograms and Chrome trace export
+Built on perf_counter_ns; recording a stage costs a few hundred nanoseconds
+Part of NeuroGaze Elite
+"""
+
+import json
+import math
+import time
+import logging
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class StageHistogram:
+    """
+    Fixed-size log-spaced latency histogram for one stage.
+    Buckets cover 1 us .. ~10 s; percentiles are bucket upper bounds.
+    """
+
+    NUM_BUCKETS = 128
+    MIN_NS = 1_000
+    MAX_NS = 10_000_000_000
+
+    # Shared bucket edges (upper bound of each bucket, in ns)
+    _LOG_MIN = math.log(MIN_NS)
+    _LOG_SPAN = math.log(MAX_NS) - math.log(MIN_NS)
+    BUCKET_EDGES_NS = np.exp(
+        np.linspace(math.log(MIN_NS), math.log(MAX_NS), NUM_BUCKETS)
+    )
+
+    def __init__(self):
+        self.counts = np.zeros(self.NUM_BUCKETS, dtype=np.int64)
+        self.total = 0
+        self.sum_ns = 0
+        self.max_ns = 0
+        self.last_ns = 0
+
+    def record(self, duration_ns: int) -> None:
+        """Add one sample"""
+        if duration_ns <= self.MIN_NS:
+            idx = 0
+        else:
+            idx = int((math.log(duration_ns) - self._LOG_MIN) / self._LOG_SPAN * (self.NUM_BUCKETS - 1)) + 1
+            if idx >= self.NUM_BUCKETS:
+                idx = self.NUM_BUCKETS - 1
+        self.counts[idx] += 1
+        self.total += 1
+        self.sum_ns += duration_ns
+        self.last_ns = duration_ns
+        if duration_ns > self.max_ns:
+            self.max_ns = duration_ns
+
+    def percentile_ns(self, pct: float) -> float:
+        """Approximate percentile (0-100) in nanoseconds"""
+        if self.total == 0:
+            return 0.0
+        target = max(1, int(math.ceil(self.total * pct / 100.0)))
+        idx = int(np.searchsorted(np.cumsum(self.counts), target))
+        return float(min(self.BUCKET_EDGES_NS[idx], self.max_ns))
+
+    def mean_ns(self) -> float:
+        return self.sum_ns / self.total if self.total else 0.0
+
+    def reset(self) -> None:
+        self.counts.fill(0)
+        self.total = 0
+        self.sum_ns = 0
+        self.max_ns = 0
+        self.last_ns = 0
+
+
+class StageProfiler:
+    """
+    Lightweight per-stage timer for the main frame loop.
+
+    Usage:
+        profiler.begin_frame()
+        with profiler.stage("face"):
+            ...
+        profiler.end_frame()
+    """
+
+    def __init__(self, enabled: bool = True, trace_frames: int = 300):
+        """
+        Initialize profiler.
+
+        Args:
+            enabled: When False, stage()/record() are no-ops
+            trace_frames: Number of recent frames kept for Chrome trace export (0 disables)
+        """
+        self.enabled = enabled
+        self.histograms: Dict[str, StageHistogram] = {}
+        self.stage_order: List[str] = []
+        self.trace_frames = trace_frames
+        self._trace: deque = deque(maxlen=max(1, trace_frames))
+        self._frame_events: List[Tuple[str, int, int]] = []
+        self._frame_start_ns = 0
+        self._origin_ns = time.perf_counter_ns()
+        self.frame_index = 0
+
+    def _histogram(self, name: str) -> StageHistogram:
+        hist = self.histograms.get(name)
+        if hist is None:
+            hist = StageHistogram()
+            self.histograms[name] = hist
+            self.stage_order.append(name)
+        return hist
+
+    def begin_frame(self) -> None:
+        """Mark the start of a frame"""
+        if not self.enabled:
+            return
+        self._frame_start_ns = time.perf_counter_ns()
+        self._frame_events = []
+
+    def end_frame(self) -> None:
+        """Mark the end of a frame; records the 'frame' total and stores trace events"""
+        if not self.enabled or self._frame_start_ns == 0:
+            return
+        end_ns = time.perf_counter_ns()
+        self.record("frame", self._frame_start_ns, end_ns)
+        if self.trace_frames > 0:
+            self._trace.append((self.frame_index, self._frame_events))
+        self._frame_start_ns = 0
+        self.frame_index += 1
+
+    def record(self, name: str, start_ns: int, end_ns: int) -> None:
+        """Record a stage interval measured with time.perf_counter_ns()"""
+        if not self.enabled:
+            return
+        self._histogram(name).record(end_ns - start_ns)
+        if self.trace_frames > 0:
+            self._frame_events.append((name, start_ns, end_ns))
+
+    @contextmanager
+    def stage(self, name: str):
+        """Context manager timing a named stage"""
+        if not self.enabled:
+            yield
+            return
+        start_ns = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.record(name, start_ns, time.perf_counter_ns())
+
+    def get_stage_stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Per-stage latency summary in milliseconds.
+
+        Returns:
+            {stage: {"p50", "p95", "p99", "mean", "max", "last", "count"}}
+        """
+        stats = {}
+        for name in self.stage_order:
+            hist = self.histograms[name]
+            stats[name] = {
+                "p50": hist.percentile_ns(50) / 1e6,
+                "p95": hist.percentile_ns(95) / 1e6,
+                "p99": hist.percentile_ns(99) / 1e6,
+                "mean": hist.mean_ns() / 1e6,
+                "max": hist.max_ns / 1e6,
+                "last": hist.last_ns / 1e6,
+                "count": hist.total,
+            }
+        return stats
+
+    def format_summary(self) -> str:
+        """One-line summary for periodic logging"""
+        parts = []
+        for name, s in self.get_stage_stats().items():
+            parts.append(f"{name} {s['p50']:.1f}/{s['p95']:.1f}/{s['p99']:.1f}")
+        return "stage ms p50/p95/p99: " + " | ".join(parts)
+
+    def export_chrome_trace(self, path: Path) -> Optional[Path]:
+        """
+        Write the last N frames as Chrome trace JSON (chrome://tracing, Perfetto).
+
+        Args:
+            path: Output file path
+
+        Returns:
+            Path written, or None on failure
+        """
+        events = []
+        for frame_index, frame_events in self._trace:
+            for name, start_ns, end_ns in frame_events:
+                events.append({
+                    "name": name,
+                    "cat": "frame" if name == "frame" else "stage",
+                    "ph": "X",
+                    "ts": (start_ns - self._origin_ns) / 1000.0,
+                    "dur": (end_ns - start_ns) / 1000.0,
+                    "pid": 1,
+                    "tid": 1,
+                    "args": {"frame": frame_index},
+                })
+        try:
+            path = Path(path)
+            with path.open("w", encoding="utf-8") as f:
+                json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+            logger.info(f"Chrome trace saved -> {path.name} ({len(self._trace)} frames)")
+            return path
+        except Exception as exc:
+            logger.warning(f"Could not save Chrome trace: {exc}")
+            return None
+
+    def reset(self) -> None:
+        """Clear all histograms and trace data"""
+        for hist in self.histograms.values():
+            hist.reset()
+        self._trace.clear()
+        self._frame_events = []
+        self.frame_index = 0
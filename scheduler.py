@@ -0,0 +1,218 @@
+"""
+Adaptive Stage Scheduler
+Per-stage target rates for the frame loop, degraded under load to hold a latency SLO
+Skipped stages reuse their last result; the caller decides how stale is acceptable
+Part of NeuroGaze Elite
+"""
+
+import time
+import logging
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class StageRate:
+    """Scheduling state for one frame-loop stage"""
+    name: str
+    target_hz: float            # Desired rate (0 = every frame)
+    min_hz: float               # Floor when degrading under load
+    priority: int = 0           # Lower priority stages are degraded first
+    current_hz: float = 0.0     # Rate currently in effect
+    last_run: float = 0.0       # Timestamp of the last run (0 = never)
+    runs: int = 0
+    skips: int = 0
+
+
+class StageScheduler:
+    """
+    Decides per frame which stages run.
+
+    Each stage has a target rate; when the smoothed frame latency exceeds the
+    SLO the lowest-priority stage is slowed down (never below its floor), and
+    when there is headroom again rates are restored highest-priority first.
+    """
+
+    # A stage is due slightly early so that frame jitter does not push a
+    # 15 Hz stage on a 30 fps camera down to 10 Hz
+    DUE_TOLERANCE = 0.9
+    DEGRADE_FACTOR = 0.7
+    RESTORE_FACTOR = 1.25
+    HEADROOM_RATIO = 0.75
+
+    def __init__(
+        self,
+        latency_slo_ms: float = 30.0,
+        enabled: bool = True,
+        adaptive: bool = True,
+        adapt_interval_frames: int = 30,
+        ewma_alpha: float = 0.1
+    ):
+        """
+        Initialize scheduler.
+
+        Args:
+            latency_slo_ms: Target per-frame processing latency
+            enabled: When False every stage runs every frame
+            adaptive: Adjust rates to hold the SLO (False keeps target rates fixed)
+            adapt_interval_frames: Frames between rate adjustments
+            ewma_alpha: Smoothing factor for the frame latency average
+        """
+        self.latency_slo_ms = latency_slo_ms
+        self.enabled = enabled
+        self.adaptive = adaptive
+        self.adapt_interval_frames = max(1, adapt_interval_frames)
+        self.ewma_alpha = ewma_alpha
+
+        self.stages: Dict[str, StageRate] = {}
+        self.latency_ewma_ms = 0.0
+        self.frames_observed = 0
+        self.degrade_events = 0
+        self.restore_events = 0
+
+    def add_stage(
+        self,
+        name: str,
+        target_hz: float,
+        min_hz: Optional[float] = None,
+        priority: int = 0
+    ) -> None:
+        """
+        Register a stage.
+
+        Args:
+            name: Stage name
+            target_hz: Desired rate in Hz (0 = every frame, never degraded)
+            min_hz: Lowest rate under load (defaults to target_hz, i.e. not adaptive)
+            priority: Lower values are degraded first and restored last
+        """
+        min_hz = target_hz if min_hz is None else min(min_hz, target_hz)
+        self.stages[name] = StageRate(
+            name=name,
+            target_hz=target_hz,
+            min_hz=min_hz,
+            priority=priority,
+            current_hz=target_hz
+        )
+
+    def should_run(self, name: str, now: Optional[float] = None) -> bool:
+        """
+        Check whether a stage is due this frame; marks it as run if so.
+
+        Args:
+            name: Stage name (unknown stages always run)
+            now: Current timestamp in seconds (time.time() if None),
+                 normally the capture time of the frame
+
+        Returns:
+            True if the stage should run, False to reuse its last result
+        """
+        stage = self.stages.get(name)
+        if stage is None:
+            return True
+        now = time.time() if now is None else now
+
+        due = (
+            not self.enabled
+            or stage.current_hz <= 0
+            or stage.last_run == 0.0
+            or now - stage.last_run >= self.DUE_TOLERANCE / stage.current_hz
+        )
+        if due:
+            stage.last_run = now
+            stage.runs += 1
+        else:
+            stage.skips += 1
+        return due
+
+    def result_age_ms(self, name: str, now: Optional[float] = None) -> float:
+        """Milliseconds since the stage last ran (-1 if never)"""
+        stage = self.stages.get(name)
+        if stage is None or stage.last_run == 0.0:
+            return -1.0
+        now = time.time() if now is None else now
+        return max(0.0, (now - stage.last_run) * 1000.0)
+
+    def observe_frame(self, latency_ms: float) -> None:
+        """
+        Feed the processing latency of a finished frame.
+
+        Args:
+            latency_ms: Time spent processing the frame (excluding the wait for the camera)
+        """
+        if self.frames_observed == 0:
+            self.latency_ewma_ms = latency_ms
+        else:
+            self.latency_ewma_ms += self.ewma_alpha * (latency_ms - self.latency_ewma_ms)
+        self.frames_observed += 1
+
+        if not (self.enabled and self.adaptive):
+            return
+        if self.frames_observed % self.adapt_interval_frames != 0:
+            return
+
+        if self.latency_ewma_ms > self.latency_slo_ms:
+            self._degrade()
+        elif self.latency_ewma_ms < self.latency_slo_ms * self.HEADROOM_RATIO:
+            self._restore()
+
+    def _degrade(self) -> None:
+        candidates = [
+            s for s in self.stages.values()
+            if s.current_hz > 0 and s.current_hz > s.min_hz
+        ]
+        if not candidates:
+            return
+        stage = min(candidates, key=lambda s: s.priority)
+        stage.current_hz = max(stage.min_hz, stage.current_hz * self.DEGRADE_FACTOR)
+        self.degrade_events += 1
+        logger.info(
+            f"Scheduler: frame latency {self.latency_ewma_ms:.1f}ms > SLO {self.latency_slo_ms:.1f}ms, "
+            f"{stage.name} -> {stage.current_hz:.1f} Hz"
+        )
+
+    def _restore(self) -> None:
+        candidates = [
+            s for s in self.stages.values()
+            if s.current_hz > 0 and s.current_hz < s.target_hz
+        ]
+        if not candidates:
+            return
+        stage = max(candidates, key=lambda s: s.priority)
+        stage.current_hz = min(stage.target_hz, stage.current_hz * self.RESTORE_FACTOR)
+        self.restore_events += 1
+        logger.debug(f"Scheduler: headroom available, {stage.name} -> {stage.current_hz:.1f} Hz")
+
+    def get_rates(self) -> Dict[str, float]:
+        """Current rate per stage in Hz (0 = every frame)"""
+        return {name: stage.current_hz for name, stage in self.stages.items()}
+
+    def get_stats(self) -> Dict[str, object]:
+        """Scheduler diagnostics"""
+        return {
+            "enabled": self.enabled,
+            "adaptive": self.adaptive,
+            "latency_slo_ms": self.latency_slo_ms,
+            "latency_ewma_ms": round(self.latency_ewma_ms, 2),
+            "degrade_events": self.degrade_events,
+            "restore_events": self.restore_events,
+            "stages": {
+                name: {
+                    "target_hz": stage.target_hz,
+                    "current_hz": round(stage.current_hz, 2),
+                    "runs": stage.runs,
+                    "skips": stage.skips,
+                }
+                for name, stage in self.stages.items()
+            },
+        }
+
+    def format_summary(self) -> str:
+        """One-line summary for periodic logging"""
+        parts = [
+            f"{name} {'every' if hz <= 0 else f'{hz:.1f}Hz'}"
+            for name, hz in self.get_rates().items()
+        ]
+        return f"schedule (latency {self.latency_ewma_ms:.1f}/{self.latency_slo_ms:.0f}ms): " + " | ".join(parts)
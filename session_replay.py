@@ -0,0 +1,532 @@
+"""
+Session Record & Replay
+Records raw camera sessions (frames + timestamps) and replays them headlessly
+through the full NeuroGazeElite pipeline for deterministic offline benchmarking
+
+Usage:
+  python session_replay.py record  recordings/ward_a --seconds 120
+  python session_replay.py replay  recordings/ward_a --report before.json
+  python session_replay.py replay  recordings/ward_a --realtime --report after.json
+  python session_replay.py compare before.json after.json
+
+Replay reports throughput, per-stage latency (StageProfiler) and the fired
+command sequence. Frames carry their recorded timestamps on a virtual clock,
+which also drives stage scheduling, dwell, fusion windows and command
+cooldowns, so the fired commands do not depend on replay speed.
+
+Part of NeuroGaze Elite
+"""
+
+from __future__ import annotations
+
+import json
+import time
+import difflib
+import logging
+import argparse
+import threading
+from queue import Queue, Full
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Any
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SESSION_META = "session.json"
+TIMESTAMPS_FILE = "timestamps.npy"
+VIDEO_FILE = "frames.avi"
+RAW_FILE = "frames.bin"
+
+
+class SessionRecorder:
+    """
+    Writes frames and capture timestamps to a session directory.
+
+    Formats:
+        "mjpg": Motion-JPEG .avi (compact, lossy)
+        "raw":  uint8 frames appended to frames.bin (lossless, large)
+
+    Encoding/writing happens on a background thread so recording does not
+    stall the frame loop; if the writer falls behind, frames are dropped and
+    counted rather than queued without bound.
+    """
+
+    def __init__(
+        self,
+        session_dir: Path,
+        frame_width: int,
+        frame_height: int,
+        fps: float = 30.0,
+        fmt: str = "mjpg",
+        metadata: Optional[Dict[str, Any]] = None,
+        queue_size: int = 64
+    ):
+        """
+        Initialize recorder.
+
+        Args:
+            session_dir: Output directory (created if missing)
+            frame_width: Frame width in pixels
+            frame_height: Frame height in pixels
+            fps: Nominal camera rate (stored in metadata / video header)
+            fmt: "mjpg" or "raw"
+            metadata: Extra fields stored in session.json (e.g. screen size)
+            queue_size: Max frames buffered for the writer thread
+        """
+        if fmt not in ("mjpg", "raw"):
+            raise ValueError(f"Unknown recording format: {fmt}")
+
+        self.session_dir = Path(session_dir)
+        self.session_dir.mkdir(parents=True, exist_ok=True)
+        self.frame_width = int(frame_width)
+        self.frame_height = int(frame_height)
+        self.fps = fps
+        self.fmt = fmt
+        self.metadata = dict(metadata or {})
+
+        self.timestamps: List[float] = []
+        self.frames_written = 0
+        self.frames_dropped = 0
+
+        if fmt == "mjpg":
+            fourcc = cv2.VideoWriter_fourcc(*"MJPG")
+            self._writer = cv2.VideoWriter(
+                str(self.session_dir / VIDEO_FILE), fourcc, fps,
+                (self.frame_width, self.frame_height)
+            )
+            if not self._writer.isOpened():
+                raise RuntimeError("Could not open MJPG video writer")
+            self._raw_file = None
+        else:
+            self._writer = None
+            self._raw_file = (self.session_dir / RAW_FILE).open("wb")
+
+        self._queue: Queue = Queue(maxsize=queue_size)
+        self._thread = threading.Thread(target=self._write_loop, name="neurogaze-recorder", daemon=True)
+        self._thread.start()
+        logger.info(f"✓ Recording session to {self.session_dir} ({fmt}, {frame_width}x{frame_height})")
+
+    def write(self, frame: np.ndarray, timestamp: float) -> bool:
+        """
+        Queue one frame for writing (the frame is copied).
+
+        Returns:
+            False if the frame was dropped because the writer is behind
+        """
+        if frame.shape[:2] != (self.frame_height, self.frame_width):
+            frame = cv2.resize(frame, (self.frame_width, self.frame_height))
+        else:
+            frame = frame.copy()
+        try:
+            self._queue.put_nowait((frame, timestamp))
+            return True
+        except Full:
+            self.frames_dropped += 1
+            return False
+
+    def _write_loop(self) -> None:
+        """Writer thread"""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            frame, timestamp = item
+            if self._writer is not None:
+                self._writer.write(frame)
+            else:
+                self._raw_file.write(np.ascontiguousarray(frame).tobytes())
+            self.timestamps.append(timestamp)
+            self.frames_written += 1
+
+    def close(self) -> Path:
+        """Flush pending frames and write metadata"""
+        self._queue.put(None)
+        self._thread.join()
+        if self._writer is not None:
+            self._writer.release()
+        if self._raw_file is not None:
+            self._raw_file.close()
+
+        np.save(self.session_dir / TIMESTAMPS_FILE, np.asarray(self.timestamps, dtype=np.float64))
+        meta = {
+            "format": self.fmt,
+            "width": self.frame_width,
+            "height": self.frame_height,
+            "fps": self.fps,
+            "frame_count": self.frames_written,
+            "frames_dropped": self.frames_dropped,
+            "duration_seconds": (self.timestamps[-1] - self.timestamps[0]) if len(self.timestamps) > 1 else 0.0,
+            "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+            **self.metadata,
+        }
+        with (self.session_dir / SESSION_META).open("w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+        logger.info(f"✓ Recording saved: {self.frames_written} frames "
+                    f"({self.frames_dropped} dropped) -> {self.session_dir}")
+        return self.session_dir
+
+
+def load_session_meta(session_dir: Path) -> Dict[str, Any]:
+    """Read session.json from a recording directory"""
+    with (Path(session_dir) / SESSION_META).open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class ReplayFrameSource:
+    """
+    Frame source with the ThreadedCameraCapture interface that plays back a
+    recorded session. Either as fast as possible or at the recorded cadence.
+
+    last_timestamp is the recorded timestamp rebased onto a virtual clock that
+    starts at the wall time of the first read and continues across loops. As
+    fast as possible, clock() stands still at the current frame's timestamp,
+    so time-based decisions see the recorded cadence whatever the replay speed.
+    """
+
+    def __init__(self, session_dir: Path, realtime: bool = False, loop: int = 1):
+        """
+        Initialize replay source.
+
+        Args:
+            session_dir: Directory written by SessionRecorder
+            realtime: Pace frames using the recorded timestamps
+            loop: Number of passes over the recording
+        """
+        self.session_dir = Path(session_dir)
+        self.meta = load_session_meta(self.session_dir)
+        self.realtime = realtime
+        self.loops_remaining = max(1, int(loop))
+        self.frame_width = int(self.meta["width"])
+        self.frame_height = int(self.meta["height"])
+        self.recorded_timestamps = np.load(self.session_dir / TIMESTAMPS_FILE)
+
+        self._cap: Optional[cv2.VideoCapture] = None
+        self._raw: Optional[np.ndarray] = None
+        self._frame_buffer = np.empty((self.frame_height, self.frame_width, 3), dtype=np.uint8)
+        self._index = 0
+        # Virtual clock: value of the first recorded frame, plus the recorded
+        # length of the passes already played (loop > 1)
+        self._clock_origin = 0.0
+        self._pass_offset = 0.0
+        self._open()
+
+        self.failed = False  # Set at end of recording so the main loop exits
+        self.last_frame_id = 0
+        self.last_timestamp = 0.0
+        self.frames_delivered = 0
+
+    def _open(self) -> None:
+        if self.meta["format"] == "raw":
+            count = int(self.meta["frame_count"])
+            self._raw = np.memmap(
+                self.session_dir / RAW_FILE, dtype=np.uint8, mode="r",
+                shape=(count, self.frame_height, self.frame_width, 3)
+            )
+        else:
+            self._cap = cv2.VideoCapture(str(self.session_dir / VIDEO_FILE))
+            if not self._cap.isOpened():
+                raise RuntimeError(f"Could not open recording {self.session_dir / VIDEO_FILE}")
+        self._index = 0
+
+    def start(self) -> None:
+        """Interface parity with ThreadedCameraCapture (the clock starts at the first read)"""
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        """Return the next recorded frame, or (False, None) at end of recording"""
+        total = len(self.recorded_timestamps)
+        if self._index >= total:
+            self.loops_remaining -= 1
+            if self.loops_remaining <= 0:
+                self.failed = True
+                return False, None
+            if self._cap is not None:
+                self._cap.release()
+            self._open()
+            self._pass_offset += self._pass_duration()
+
+        if self._raw is not None:
+            np.copyto(self._frame_buffer, self._raw[self._index])
+            frame = self._frame_buffer
+        else:
+            ret, frame = self._cap.read(self._frame_buffer)
+            if not ret:
+                self._index = total
+                return self.read()
+
+        if self._clock_origin == 0.0:
+            self._clock_origin = time.time()
+        timestamp = (
+            self._clock_origin + self._pass_offset
+            + float(self.recorded_timestamps[self._index] - self.recorded_timestamps[0])
+        )
+        if self.realtime:
+            # Virtual clock starts at the first read, so it is also the due wall time
+            delay = timestamp - time.time()
+            if delay > 0:
+                time.sleep(delay)
+
+        self._index += 1
+        self.frames_delivered += 1
+        self.last_frame_id = self.frames_delivered
+        self.last_timestamp = timestamp
+        return True, frame
+
+    def _pass_duration(self) -> float:
+        """Recorded length of one pass, plus one frame interval before the next"""
+        stamps = self.recorded_timestamps
+        if len(stamps) < 2:
+            return 1.0 / 30.0
+        return float(stamps[-1] - stamps[0]) + float(np.median(np.diff(stamps)))
+
+    def clock(self) -> float:
+        """Current time on the last_timestamp clock"""
+        if self.realtime:
+            return time.time()
+        return self.last_timestamp
+
+    def get_stats(self) -> dict:
+        return {
+            "frames_captured": self.frames_delivered,
+            "frames_delivered": self.frames_delivered,
+            "frames_dropped": 0,
+            "drop_rate": 0.0,
+            "reconnects": 0,
+            "buffer_allocations": 1,
+            "ring_size": 1,
+            "is_running": not self.failed,
+        }
+
+    def stop(self) -> None:
+        if self._cap is not None:
+            self._cap.release()
+            self._cap = None
+        self._raw = None
+
+
+def record_session(
+    session_dir: Path,
+    camera_index: int = 0,
+    seconds: float = 60.0,
+    fmt: str = "mjpg",
+    preview: bool = True
+) -> Path:
+    """
+    Record a live camera session using the same capture path as the app.
+
+    Args:
+        session_dir: Output directory
+        camera_index: Webcam index
+        seconds: Recording length
+        fmt: "mjpg" or "raw"
+        preview: Show a preview window (ESC stops early)
+    """
+    from capture import ThreadedCameraCapture
+
+    def open_camera() -> cv2.VideoCapture:
+        cap = cv2.VideoCapture(camera_index)
+        if not cap.isOpened():
+            raise RuntimeError(f"Camera index {camera_index} unavailable")
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+        cap.set(cv2.CAP_PROP_FPS, 30)
+        return cap
+
+    capture = ThreadedCameraCapture(open_camera)
+    screen_width, screen_height = 1920, 1080
+    try:
+        import pyautogui
+        screen_width, screen_height = pyautogui.size()
+    except Exception:
+        pass
+
+    recorder = SessionRecorder(
+        session_dir, capture.frame_width, capture.frame_height, fmt=fmt,
+        metadata={"camera_index": camera_index, "screen_width": screen_width, "screen_height": screen_height}
+    )
+    capture.start()
+    start = time.time()
+    try:
+        while time.time() - start < seconds:
+            ret, frame = capture.read()
+            if not ret:
+                if capture.failed:
+                    break
+                continue
+            recorder.write(frame, capture.last_timestamp)
+            if preview:
+                cv2.imshow("NeuroGaze Recorder", frame)
+                if (cv2.waitKey(1) & 0xFF) == 27:
+                    break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        capture.stop()
+        if preview:
+            cv2.destroyAllWindows()
+    return recorder.close()
+
+
+def replay_session(
+    session_dir: Path,
+    realtime: bool = False,
+    loop: int = 1,
+    enable_gpu: bool = False,
+    headless: bool = False
+) -> Dict[str, Any]:
+    """
+    Run a recorded session through the full NeuroGazeElite pipeline headlessly.
+
+    Args:
+        session_dir: Directory written by SessionRecorder
+        realtime: Pace frames at the recorded cadence instead of as fast as possible
+        loop: Number of passes over the recording
+        enable_gpu: Allow CUDA/GPU delegates (off by default for reproducibility)
+        headless: Skip HUD rendering as well (measures the deployed headless configuration)
+
+    Returns:
+        Report dict (throughput, per-stage latency, fired commands)
+    """
+    from main_app import NeuroGazeElite, AppConfig, load_config_yaml
+
+    source = ReplayFrameSource(session_dir, realtime=realtime, loop=loop)
+    meta = source.meta
+
+    config = load_config_yaml(AppConfig())
+    # Deterministic settings: synchronous DL and synchronous face tracking
+    config.DL_ASYNC = False
+    # Fixed stage rates: load-adaptive degradation depends on the replay machine
+    config.SCHEDULER_ADAPTIVE = False
+    if config.FACE_RUNNING_MODE == "LIVE_STREAM":
+        config.FACE_RUNNING_MODE = "VIDEO"
+
+    app = NeuroGazeElite(
+        enable_gpu=enable_gpu,
+        simulation_mode=True,
+        config=config,
+        frame_source=source,
+        screen_size=(int(meta.get("screen_width", 1920)), int(meta.get("screen_height", 1080))),
+        show_window=False,
+        headless=headless,
+    )
+
+    start = time.perf_counter()
+    app.run()
+    elapsed = time.perf_counter() - start
+
+    frames = app.frame_count
+    # HUD render/display run on the display thread, outside the frame loop
+    stage_stats = app.profiler.get_stage_stats()
+    if app.hud_display is not None:
+        stage_stats.update(app.hud_display.get_stage_stats())
+    return {
+        "session": str(session_dir),
+        "recorded_frames": int(meta.get("frame_count", 0)),
+        "replayed_frames": frames,
+        "realtime": realtime,
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_fps": round(frames / elapsed, 2) if elapsed > 0 else 0.0,
+        "stage_latency_ms": {
+            name: {k: round(v, 3) for k, v in stats.items()}
+            for name, stats in stage_stats.items()
+        },
+        "schedule": app.scheduler.get_stats()["stages"],
+        "command_latency_ms": app.command_dispatcher.get_stats()["latency_ms"],
+        "commands": [[frame_index, name] for frame_index, name in app.state.command_log],
+        "commands_by_type": dict(app.state.commands_by_type),
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+
+def compare_reports(baseline: Dict[str, Any], candidate: Dict[str, Any]) -> str:
+    """
+    Human-readable diff of two replay reports.
+
+    Args:
+        baseline: Report from the reference build
+        candidate: Report from the build under test
+
+    Returns:
+        Multi-line comparison text
+    """
+    lines = ["=" * 70, "REPLAY COMPARISON", "=" * 70]
+    b_fps = baseline.get("throughput_fps", 0.0)
+    c_fps = candidate.get("throughput_fps", 0.0)
+    change = ((c_fps - b_fps) / b_fps * 100.0) if b_fps else 0.0
+    lines.append(f"Throughput: {b_fps:.1f} -> {c_fps:.1f} fps ({change:+.1f}%)")
+
+    lines.append("")
+    lines.append(f"{'Stage':<14}{'p50 base':>10}{'p50 new':>10}{'p95 base':>10}{'p95 new':>10}")
+    b_stages = baseline.get("stage_latency_ms", {})
+    c_stages = candidate.get("stage_latency_ms", {})
+    for name in list(dict.fromkeys(list(b_stages) + list(c_stages))):
+        b = b_stages.get(name, {})
+        c = c_stages.get(name, {})
+        lines.append(
+            f"{name:<14}{b.get('p50', 0.0):>10.2f}{c.get('p50', 0.0):>10.2f}"
+            f"{b.get('p95', 0.0):>10.2f}{c.get('p95', 0.0):>10.2f}"
+        )
+
+    lines.append("")
+    b_cmds = [f"{frame_index}: {name}" for frame_index, name in baseline.get("commands", [])]
+    c_cmds = [f"{frame_index}: {name}" for frame_index, name in candidate.get("commands", [])]
+    if b_cmds == c_cmds:
+        lines.append(f"Commands: identical ({len(b_cmds)} fired)")
+    else:
+        lines.append(f"Commands: {len(b_cmds)} -> {len(c_cmds)} fired, differences:")
+        lines.extend(
+            line for line in difflib.unified_diff(b_cmds, c_cmds, "baseline", "candidate", lineterm="")
+        )
+    return "\n".join(lines)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="NeuroGaze session record & replay")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    rec = sub.add_parser("record", help="Record a live camera session")
+    rec.add_argument("session_dir", type=Path)
+    rec.add_argument("--camera", type=int, default=0, help="Camera index")
+    rec.add_argument("--seconds", type=float, default=60.0, help="Recording length")
+    rec.add_argument("--format", choices=["mjpg", "raw"], default="mjpg", help="Frame storage format")
+    rec.add_argument("--no-preview", action="store_true", help="Do not show a preview window")
+
+    rep = sub.add_parser("replay", help="Replay a session through the full pipeline")
+    rep.add_argument("session_dir", type=Path)
+    rep.add_argument("--realtime", action="store_true", help="Replay at the recorded cadence")
+    rep.add_argument("--loop", type=int, default=1, help="Number of passes over the recording")
+    rep.add_argument("--gpu", action="store_true", help="Allow GPU acceleration")
+    rep.add_argument("--headless", action="store_true", help="Skip HUD rendering")
+    rep.add_argument("--report", type=Path, default=None, help="Write JSON report to this path")
+
+    cmp_parser = sub.add_parser("compare", help="Compare two replay reports")
+    cmp_parser.add_argument("baseline", type=Path)
+    cmp_parser.add_argument("candidate", type=Path)
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    if args.command == "record":
+        record_session(args.session_dir, args.camera, args.seconds, args.format, not args.no_preview)
+    elif args.command == "replay":
+        report = replay_session(args.session_dir, args.realtime, args.loop, args.gpu, args.headless)
+        print(f"Replayed {report['replayed_frames']} frames in {report['elapsed_seconds']:.1f}s "
+              f"({report['throughput_fps']:.1f} fps), {len(report['commands'])} commands")
+        for name, stats in report["stage_latency_ms"].items():
+            print(f"  {name:<14} p50 {stats['p50']:7.2f}  p95 {stats['p95']:7.2f}  p99 {stats['p99']:7.2f} ms")
+        if args.report:
+            with args.report.open("w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+            print(f"Report saved -> {args.report}")
+    else:
+        with args.baseline.open("r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        with args.candidate.open("r", encoding="utf-8") as f:
+            candidate = json.load(f)
+        print(compare_reports(baseline, candidate))
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -3,12 +3,15 @@ Kalman Filter for Gaze Tracking with GPU Support
 2D Kalman filter with optional CuPy GPU acceleration and velocity tracking
 Fixes GAP 2: Wires Kalman velocity output for intent detection
 Feature B: CuPy GPU tensors for accelerated state matrix operations
+Offline: batched multi-track filtering and RTS / fixed-lag smoothing of recorded trajectories
 Part of NeuroGaze Elite
 """
 
+import math
+import time
 import numpy as np
 import logging
-from typing import Tuple, Optional
+from typing import Dict, Optional, Sequence, Tuple
 from dataclasses import dataclass
 
 logger = logging.getLogger(__name__)
@@ -36,18 +39,26 @@ class KalmanState:
 class KalmanFilter2D:
     """
     2D Kalman filter for smooth gaze position tracking.
-    Supports both CPU (NumPy) and GPU (CuPy) backends.
+    Supports a closed-form scalar backend (default) and matrix CPU (NumPy) / GPU (CuPy) backends.
     
     State vector: [x, y, vx, vy]
     - x, y: screen position
     - vx, vy: velocity (pixels per frame)
+    
+    With the constant-velocity model, Q = q*I, R = r*I and P0 = I, the x and y
+    axes never couple and share the same 2x2 covariance, so the scalar backend
+    tracks one [[p00, p01], [p01, p11]] block and updates both axes with plain
+    floats (no arrays, no inverse, no host-device syncs).
     """
     
+    BACKENDS = ("scalar", "matrix")
+    
     def __init__(
         self,
         process_variance: float = 1e-5,
         measurement_variance: float = 1e-1,
-        use_gpu: bool = True
+        use_gpu: bool = True,
+        backend: str = "scalar"
     ):
         """
         Initialize Kalman filter.
@@ -55,12 +66,23 @@ class KalmanFilter2D:
         Args:
             process_variance: Process noise covariance (lower = smoother)
             measurement_variance: Measurement noise covariance (sensor accuracy)
-            use_gpu: Try to use GPU (CuPy) if available
+            use_gpu: Try to use GPU (CuPy) if available (matrix backend only)
+            backend: "scalar" (closed-form per-axis filter) or "matrix" (4x4 NumPy/CuPy)
         """
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown Kalman backend: {backend}")
         self.process_variance = process_variance
         self.measurement_variance = measurement_variance
-        self.use_gpu = use_gpu and CUPY_AVAILABLE
-        self.backend = "GPU" if self.use_gpu else "CPU"
+        self.scalar = backend == "scalar"
+        self.use_gpu = use_gpu and CUPY_AVAILABLE and not self.scalar
+        if self.scalar:
+            self.backend = "scalar"
+        else:
+            self.backend = "GPU" if self.use_gpu else "CPU"
+        
+        # Scalar backend state: per-axis position/velocity and the shared covariance block
+        self._x = self._y = self._vx = self._vy = 0.0
+        self._p00, self._p01, self._p11 = 1.0, 0.0, 1.0
         
         # Choose numpy/cupy backend
         self.xp = cp if self.use_gpu else np
@@ -96,11 +118,27 @@ class KalmanFilter2D:
         self.initialized = False
         self.frame_count = 0
         
-        if self.use_gpu:
+        if self.scalar:
+            logger.info(f"Kalman filter using closed-form scalar backend")
+        elif self.use_gpu:
             logger.info(f"✓ Kalman filter using GPU backend (CuPy)")
         else:
             logger.info(f"Kalman filter using CPU backend (NumPy)")
     
+    def set_noise(self, process_variance: float, measurement_variance: float) -> None:
+        """
+        Change process / measurement noise (keeps state and covariance).
+        
+        Args:
+            process_variance: New process noise (Q = q * I)
+            measurement_variance: New measurement noise (R = r * I)
+        """
+        self.process_variance = process_variance
+        self.measurement_variance = measurement_variance
+        if not self.scalar:
+            self.Q = self.xp.eye(4, dtype=self.xp.float32) * process_variance
+            self.R = self.xp.eye(2, dtype=self.xp.float32) * measurement_variance
+    
     def predict(self) -> Tuple[float, float]:
         """
         Predict next state based on motion model.
@@ -109,6 +147,16 @@ class KalmanFilter2D:
         Returns:
             Predicted (x, y) position
         """
+        if self.scalar:
+            # x' = x + v;  P' = F P F^T + q I  for F = [[1, 1], [0, 1]]
+            self._x += self._vx
+            self._y += self._vy
+            p01_p11 = self._p01 + self._p11
+            self._p00 = self._p00 + self._p01 + p01_p11 + self.process_variance
+            self._p01 = p01_p11
+            self._p11 = self._p11 + self.process_variance
+            return self._x, self._y
+        
         # Predict state: x_pred = F @ x
         self.state = self.F @ self.state
         
@@ -131,6 +179,9 @@ class KalmanFilter2D:
         Returns:
             Updated (x, y) filtered position
         """
+        if self.scalar:
+            return self._update_scalar(measurement)
+        
         z = self.xp.array([[measurement[0]], [measurement[1]]], dtype=self.xp.float32)
         
         if not self.initialized:
@@ -174,6 +225,42 @@ class KalmanFilter2D:
         
         return x, y
     
+    def _update_scalar(self, measurement: Tuple[float, float]) -> Tuple[float, float]:
+        """Closed-form update for the decoupled per-axis filters"""
+        mx = float(measurement[0])
+        my = float(measurement[1])
+        
+        if not self.initialized:
+            self._x, self._y = mx, my
+            self._vx = self._vy = 0.0
+            self.initialized = True
+            self.frame_count = 1
+            return measurement
+        
+        self.frame_count += 1
+        
+        # Innovation covariance S = p00 + r is the same for both axes,
+        # so the gain K = [p00, p01] / S is shared
+        s = self._p00 + self.measurement_variance
+        if s <= 0.0:
+            s = 1e-6
+        k0 = self._p00 / s
+        k1 = self._p01 / s
+        
+        ix = mx - self._x
+        iy = my - self._y
+        self._x += k0 * ix
+        self._y += k0 * iy
+        self._vx += k1 * ix
+        self._vy += k1 * iy
+        
+        # P = (I - K H) P
+        self._p11 -= k1 * self._p01
+        self._p00 *= (1.0 - k0)
+        self._p01 *= (1.0 - k0)
+        
+        return self._x, self._y
+    
     def get_state(self) -> KalmanState:
         """
         Get complete filter state including velocity.
@@ -182,16 +269,21 @@ class KalmanFilter2D:
         Returns:
             KalmanState dataclass with position, velocity, and confidence
         """
-        x = float(self.state[0, 0])
-        y = float(self.state[1, 0])
-        vx = float(self.state[2, 0])
-        vy = float(self.state[3, 0])
-        
-        # Position covariance (diagonal element)
-        pos_cov = float(self.P[0, 0] + self.P[1, 1])
-        
-        # Velocity covariance
-        vel_cov = float(self.P[2, 2] + self.P[3, 3])
+        if self.scalar:
+            x, y, vx, vy = self._x, self._y, self._vx, self._vy
+            pos_cov = 2.0 * self._p00
+            vel_cov = 2.0 * self._p11
+        else:
+            x = float(self.state[0, 0])
+            y = float(self.state[1, 0])
+            vx = float(self.state[2, 0])
+            vy = float(self.state[3, 0])
+            
+            # Position covariance (diagonal element)
+            pos_cov = float(self.P[0, 0] + self.P[1, 1])
+            
+            # Velocity covariance
+            vel_cov = float(self.P[2, 2] + self.P[3, 3])
         
         # Confidence based on covariance (lower = higher confidence)
         confidence = max(0.0, 1.0 - (pos_cov + vel_cov) / 10.0)
@@ -212,6 +304,8 @@ class KalmanFilter2D:
         Returns:
             (vx, vy) velocity in pixels per frame
         """
+        if self.scalar:
+            return self._vx, self._vy
         vx = float(self.state[2, 0])
         vy = float(self.state[3, 0])
         return vx, vy
@@ -225,14 +319,18 @@ class KalmanFilter2D:
             Speed in pixels per frame
         """
         vx, vy = self.get_velocity()
-        return np.sqrt(vx**2 + vy**2)
+        return math.sqrt(vx * vx + vy * vy)
     
     def get_position(self) -> Tuple[float, float]:
         """Get current position estimate"""
+        if self.scalar:
+            return self._x, self._y
         return float(self.state[0, 0]), float(self.state[1, 0])
     
     def reset(self) -> None:
         """Reset filter state"""
+        self._x = self._y = self._vx = self._vy = 0.0
+        self._p00, self._p01, self._p11 = 1.0, 0.0, 1.0
         self.state = self.xp.zeros((4, 1))
         self.P = self.xp.eye(4, dtype=self.xp.float32)
         self.initialized = False
@@ -249,7 +347,8 @@ class AdaptiveKalmanFilter:
         self,
         base_process_variance: float = 1e-5,
         base_measurement_variance: float = 1e-1,
-        use_gpu: bool = True
+        use_gpu: bool = True,
+        backend: str = "scalar"
     ):
         """
         Initialize adaptive Kalman filter.
@@ -257,7 +356,8 @@ class AdaptiveKalmanFilter:
         Args:
             base_process_variance: Base process noise
             base_measurement_variance: Base measurement noise
-            use_gpu: Use GPU if available
+            use_gpu: Use GPU if available (matrix backend only)
+            backend: KalmanFilter2D backend ("scalar" or "matrix")
         """
         self.base_pv = base_process_variance
         self.base_mv = base_measurement_variance
@@ -265,7 +365,8 @@ class AdaptiveKalmanFilter:
         self.filter = KalmanFilter2D(
             process_variance=base_process_variance,
             measurement_variance=base_measurement_variance,
-            use_gpu=use_gpu
+            use_gpu=use_gpu,
+            backend=backend
         )
         
         self.velocity_history = []
@@ -316,9 +417,7 @@ class AdaptiveKalmanFilter:
             measurement_variance = self.base_mv
         
         # Update filter parameters
-        xp = self.filter.xp
-        self.filter.Q = xp.eye(4, dtype=xp.float32) * process_variance
-        self.filter.R = xp.eye(2, dtype=xp.float32) * measurement_variance
+        self.filter.set_noise(process_variance, measurement_variance)
     
     def get_state(self) -> KalmanState:
         """Get complete state"""
@@ -346,14 +445,28 @@ class KalmanGaze:
     """
     Comprehensive gaze tracking with Kalman filtering.
     Main interface for gaze position and velocity tracking.
+    
+    With prediction enabled, predict_position() extrapolates the filtered state
+    by the measured capture-to-use latency so the cursor does not trail the eye.
+    The filter itself is untouched, so smoothing is unchanged.
     """
     
+    # Latency compensation limits
+    FIXATION_SPEED_PX = 2.0      # px/frame; no lead below this (noise), full lead at 2x
+    SACCADE_SPEED_PX = 80.0      # px/frame; matches IntentEngine.VELOCITY_THRESHOLD_FAST
+    MAX_LEAD_PX = 80.0           # Largest extrapolation during smooth pursuit
+    MAX_SACCADE_LEAD_PX = 20.0   # Saccades decelerate before landing; linear lead overshoots
+    MAX_LATENCY_S = 0.25         # Larger latencies are stalls, not steady-state lag
+    SACCADE_HOLD_S = 0.15        # Keep the saccade cap while the filter settles after landing
+    
     def __init__(
         self,
         screen_width: int = 1920,
         screen_height: int = 1080,
         use_adaptive: bool = True,
-        use_gpu: bool = True
+        use_gpu: bool = True,
+        backend: str = "scalar",
+        prediction: bool = False
     ):
         """
         Initialize gaze tracker.
@@ -362,16 +475,28 @@ class KalmanGaze:
             screen_width: Screen width in pixels
             screen_height: Screen height in pixels
             use_adaptive: Use adaptive Kalman filter
-            use_gpu: Use GPU if available
+            use_gpu: Use GPU if available (matrix backend only)
+            backend: KalmanFilter2D backend ("scalar" or "matrix")
+            prediction: Enable latency-compensating predict_position()
         """
         self.screen_width = screen_width
         self.screen_height = screen_height
+        self.prediction = prediction
+        
+        # Frame timing for latency compensation (seconds)
+        self.last_timestamp: Optional[float] = None
+        self.frame_interval_s = 1.0 / 30.0
+        self.downstream_latency_s = 0.0
+        self.last_latency_ms = 0.0
+        self.last_lead_px = 0.0
+        self._last_measurement: Optional[Tuple[float, float]] = None
+        self._saccade_until = 0.0
         
         if use_adaptive:
-            self.filter = AdaptiveKalmanFilter(use_gpu=use_gpu)
+            self.filter = AdaptiveKalmanFilter(use_gpu=use_gpu, backend=backend)
             logger.info("Using adaptive Kalman filter")
         else:
-            self.filter = KalmanFilter2D(use_gpu=use_gpu)
+            self.filter = KalmanFilter2D(use_gpu=use_gpu, backend=backend)
             logger.info("Using standard Kalman filter")
         
         self.is_initialized = False
@@ -382,17 +507,32 @@ class KalmanGaze:
             self.filter.update((x, y))
             self.is_initialized = True
     
-    def update_gaze(self, raw_x: float, raw_y: float) -> KalmanState:
+    def update_gaze(
+        self,
+        raw_x: float,
+        raw_y: float,
+        timestamp: Optional[float] = None
+    ) -> KalmanState:
         """
         Update gaze position with raw measurement and return filtered state.
         
         Args:
             raw_x: Raw gaze X coordinate (pixels)
             raw_y: Raw gaze Y coordinate (pixels)
+            timestamp: Capture time of the frame (time.time() clock); used to
+                       measure frame interval and latency for prediction
             
         Returns:
             Filtered KalmanState with position and velocity
         """
+        if timestamp is not None:
+            if self.last_timestamp is not None:
+                interval = timestamp - self.last_timestamp
+                # Ignore gaps (face lost, stalls) when tracking the frame interval
+                if 0.0 < interval < 0.5:
+                    self.frame_interval_s += 0.1 * (interval - self.frame_interval_s)
+            self.last_timestamp = timestamp
+        
         if not self.is_initialized:
             self.initialize_with_position(raw_x, raw_y)
         
@@ -403,13 +543,83 @@ class KalmanGaze:
         # Update filter
         self.filter.predict()
         self.filter.update((clamped_x, clamped_y))
+        self._last_measurement = (clamped_x, clamped_y)
         
-        return self.filter.get_state()
+        state = self.filter.get_state()
+        if timestamp is not None and self.prediction:
+            if math.hypot(state.velocity[0], state.velocity[1]) > self.SACCADE_SPEED_PX:
+                self._saccade_until = timestamp + self.SACCADE_HOLD_S
+        return state
     
     def get_gaze_position(self) -> Tuple[float, float]:
         """Get current filtered gaze position"""
         return self.filter.get_position()
     
+    def observe_downstream_latency(self, latency_s: float) -> None:
+        """
+        Feed a measured latency from position use to execution (e.g. command
+        enqueue -> mouse move); added to the capture latency when predicting.
+        """
+        if 0.0 <= latency_s < self.MAX_LATENCY_S:
+            self.downstream_latency_s += 0.1 * (latency_s - self.downstream_latency_s)
+    
+    def predict_position(self, now: Optional[float] = None) -> Tuple[float, float]:
+        """
+        Filtered position extrapolated to the time it will be used.
+        
+        Lead = velocity * (now - capture timestamp + downstream latency), with no
+        lead during fixation or while the filter is already past the latest
+        measurement (post-saccade overshoot), a small cap during and shortly after
+        saccades, a general cap and clamping to the screen. Returns the filtered position when prediction is
+        disabled or no timestamped update has been seen.
+        
+        Args:
+            now: Current time (time.time() clock); time.time() if None
+            
+        Returns:
+            Predicted (x, y) screen position
+        """
+        x, y = self.filter.get_position()
+        self.last_lead_px = 0.0
+        if not self.prediction or self.last_timestamp is None or not self.is_initialized:
+            return x, y
+        
+        now = time.time() if now is None else now
+        latency_s = min(self.MAX_LATENCY_S, max(0.0, now - self.last_timestamp) + self.downstream_latency_s)
+        self.last_latency_ms = latency_s * 1000.0
+        
+        vx, vy = self.filter.get_velocity()
+        speed = math.hypot(vx, vy)
+        if speed <= self.FIXATION_SPEED_PX:
+            return x, y
+        
+        # Eye already behind the estimate along the motion: the filter is overshooting
+        if self._last_measurement is not None:
+            mx, my = self._last_measurement
+            if (mx - x) * vx + (my - y) * vy < 0.0:
+                return x, y
+        
+        # Ramp in above the fixation threshold so the cursor does not jump
+        ramp = min(1.0, (speed - self.FIXATION_SPEED_PX) / self.FIXATION_SPEED_PX)
+        lead_frames = latency_s / max(self.frame_interval_s, 1e-3)
+        lead_x = vx * lead_frames * ramp
+        lead_y = vy * lead_frames * ramp
+        
+        in_saccade = speed > self.SACCADE_SPEED_PX or self.last_timestamp < self._saccade_until
+        max_lead = self.MAX_SACCADE_LEAD_PX if in_saccade else self.MAX_LEAD_PX
+        lead = math.hypot(lead_x, lead_y)
+        if lead > max_lead:
+            scale = max_lead / lead
+            lead_x *= scale
+            lead_y *= scale
+            lead = max_lead
+        self.last_lead_px = lead
+        
+        return (
+            max(0.0, min(float(self.screen_width), x + lead_x)),
+            max(0.0, min(float(self.screen_height), y + lead_y))
+        )
+    
     def get_gaze_velocity(self) -> Tuple[float, float]:
         """
         Get gaze velocity (pixels per frame).
@@ -432,6 +642,583 @@ class KalmanGaze:
         """Reset filter"""
         self.filter.reset()
         self.is_initialized = False
+        self.last_timestamp = None
+        self.last_lead_px = 0.0
+        self._last_measurement = None
+        self._saccade_until = 0.0
+
+
+class BatchKalmanGaze:
+    """
+    N independent gaze tracks filtered together with NumPy array operations.
+    
+    Structure-of-arrays version of KalmanGaze for offline evaluation over many
+    recorded sessions, multi-camera servers and parameter sweeps. Each track
+    follows exactly the KalmanGaze.update_gaze sequence (closed-form scalar
+    filter, optional adaptive noise, optional screen clamping).
+    """
+    
+    SPEED_HISTORY = 10      # AdaptiveKalmanFilter.max_history
+    MIN_ADAPT_SAMPLES = 5
+    
+    def __init__(
+        self,
+        num_tracks: int,
+        process_variance=1e-5,
+        measurement_variance=1e-1,
+        screen_width: Optional[float] = None,
+        screen_height: Optional[float] = None,
+        use_adaptive: bool = False,
+        coast_missing: bool = False
+    ):
+        """
+        Initialize batch tracker.
+        
+        Args:
+            num_tracks: Number of independent tracks N
+            process_variance: Scalar or (N,) base process noise per track
+            measurement_variance: Scalar or (N,) base measurement noise per track
+            screen_width: Clamp measurements to [0, screen_width] (None = no clamping)
+            screen_height: Clamp measurements to [0, screen_height] (None = no clamping)
+            use_adaptive: Adapt noise to recent speed like AdaptiveKalmanFilter
+            coast_missing: Predict (coast) tracks without a measurement instead of
+                           freezing them; NeuroGazeElite.run freezes (skips the tracker)
+        """
+        self.num_tracks = int(num_tracks)
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+        self.use_adaptive = use_adaptive
+        self.coast_missing = coast_missing
+        
+        n = self.num_tracks
+        self.base_process_variance = np.broadcast_to(
+            np.asarray(process_variance, dtype=np.float64), (n,)).copy()
+        self.base_measurement_variance = np.broadcast_to(
+            np.asarray(measurement_variance, dtype=np.float64), (n,)).copy()
+        
+        # Per-track state (structure of arrays)
+        self.position = np.zeros((n, 2))
+        self.velocity = np.zeros((n, 2))
+        self.p00 = np.ones(n)
+        self.p01 = np.zeros(n)
+        self.p11 = np.ones(n)
+        self.process_variance = self.base_process_variance.copy()
+        self.measurement_variance = self.base_measurement_variance.copy()
+        self.initialized = np.zeros(n, dtype=bool)
+        self.frame_count = np.zeros(n, dtype=np.int64)
+        
+        # Adaptive noise: ring buffer of recent speeds
+        self._speed_history = np.zeros((n, self.SPEED_HISTORY))
+        self._speed_count = np.zeros(n, dtype=np.int64)
+    
+    def reset(self, tracks: Optional[np.ndarray] = None) -> None:
+        """
+        Reset all tracks, or only the selected ones.
+        
+        Args:
+            tracks: Boolean mask or index array of tracks to reset (None = all)
+        """
+        sel = slice(None) if tracks is None else tracks
+        self.position[sel] = 0.0
+        self.velocity[sel] = 0.0
+        self.p00[sel] = 1.0
+        self.p01[sel] = 0.0
+        self.p11[sel] = 1.0
+        self.process_variance[sel] = self.base_process_variance[sel]
+        self.measurement_variance[sel] = self.base_measurement_variance[sel]
+        self.initialized[sel] = False
+        self.frame_count[sel] = 0
+        self._speed_history[sel] = 0.0
+        self._speed_count[sel] = 0
+    
+    def _predict(self, mask: np.ndarray) -> None:
+        q = self.process_variance
+        np.copyto(self.position, self.position + self.velocity, where=mask[:, None])
+        p01_p11 = self.p01 + self.p11
+        np.copyto(self.p00, self.p00 + self.p01 + p01_p11 + q, where=mask)
+        np.copyto(self.p01, p01_p11, where=mask)
+        np.copyto(self.p11, self.p11 + q, where=mask)
+    
+    def _update(self, z: np.ndarray, mask: np.ndarray) -> None:
+        s = self.p00 + self.measurement_variance
+        s = np.where(s <= 0.0, 1e-6, s)
+        k0 = self.p00 / s
+        k1 = self.p01 / s
+        
+        innovation = z - self.position
+        np.copyto(self.position, self.position + k0[:, None] * innovation, where=mask[:, None])
+        np.copyto(self.velocity, self.velocity + k1[:, None] * innovation, where=mask[:, None])
+        
+        np.copyto(self.p11, self.p11 - k1 * self.p01, where=mask)
+        np.copyto(self.p00, self.p00 * (1.0 - k0), where=mask)
+        np.copyto(self.p01, self.p01 * (1.0 - k0), where=mask)
+    
+    def _record_speed(self, mask: np.ndarray) -> None:
+        """Push current speed into the history and adapt noise (AdaptiveKalmanFilter rules)"""
+        if not self.use_adaptive:
+            return
+        idx = np.flatnonzero(mask)
+        if idx.size == 0:
+            return
+        speed = np.hypot(self.velocity[idx, 0], self.velocity[idx, 1])
+        self._speed_history[idx, self._speed_count[idx] % self.SPEED_HISTORY] = speed
+        self._speed_count[idx] += 1
+        
+        count = np.minimum(self._speed_count[idx], self.SPEED_HISTORY)
+        avg_speed = self._speed_history[idx].sum(axis=1) / count
+        ready = count >= self.MIN_ADAPT_SAMPLES
+        
+        pv_scale = np.where(avg_speed < 5.0, 0.5, np.where(avg_speed > 20.0, 2.0, 1.0))
+        mv_scale = np.where(avg_speed < 5.0, 2.0, np.where(avg_speed > 20.0, 0.5, 1.0))
+        sel = idx[ready]
+        self.process_variance[sel] = self.base_process_variance[sel] * pv_scale[ready]
+        self.measurement_variance[sel] = self.base_measurement_variance[sel] * mv_scale[ready]
+    
+    def update(
+        self,
+        measurements: np.ndarray,
+        mask: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Advance all tracks by one frame.
+        
+        Args:
+            measurements: (N, 2) raw gaze positions in pixels; NaN rows count as missing
+            mask: Optional (N,) bool, True where a measurement is present
+            
+        Returns:
+            (N, 2) filtered positions (view of internal state, copy to keep)
+        """
+        z = np.asarray(measurements, dtype=np.float64)
+        present = ~np.isnan(z).any(axis=1)
+        if mask is not None:
+            present &= np.asarray(mask, dtype=bool)
+        
+        # First measurement of a track initialises it with the raw (unclamped) position
+        new = present & ~self.initialized
+        if new.any():
+            self.position[new] = z[new]
+            self.velocity[new] = 0.0
+            self.initialized[new] = True
+            self.frame_count[new] = 1
+            self._record_speed(new)
+        
+        if self.screen_width is not None:
+            z = np.column_stack((
+                np.clip(z[:, 0], 0, self.screen_width),
+                np.clip(z[:, 1], 0, self.screen_height if self.screen_height is not None else np.inf)
+            ))
+        
+        self._predict(self.initialized & (present | self.coast_missing))
+        self._update(z, present)
+        self.frame_count[present] += 1
+        self._record_speed(present)
+        
+        return self.position
+    
+    def filter_sequence(
+        self,
+        measurements: np.ndarray,
+        mask: Optional[np.ndarray] = None,
+        reset: bool = True
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Filter a whole recording.
+        
+        Args:
+            measurements: (T, N, 2) raw gaze positions; NaN marks missing samples
+            mask: Optional (T, N) bool, True where a measurement is present
+            reset: Start from a fresh state
+            
+        Returns:
+            (positions, velocities), each (T, N, 2); NaN until a track is initialised
+        """
+        measurements = np.asarray(measurements, dtype=np.float64)
+        if measurements.ndim != 3 or measurements.shape[1:] != (self.num_tracks, 2):
+            raise ValueError(f"Expected (T, {self.num_tracks}, 2) measurements, got {measurements.shape}")
+        if reset:
+            self.reset()
+        
+        num_frames = measurements.shape[0]
+        positions = np.empty((num_frames, self.num_tracks, 2))
+        velocities = np.empty((num_frames, self.num_tracks, 2))
+        initialized = np.empty((num_frames, self.num_tracks), dtype=bool)
+        for t in range(num_frames):
+            self.update(measurements[t], None if mask is None else mask[t])
+            positions[t] = self.position
+            velocities[t] = self.velocity
+            initialized[t] = self.initialized
+        
+        positions[~initialized] = np.nan
+        velocities[~initialized] = np.nan
+        return positions, velocities
+    
+    def get_states(self) -> Dict[str, np.ndarray]:
+        """
+        Full state of all tracks (same quantities as KalmanFilter2D.get_state).
+        
+        Returns:
+            Dict of arrays: position (N, 2), velocity (N, 2), position_covariance,
+            velocity_covariance, confidence (N,)
+        """
+        pos_cov = 2.0 * self.p00
+        vel_cov = 2.0 * self.p11
+        return {
+            "position": self.position.copy(),
+            "velocity": self.velocity.copy(),
+            "position_covariance": pos_cov,
+            "velocity_covariance": vel_cov,
+            "confidence": np.maximum(0.0, 1.0 - (pos_cov + vel_cov) / 10.0),
+        }
+    
+    def get_state(self, track: int) -> KalmanState:
+        """KalmanState of a single track"""
+        pos_cov = float(2.0 * self.p00[track])
+        vel_cov = float(2.0 * self.p11[track])
+        return KalmanState(
+            position=(float(self.position[track, 0]), float(self.position[track, 1])),
+            velocity=(float(self.velocity[track, 0]), float(self.velocity[track, 1])),
+            position_covariance=pos_cov,
+            velocity_covariance=vel_cov,
+            confidence=max(0.0, 1.0 - (pos_cov + vel_cov) / 10.0)
+        )
+    
+    @classmethod
+    def parameter_sweep(
+        cls,
+        measurements: np.ndarray,
+        process_variances: Sequence[float],
+        measurement_variances: Sequence[float],
+        ground_truth: Optional[np.ndarray] = None,
+        **kwargs
+    ) -> Dict[str, np.ndarray]:
+        """
+        Filter sessions under every (process_variance, measurement_variance) pair in one batch.
+        
+        Args:
+            measurements: (T, 2) single session or (T, S, 2) sessions; NaN = missing
+            process_variances: Candidate process noise values (P of them)
+            measurement_variances: Candidate measurement noise values (M of them)
+            ground_truth: Optional target positions, same shape as measurements
+            **kwargs: Passed to BatchKalmanGaze (screen size, use_adaptive, ...)
+            
+        Returns:
+            Dict with "positions" (P, M, T, S, 2), "jitter" (P, M) mean frame-to-frame
+            acceleration in px, and "rmse" (P, M) against ground_truth if given
+        """
+        measurements = np.asarray(measurements, dtype=np.float64)
+        if measurements.ndim == 2:
+            measurements = measurements[:, None, :]
+        num_frames, num_sessions, _ = measurements.shape
+        pv = np.asarray(process_variances, dtype=np.float64)
+        mv = np.asarray(measurement_variances, dtype=np.float64)
+        
+        # Track layout: (pv, mv, session) flattened
+        grid_pv = np.repeat(pv, mv.size * num_sessions)
+        grid_mv = np.tile(np.repeat(mv, num_sessions), pv.size)
+        tiled = np.tile(measurements, (1, pv.size * mv.size, 1))
+        
+        batch = cls(tiled.shape[1], process_variance=grid_pv, measurement_variance=grid_mv, **kwargs)
+        positions, _ = batch.filter_sequence(tiled)
+        positions = positions.reshape(num_frames, pv.size, mv.size, num_sessions, 2).transpose(1, 2, 0, 3, 4)
+        
+        accel = np.linalg.norm(np.diff(positions, n=2, axis=2), axis=-1)
+        result = {
+            "process_variances": pv,
+            "measurement_variances": mv,
+            "positions": positions,
+            "jitter": np.nanmean(accel.reshape(pv.size, mv.size, -1), axis=2),
+        }
+        if ground_truth is not None:
+            truth = np.asarray(ground_truth, dtype=np.float64).reshape(num_frames, num_sessions, 2)
+            sq_err = np.sum((positions - truth[None, None]) ** 2, axis=-1)
+            result["rmse"] = np.sqrt(np.nanmean(sq_err.reshape(pv.size, mv.size, -1), axis=2))
+        return result
+
+
+@dataclass
+class SmoothedTrajectory:
+    """Offline filter/smoother output for one gaze trajectory"""
+    positions: np.ndarray       # (T, 2) screen position per frame
+    velocities: np.ndarray      # (T, 2) pixels per frame
+    valid: np.ndarray           # (T,) False before the first measurement
+    
+    @property
+    def speeds(self) -> np.ndarray:
+        """(T,) speed in pixels per frame (IntentEngine units)"""
+        return np.hypot(self.velocities[:, 0], self.velocities[:, 1])
+
+
+def _affine_scan(a, b, c, d, ux, uv, reverse=False):
+    """
+    Inclusive scan of the 2x2 affine recurrence s_t = M_t s_{t-1} + u_t.
+    
+    M_t = [[a, b], [c, d]] (T,), u_t = (ux, uv) (T, K) for K independent axes.
+    Returns s_t assuming M_0 = 0 (u_0 is the initial state); log2(T) array passes.
+    With reverse=True the recurrence runs from the end (s_t = M_t s_{t+1} + u_t).
+    """
+    if reverse:
+        a, b, c, d, ux, uv = (arr[::-1] for arr in (a, b, c, d, ux, uv))
+    a, b, c, d = a.copy(), b.copy(), c.copy(), d.copy()
+    ux, uv = ux.copy(), uv.copy()
+    n = a.shape[0]
+    step = 1
+    while step < n:
+        # element t composed after element t - step: (M_t, u_t) o (M_s, u_s)
+        a2, b2, c2, d2 = a[step:], b[step:], c[step:], d[step:]
+        a1, b1, c1, d1 = a[:-step], b[:-step], c[:-step], d[:-step]
+        ux1, uv1 = ux[:-step], uv[:-step]
+        new_ux = a2[:, None] * ux1 + b2[:, None] * uv1 + ux[step:]
+        new_uv = c2[:, None] * ux1 + d2[:, None] * uv1 + uv[step:]
+        new_a = a2 * a1 + b2 * c1
+        new_b = a2 * b1 + b2 * d1
+        new_c = c2 * a1 + d2 * c1
+        new_d = c2 * b1 + d2 * d1
+        a[step:], b[step:], c[step:], d[step:] = new_a, new_b, new_c, new_d
+        ux[step:], uv[step:] = new_ux, new_uv
+        step *= 2
+    if reverse:
+        ux, uv = ux[::-1], uv[::-1]
+    return ux, uv
+
+
+class RTSSmoother:
+    """
+    Offline Rauch-Tung-Striebel smoothing of recorded gaze trajectories.
+    
+    Same constant-velocity model as KalmanFilter2D (Q = q*I, R = r*I, P0 = I
+    predicted once before the first measurement initialises the state, as
+    KalmanGaze.update_gaze calls predict() then update()), run over a whole
+    (T, 2) array: the covariance recursion is data-independent and shared by
+    both axes, and the state recursions are affine, so forward filtering and backward
+    smoothing are evaluated with vectorised prefix scans instead of a per-frame
+    Python loop. Missing samples (NaN) are predicted through and interpolated.
+    """
+    
+    def __init__(self, process_variance: float = 1e-5, measurement_variance: float = 1e-1):
+        """
+        Initialize smoother.
+        
+        Args:
+            process_variance: Process noise (same meaning as KalmanFilter2D)
+            measurement_variance: Measurement noise (same meaning as KalmanFilter2D)
+        """
+        self.process_variance = process_variance
+        self.measurement_variance = measurement_variance
+    
+    def _covariances(self, present: np.ndarray, start: int) -> Dict[str, np.ndarray]:
+        """Predicted/filtered covariance blocks and gains per frame"""
+        n = present.shape[0]
+        q = self.process_variance
+        r = self.measurement_variance
+        out = {key: np.zeros(n) for key in ("pp00", "pp01", "pp11", "pf00", "pf01", "pf11", "k0", "k1")}
+        pp00, pp01, pp11 = out["pp00"], out["pp01"], out["pp11"]
+        pf00, pf01, pf11 = out["pf00"], out["pf01"], out["pf11"]
+        k0s, k1s = out["k0"], out["k1"]
+        
+        # Index of the next missing sample at or after each frame (steady-state fill)
+        missing = np.flatnonzero(~present)
+        next_missing = np.full(n, n)
+        if missing.size:
+            pos = np.searchsorted(missing, np.arange(n))
+            has_next = pos < missing.size
+            next_missing[has_next] = missing[pos[has_next]]
+        
+        # P0 = I after one predict (the initialising update leaves P as is)
+        f00, f01, f11 = 2.0 + q, 1.0, 1.0 + q
+        pf00[start], pf01[start], pf11[start] = f00, f01, f11
+        t = start + 1
+        while t < n:
+            p01_p11 = f01 + f11
+            p00 = f00 + f01 + p01_p11 + q
+            p01 = p01_p11
+            p11 = f11 + q
+            pp00[t], pp01[t], pp11[t] = p00, p01, p11
+            
+            if present[t]:
+                s = p00 + r
+                if s <= 0.0:
+                    s = 1e-6
+                k0 = p00 / s
+                k1 = p01 / s
+                n00 = (1.0 - k0) * p00
+                n01 = (1.0 - k0) * p01
+                n11 = p11 - k1 * p01
+                k0s[t], k1s[t] = k0, k1
+                converged = (
+                    abs(n00 - f00) <= 1e-12 * abs(n00)
+                    and abs(n01 - f01) <= 1e-12 * (abs(n01) + 1e-300)
+                    and abs(n11 - f11) <= 1e-12 * abs(n11)
+                )
+                f00, f01, f11 = n00, n01, n11
+                pf00[t], pf01[t], pf11[t] = f00, f01, f11
+                if converged:
+                    # Steady state: constant until the next missing sample
+                    end = next_missing[t]
+                    for key, value in (("pp00", p00), ("pp01", p01), ("pp11", p11),
+                                       ("pf00", f00), ("pf01", f01), ("pf11", f11),
+                                       ("k0", k0), ("k1", k1)):
+                        out[key][t + 1:end] = value
+                    t = end
+                    continue
+            else:
+                f00, f01, f11 = p00, p01, p11
+                pf00[t], pf01[t], pf11[t] = f00, f01, f11
+            t += 1
+        return out
+    
+    def _prepare(self, measurements: np.ndarray):
+        z = np.asarray(measurements, dtype=np.float64)
+        if z.ndim != 2 or z.shape[1] != 2:
+            raise ValueError(f"Expected (T, 2) measurements, got {z.shape}")
+        present = ~np.isnan(z).any(axis=1)
+        if not present.any():
+            return z, present, -1
+        return z, present, int(np.argmax(present))
+    
+    def _forward(self, z: np.ndarray, present: np.ndarray, start: int):
+        """Forward Kalman filter; returns filtered states and covariance data"""
+        cov = self._covariances(present, start)
+        k0, k1 = cov["k0"], cov["k1"]
+        
+        # s_t = M_t s_{t-1} + K_t z_t with M_t = (I - K_t H) F
+        a = 1.0 - k0
+        b = 1.0 - k0
+        c = -k1
+        d = 1.0 - k1
+        zz = np.where(present[:, None], z, 0.0)
+        ux = k0[:, None] * zz
+        uv = k1[:, None] * zz
+        
+        # Initial state at the first measurement (M = 0 there)
+        a[:start + 1] = b[:start + 1] = c[:start + 1] = d[:start + 1] = 0.0
+        ux[:start + 1] = 0.0
+        uv[:start + 1] = 0.0
+        ux[start] = z[start]
+        
+        fx, fv = _affine_scan(a, b, c, d, ux, uv)
+        return fx, fv, cov
+    
+    def _result(self, x, v, start) -> SmoothedTrajectory:
+        valid = np.zeros(x.shape[0], dtype=bool)
+        if start >= 0:
+            valid[start:] = True
+        x = x.copy()
+        v = v.copy()
+        x[~valid] = np.nan
+        v[~valid] = np.nan
+        return SmoothedTrajectory(positions=x, velocities=v, valid=valid)
+    
+    def _smoother_gains(self, cov: Dict[str, np.ndarray]):
+        """RTS gains C_t = Pf_t F^T Pp_{t+1}^-1 (components, length T; last = 0)"""
+        n = cov["pf00"].shape[0]
+        f00, f01, f11 = cov["pf00"][:-1], cov["pf01"][:-1], cov["pf11"][:-1]
+        p00, p01, p11 = cov["pp00"][1:], cov["pp01"][1:], cov["pp11"][1:]
+        
+        # Pf F^T = [[f00 + f01, f01], [f01 + f11, f11]]
+        g00, g01 = f00 + f01, f01
+        g10, g11 = f01 + f11, f11
+        det = p00 * p11 - p01 * p01
+        det = np.where(np.abs(det) < 1e-300, 1e-300, det)
+        i00, i01, i11 = p11 / det, -p01 / det, p00 / det
+        
+        c00 = np.zeros(n)
+        c01 = np.zeros(n)
+        c10 = np.zeros(n)
+        c11 = np.zeros(n)
+        c00[:-1] = g00 * i00 + g01 * i01
+        c01[:-1] = g00 * i01 + g01 * i11
+        c10[:-1] = g10 * i00 + g11 * i01
+        c11[:-1] = g10 * i01 + g11 * i11
+        return c00, c01, c10, c11
+    
+    def filter(self, measurements: np.ndarray) -> SmoothedTrajectory:
+        """
+        Forward (causal) Kalman filter over a whole trajectory.
+        
+        Args:
+            measurements: (T, 2) raw gaze positions; NaN rows are missing
+            
+        Returns:
+            SmoothedTrajectory with filtered positions/velocities
+        """
+        z, present, start = self._prepare(measurements)
+        if start < 0:
+            return self._result(np.full(z.shape, np.nan), np.full(z.shape, np.nan), start)
+        fx, fv, _ = self._forward(z, present, start)
+        return self._result(fx, fv, start)
+    
+    def smooth(self, measurements: np.ndarray) -> SmoothedTrajectory:
+        """
+        Full-sequence RTS smoother (uses past and future samples).
+        
+        Args:
+            measurements: (T, 2) raw gaze positions; NaN rows are missing
+            
+        Returns:
+            SmoothedTrajectory with smoothed positions/velocities
+        """
+        z, present, start = self._prepare(measurements)
+        if start < 0:
+            return self._result(np.full(z.shape, np.nan), np.full(z.shape, np.nan), start)
+        fx, fv, cov = self._forward(z, present, start)
+        c00, c01, c10, c11 = self._smoother_gains(cov)
+        
+        # s_t = C_t s_{t+1} + (f_t - C_t F f_t), run backwards from s_{T-1} = f_{T-1}
+        px = fx + fv
+        pv = fv
+        ux = fx - (c00[:, None] * px + c01[:, None] * pv)
+        uv = fv - (c10[:, None] * px + c11[:, None] * pv)
+        sx, sv = _affine_scan(c00, c01, c10, c11, ux, uv, reverse=True)
+        return self._result(sx, sv, start)
+    
+    def smooth_fixed_lag(self, measurements: np.ndarray, lag_frames: int) -> SmoothedTrajectory:
+        """
+        Fixed-lag smoother: each frame uses at most lag_frames future samples.
+        
+        Exact E[state_t | z_1..t+lag] (RTS over a window ending lag frames later),
+        computed for all frames at once in lag_frames vectorised passes.
+        
+        Args:
+            measurements: (T, 2) raw gaze positions; NaN rows are missing
+            lag_frames: Number of future frames (0 = forward filter)
+            
+        Returns:
+            SmoothedTrajectory with fixed-lag smoothed positions/velocities
+        """
+        z, present, start = self._prepare(measurements)
+        if start < 0:
+            return self._result(np.full(z.shape, np.nan), np.full(z.shape, np.nan), start)
+        fx, fv, cov = self._forward(z, present, start)
+        if lag_frames <= 0:
+            return self._result(fx, fv, start)
+        c00, c01, c10, c11 = self._smoother_gains(cov)
+        n = fx.shape[0]
+        
+        # Filter corrections d_k = f_k - F f_{k-1}
+        dx = np.zeros_like(fx)
+        dv = np.zeros_like(fv)
+        dx[1:] = fx[1:] - (fx[:-1] + fv[:-1])
+        dv[1:] = fv[1:] - fv[:-1]
+        dx[:start + 1] = 0.0
+        dv[:start + 1] = 0.0
+        
+        # s_t = f_t + sum_j (C_t ... C_{t+j-1}) d_{t+j}
+        sx = fx.copy()
+        sv = fv.copy()
+        a00, a01, a10, a11 = np.ones(n), np.zeros(n), np.zeros(n), np.ones(n)
+        for j in range(1, min(lag_frames, n - 1) + 1):
+            m = n - j
+            g00, g01, g10, g11 = c00[j - 1:j - 1 + m], c01[j - 1:j - 1 + m], c10[j - 1:j - 1 + m], c11[j - 1:j - 1 + m]
+            a00, a01, a10, a11 = (
+                a00[:m] * g00 + a01[:m] * g10,
+                a00[:m] * g01 + a01[:m] * g11,
+                a10[:m] * g00 + a11[:m] * g10,
+                a10[:m] * g01 + a11[:m] * g11,
+            )
+            sx[:m] += a00[:, None] * dx[j:] + a01[:, None] * dv[j:]
+            sv[:m] += a10[:, None] * dx[j:] + a11[:, None] * dv[j:]
+        return self._result(sx, sv, start)
 
 
 if __name__ == "__main__":
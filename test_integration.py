@@ -5,7 +5,8 @@ Runs a 60-second synthetic pipeline to validate imports, shapes, and latency.
 Usage:
   python test_integration.py
 
-benchmark: ~60s runtime, prints average latency and FPS
+benchmark: ~60s runtime, prints average latency and FPS; first checks that
+fused clicks land where the user looks (screen pixels end to end)
 """
 
 from __future__ import annotations
@@ -20,6 +21,58 @@ from intent import IntentEngine, CommandGatekeeper
 from eye_health import StrainGuard, StrainGuardConfig
 from hand_engine import HandGestureEngine
 from gaze_inference import DLInferenceEngine
+from fusion import (
+    GazeFusionEngine, FusionConfig, FusionMode,
+    IntentScore as FusionIntentScore, GestureResult as FusionGestureResult,
+)
+from dispatcher import CommandDispatcher
+
+
+class _RecordingWorker:
+    """Stands in for CommandWorkerProcess: keeps queued commands"""
+
+    def __init__(self):
+        self.commands = []
+
+    def queue_command(self, command_type, **kwargs) -> bool:
+        self.commands.append((command_type, kwargs))
+        return True
+
+    def poll_results(self) -> list:
+        return []
+
+
+def check_click_targets(screen_width: int = 1920, screen_height: int = 1080) -> None:
+    """A centred gaze (and a centred hand) must click the screen centre"""
+    centre = (screen_width // 2, screen_height // 2)
+    cases = {
+        # Gaze as main_app builds it: normalized iris position * screen size
+        FusionMode.EYE_ONLY: (FusionIntentScore(
+            confidence=0.95, level="DELIBERATE",
+            position=(0.5 * screen_width, 0.5 * screen_height),
+            velocity=(0.0, 0.0), dwell_duration_ms=1500.0
+        ), None),
+        FusionMode.HAND_OVERRIDE: (None, FusionGestureResult(
+            gesture_type="pinch", confidence=0.95, hand_position=(0.5, 0.5), handedness="Right"
+        )),
+    }
+    for mode, (intent_score, gesture) in cases.items():
+        fusion_engine = GazeFusionEngine(FusionConfig(fusion_mode=mode))
+        result = fusion_engine.fuse(
+            intent_score=intent_score,
+            gesture_result=gesture,
+            screen_width=screen_width,
+            screen_height=screen_height
+        )
+        assert result.should_execute, f"{mode.value}: no command ({result.fusion_notes})"
+
+        gatekeeper = CommandGatekeeper()
+        gatekeeper.add_command("CLICK", position=result.position)
+        worker = _RecordingWorker()
+        CommandDispatcher(gatekeeper, worker).dispatch()
+        (_, params), = worker.commands
+        assert (params["x"], params["y"]) == centre, \
+            f"{mode.value}: click at {(params['x'], params['y'])}, expected {centre}"
 
 
 def run_integration_test(duration_s: int = 60) -> None:
@@ -66,7 +119,7 @@ def run_integration_test(duration_s: int = 60) -> None:
 
         # DL inference (only if model loaded)
         if dl_engine.model_loaded:
-            dl_engine.infer(frame, head_pose_euler=(0.0, 0.0, 0.0))
+            dl_engine.infer(frame, head_pose_euler=(0.0, 0.0, 0.0), face_bbox=(480, 200, 800, 520))
 
         frame_end = time.time()
         frame_time = frame_end - frame_start
@@ -83,5 +136,6 @@ def run_integration_test(duration_s: int = 60) -> None:
 
 
 if __name__ == "__main__":
+    check_click_targets()
     run_integration_test(60)
 
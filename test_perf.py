@@ -370,25 +370,46 @@ class PerformanceBenchmark:
     
     @staticmethod
     def benchmark_kalman_filter(iterations=1000):
-        """Benchmark Kalman filter performance"""
+        """Benchmark Kalman filter backends (matrix vs closed-form scalar)"""
         print("\n🏃 Benchmarking Kalman filter...")
         
         try:
-            from eye_control_optimized import KalmanFilter2D
-            
-            kf = KalmanFilter2D()
-            
-            start = time.time()
-            for i in range(iterations):
-                measurement = (np.random.rand() * 640, np.random.rand() * 480)
-                kf.update(measurement)
-            elapsed = time.time() - start
-            
-            avg_time = (elapsed / iterations) * 1000  # ms
+            from smoother import KalmanFilter2D
+            
+            # Same random-walk gaze trace for both backends
+            rng = np.random.default_rng(0)
+            measurements = [
+                (float(x), float(y))
+                for x, y in np.cumsum(rng.normal(0, 5, (iterations, 2)), axis=0) + 500
+            ]
+            
+            timings = {}
+            outputs = {}
+            for backend in ("matrix", "scalar"):
+                kf = KalmanFilter2D(use_gpu=False, backend=backend)
+                positions = []
+                
+                start = time.perf_counter()
+                for measurement in measurements:
+                    kf.predict()
+                    positions.append(kf.update(measurement))
+                    kf.get_state()
+                elapsed = time.perf_counter() - start
+                
+                timings[backend] = (elapsed / iterations) * 1000  # ms
+                outputs[backend] = np.array(positions)
+            
+            max_diff = float(np.max(np.abs(outputs["matrix"] - outputs["scalar"])))
+            speedup = timings["matrix"] / timings["scalar"] if timings["scalar"] > 0 else 0.0
+            avg_time = timings["scalar"]
             
             print(f"   Iterations: {iterations}")
-            print(f"   Total time: {elapsed:.3f}s")
-            print(f"   Avg per update: {avg_time:.4f}ms")
+            print(f"   Matrix backend: {timings['matrix']:.4f}ms per update")
+            print(f"   Scalar backend: {timings['scalar']:.4f}ms per update ({speedup:.1f}x)")
+            print(f"   Max position difference: {max_diff:.2e}px")
+            
+            if max_diff > 1e-2:
+                print(f"   ✗ Backends disagree (>{1e-2}px)")
             
             if avg_time < 0.1:
                 print(f"   Performance: ✓ Excellent (<0.1ms)")
@@ -397,7 +418,51 @@ class PerformanceBenchmark:
             else:
                 print(f"   Performance: ⚠ Slow (>{avg_time:.2f}ms)")
             
-            return avg_time
+            return {"matrix_ms": timings["matrix"], "scalar_ms": timings["scalar"], "max_diff_px": max_diff}
+        
+        except Exception as e:
+            print(f"   ✗ Benchmark failed: {e}")
+            return None
+    
+    @staticmethod
+    def benchmark_batch_kalman(num_tracks=200, num_frames=300):
+        """Benchmark BatchKalmanGaze against one KalmanGaze per track"""
+        print("\n🏃 Benchmarking batched Kalman tracks...")
+        
+        try:
+            import logging
+            from smoother import KalmanGaze, BatchKalmanGaze
+            
+            rng = np.random.default_rng(0)
+            measurements = np.cumsum(rng.normal(0, 10, (num_frames, num_tracks, 2)), axis=0) + 500
+            
+            # One Python-level filter per track (KalmanGaze logs on construction)
+            logging.disable(logging.INFO)
+            try:
+                trackers = [KalmanGaze(use_adaptive=True, use_gpu=False) for _ in range(num_tracks)]
+            finally:
+                logging.disable(logging.NOTSET)
+            single = np.empty_like(measurements)
+            start = time.perf_counter()
+            for t in range(num_frames):
+                for n, tracker in enumerate(trackers):
+                    single[t, n] = tracker.update_gaze(*measurements[t, n]).position
+            single_elapsed = time.perf_counter() - start
+            
+            batch = BatchKalmanGaze(num_tracks, screen_width=1920, screen_height=1080, use_adaptive=True)
+            start = time.perf_counter()
+            positions, _ = batch.filter_sequence(measurements)
+            batch_elapsed = time.perf_counter() - start
+            
+            max_diff = float(np.max(np.abs(positions - single)))
+            speedup = single_elapsed / batch_elapsed if batch_elapsed > 0 else 0.0
+            
+            print(f"   Tracks x frames: {num_tracks} x {num_frames}")
+            print(f"   Per-track filters: {single_elapsed:.3f}s")
+            print(f"   BatchKalmanGaze: {batch_elapsed:.3f}s ({speedup:.1f}x)")
+            print(f"   Max position difference: {max_diff:.2e}px")
+            
+            return {"single_s": single_elapsed, "batch_s": batch_elapsed, "max_diff_px": max_diff}
         
         except Exception as e:
             print(f"   ✗ Benchmark failed: {e}")
@@ -446,6 +511,292 @@ class PerformanceBenchmark:
             print(f"   ✗ Benchmark failed: {e}")
             return None
     
+    @staticmethod
+    def benchmark_intent_engine(num_frames=9000):
+        """Benchmark IntentEngine per-frame updates and the batch scorer"""
+        print("\n🏃 Benchmarking IntentEngine...")
+        
+        try:
+            from intent import IntentEngine
+            
+            rng = np.random.default_rng(0)
+            positions = np.cumsum(rng.normal(0, 4, (num_frames, 2)), axis=0) + 500
+            velocities = np.vstack([[0.0, 0.0], np.diff(positions, axis=0)])
+            timestamps = np.arange(num_frames) / 30.0
+            dwell = IntentEngine.compute_dwell_batch(positions, timestamps)
+            
+            engine = IntentEngine()
+            start = time.perf_counter()
+            for i in range(num_frames):
+                engine.analyze_intent(tuple(velocities[i]), tuple(positions[i]), dwell[i])
+            frame_elapsed = time.perf_counter() - start
+            
+            start = time.perf_counter()
+            scores = IntentEngine().analyze_intent_batch(velocities, positions, dwell)
+            batch_elapsed = time.perf_counter() - start
+            
+            per_frame_us = frame_elapsed / num_frames * 1e6
+            print(f"   Frames: {num_frames}")
+            print(f"   Per-frame analyze_intent: {per_frame_us:.1f}us/frame")
+            print(f"   analyze_intent_batch: {batch_elapsed * 1000:.1f}ms total")
+            print(f"   Executable frames: {scores.should_execute.mean():.0%}")
+            
+            return {"per_frame_us": per_frame_us, "batch_s": batch_elapsed}
+        
+        except Exception as e:
+            print(f"   ✗ Benchmark failed: {e}")
+            return None
+    
+    @staticmethod
+    def benchmark_command_transport(num_commands=20000, latency_samples=300, order_samples=60):
+        """Benchmark CommandWorkerProcess ring vs queue transport (commands/sec, latency, ordering)"""
+        print("\n🏃 Benchmarking command worker transport...")
+        
+        try:
+            import logging
+            from worker import CommandWorkerProcess, CommandType
+            
+            results = {}
+            for transport in CommandWorkerProcess.TRANSPORTS:
+                logging.disable(logging.ERROR)
+                try:
+                    # No move rate limit: measure the transport, not the limiter
+                    worker = CommandWorkerProcess(
+                        enable_audio=False, enable_execution=False, transport=transport, max_move_hz=0
+                    )
+                    worker.start()
+                    time.sleep(0.5)
+                    
+                    # Throughput: burst of mouse moves, retrying while the transport is full
+                    start = time.perf_counter()
+                    for i in range(num_commands):
+                        while not worker.move_mouse(i % 1920, i % 1080):
+                            time.sleep(0)
+                    # Queued moves are coalesced, so count those as consumed too
+                    while worker.commands_executed.value + worker.moves_coalesced.value < num_commands:
+                        time.sleep(0.0005)
+                    throughput = num_commands / (time.perf_counter() - start)
+                    
+                    # Latency: one timestamped command at a time, enqueue -> execute
+                    latencies = []
+                    for i in range(latency_samples):
+                        worker.queue_command(
+                            CommandType.MOUSE_MOVE, x=i, y=i, command_id=i,
+                            timestamps={"dispatch": time.time()}
+                        )
+                        deadline = time.time() + 1.0
+                        reports = []
+                        while not reports and time.time() < deadline:
+                            reports = worker.poll_results()
+                        for report in reports:
+                            stamps = report["timestamps"]
+                            latencies.append((stamps["execute"] - stamps["dispatch"]) * 1000.0)
+                    
+                    # Ordering: every third command is too large for a ring record
+                    oversized = ["a"] * 40
+                    for i in range(order_samples):
+                        keys = {"keys": oversized} if i % 3 == 0 else {"key": "a"}
+                        while not worker.queue_command(
+                            CommandType.KEYBOARD, command_id=i, timestamps={"dispatch": time.time()}, **keys
+                        ):
+                            time.sleep(0)
+                    order = []
+                    deadline = time.time() + 5.0
+                    while len(order) < order_samples and time.time() < deadline:
+                        order.extend(report["id"] for report in worker.poll_results())
+                    in_order = order == list(range(order_samples))
+                    worker.stop()
+                finally:
+                    logging.disable(logging.NOTSET)
+                
+                p50, p99 = np.percentile(latencies, [50, 99]) if latencies else (0.0, 0.0)
+                results[transport] = {
+                    "commands_per_s": throughput, "latency_p50_ms": p50, "latency_p99_ms": p99,
+                    "in_order": in_order,
+                }
+                print(f"   {transport:5s}: {throughput:8.0f} commands/s | "
+                      f"enqueue->execute p50 {p50:.3f}ms p99 {p99:.3f}ms | "
+                      f"mixed-size order {'✓' if in_order else '✗'}")
+            
+            return results
+        
+        except Exception as e:
+            print(f"   ✗ Benchmark failed: {e}")
+            return None
+    
+    @staticmethod
+    def benchmark_heatmap(num_frames=600):
+        """Benchmark HUD gaze heatmap cost per frame (splat + overlay) at 640x480 and 1280x720"""
+        print("\n🏃 Benchmarking gaze heatmap...")
+        
+        try:
+            from heatmap import GazeHeatmap
+            
+            results = {}
+            for width, height in ((640, 480), (1280, 720)):
+                rng = np.random.default_rng(0)
+                frame = np.full((height, width, 3), 50, dtype=np.uint8)
+                # Fixations on a few targets with saccades in between
+                targets = rng.uniform((0, 0), (width, height), (num_frames // 30 + 1, 2))
+                gaze = np.repeat(targets, 30, axis=0)[:num_frames] + rng.normal(0, 6, (num_frames, 2))
+                
+                heatmap = GazeHeatmap(width, height)
+                start = time.perf_counter()
+                for i in range(num_frames):
+                    now = i / 30.0
+                    heatmap.add(gaze[i, 0], gaze[i, 1], timestamp=now)
+                    heatmap.render(frame.copy(), now=now)
+                elapsed = time.perf_counter() - start
+                
+                # frame.copy() is part of render_frame already; subtract it
+                start = time.perf_counter()
+                for _ in range(num_frames):
+                    frame.copy()
+                copy_elapsed = time.perf_counter() - start
+                
+                per_frame_ms = (elapsed - copy_elapsed) / num_frames * 1000
+                results[f"{width}x{height}"] = per_frame_ms
+                print(f"   {width}x{height}: {per_frame_ms:.3f}ms/frame "
+                      f"(grid {heatmap.grid_w}x{heatmap.grid_h}, {heatmap.recolors} recolours)")
+            
+            return results
+        
+        except Exception as e:
+            print(f"   ✗ Benchmark failed: {e}")
+            return None
+    
+    @staticmethod
+    def benchmark_blue_light_filter(iterations=200):
+        """Benchmark LUT blue-light filter against the previous float32 implementation"""
+        print("\n🏃 Benchmarking blue-light filter...")
+        
+        try:
+            from hud import HUDRenderer
+            
+            def float_filter(frame):
+                filtered = frame.copy().astype(np.float32)
+                filtered[:, :, 0] = filtered[:, :, 0] * 0.70
+                filtered[:, :, 2] = np.minimum(filtered[:, :, 2] * 1.15, 255)
+                return np.clip(filtered, 0, 255).astype(np.uint8)
+            
+            results = {}
+            for width, height in ((640, 480), (1280, 720)):
+                frame = np.random.default_rng(0).integers(0, 256, (height, width, 3), dtype=np.uint8)
+                renderer = HUDRenderer(width, height)
+                
+                start = time.perf_counter()
+                for _ in range(iterations):
+                    expected = float_filter(frame)
+                float_ms = (time.perf_counter() - start) / iterations * 1000
+                
+                # LUT filter runs in place on render_frame's copy
+                work = frame.copy()
+                start = time.perf_counter()
+                for _ in range(iterations):
+                    np.copyto(work, frame)
+                    renderer._apply_blue_light_filter(work)
+                lut_ms = (time.perf_counter() - start) / iterations * 1000
+                assert np.array_equal(work, expected), "LUT output differs from float filter"
+                
+                start = time.perf_counter()
+                for _ in range(iterations):
+                    np.copyto(work, frame)
+                copy_ms = (time.perf_counter() - start) / iterations * 1000
+                lut_ms = max(lut_ms - copy_ms, 1e-6)
+                
+                results[f"{width}x{height}"] = {"float_ms": float_ms, "lut_ms": lut_ms}
+                print(f"   {width}x{height}: float {float_ms:.3f}ms, LUT {lut_ms:.3f}ms "
+                      f"({float_ms / lut_ms:.1f}x)")
+            
+            return results
+        
+        except Exception as e:
+            print(f"   ✗ Benchmark failed: {e}")
+            return None
+    
+    @staticmethod
+    def benchmark_hud_render(num_frames=300):
+        """Benchmark HUD + gesture overlay rendering per mode with cached layers"""
+        print("\n🏃 Benchmarking HUD rendering...")
+        
+        try:
+            from hud import HUDRenderer, HUDMode
+            from hand_hud import GestureHUDRenderer, GestureDisplayInfo, HUDMode as GestureHUDMode
+            
+            landmarks = np.array([(0.3 + 0.01 * i, 0.4 + 0.005 * i) for i in range(21)], dtype=np.float32)
+            stage_timings = {f"stage{i}": {"p50": 1.0, "p95": 2.0, "p99": 3.0} for i in range(8)}
+            
+            results = {}
+            for width, height in ((640, 480), (1280, 720)):
+                frame = np.random.default_rng(0).integers(0, 256, (height, width, 3), dtype=np.uint8)
+                for mode, gesture_mode in ((HUDMode.STANDARD, GestureHUDMode.STANDARD),
+                                           (HUDMode.DEBUG, GestureHUDMode.DEBUG)):
+                    hud = HUDRenderer(width, height, mode)
+                    gesture_hud = GestureHUDRenderer(width, height, gesture_mode)
+                    
+                    start = time.perf_counter()
+                    for i in range(num_frames):
+                        # Values change every few frames, as they do on screen
+                        fps = 30 + (i // 40) % 3
+                        output = hud.render_frame(
+                            frame,
+                            gaze_position=(300 + i % 50, 200),
+                            gaze_velocity=(2.0, 1.0),
+                            intent_confidence=0.8,
+                            strain_metrics={"blink_rate": 15.0 + (i // 30) * 0.1, "perclos": 5.0,
+                                            "fatigue_level": "NORMAL"},
+                            fps=fps,
+                            backend_info={"backend": "CPU", "cuda_enabled": False},
+                            mode_info="SIM - cpu",
+                            stage_timings=stage_timings if mode == HUDMode.DEBUG else None
+                        )
+                        gesture_hud.render_hand_overlay(
+                            output, landmarks,
+                            GestureDisplayInfo("open_palm", 0.8 + 0.001 * (i // 10), (0, 0), "Right"),
+                            "eye_leads_hand_confirms",
+                            {"hands_detected": 1, "fps": fps, "inference_ms": 5.0, "confidence": 0.8}
+                        )
+                    elapsed_ms = (time.perf_counter() - start) / num_frames * 1000
+                    
+                    results[f"{width}x{height} {mode.value}"] = elapsed_ms
+                    print(f"   {width}x{height} {mode.value}: {elapsed_ms:.3f}ms/frame")
+            
+            return results
+        
+        except Exception as e:
+            print(f"   ✗ Benchmark failed: {e}")
+            return None
+    
+    @staticmethod
+    def benchmark_gesture_classification(num_hands=2000):
+        """Benchmark rule-based gesture classification on (21, 4) landmark arrays"""
+        print("\n🏃 Benchmarking gesture classification...")
+        
+        try:
+            from hand_engine import HandGestureEngine, Hand
+            
+            engine = HandGestureEngine(enable_gpu=False)
+            rng = np.random.default_rng(0)
+            hands = []
+            for _ in range(num_hands):
+                landmarks = np.ones((21, 4), dtype=np.float32)
+                landmarks[:, :3] = rng.normal((0.5, 0.5, 0.0), (0.08, 0.08, 0.02), (21, 3))
+                x_min, y_min = landmarks[:, :2].min(axis=0).tolist()
+                x_max, y_max = landmarks[:, :2].max(axis=0).tolist()
+                hands.append(Hand(landmarks, "Right", 0.9, bounding_box=(x_min, y_min, x_max, y_max)))
+            
+            start = time.perf_counter()
+            for hand in hands:
+                engine._classify_gesture(hand)
+            elapsed_us = (time.perf_counter() - start) / num_hands * 1e6
+            
+            print(f"   {elapsed_us:.1f}us per hand")
+            return {"classify_us": elapsed_us}
+        
+        except Exception as e:
+            print(f"   ✗ Benchmark failed: {e}")
+            return None
+    
     @staticmethod
     def run_all_benchmarks():
         """Run all benchmarks"""
@@ -454,7 +805,14 @@ class PerformanceBenchmark:
         print("="*70)
         
         PerformanceBenchmark.benchmark_kalman_filter()
+        PerformanceBenchmark.benchmark_batch_kalman()
         PerformanceBenchmark.benchmark_intent_detection()
+        PerformanceBenchmark.benchmark_intent_engine()
+        PerformanceBenchmark.benchmark_command_transport()
+        PerformanceBenchmark.benchmark_heatmap()
+        PerformanceBenchmark.benchmark_blue_light_filter()
+        PerformanceBenchmark.benchmark_hud_render()
+        PerformanceBenchmark.benchmark_gesture_classification()
         
         print("\n" + "="*70)
 
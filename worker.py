@@ -8,6 +8,9 @@ Part of NeuroGaze Elite
 
 import multiprocessing as mp
 from multiprocessing import Process, Queue, Value
+import math
+import queue
+import struct
 import time
 import logging
 import platform
@@ -16,6 +19,12 @@ from typing import Optional, Callable
 from pathlib import Path
 from enum import Enum
 
+try:
+    from multiprocessing import shared_memory
+    _SHARED_MEMORY_AVAILABLE = True
+except ImportError:
+    _SHARED_MEMORY_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
 
@@ -31,6 +40,231 @@ class CommandType(Enum):
     SLEEP = "sleep"
 
 
+class CommandRing:
+    """
+    Single-producer / single-consumer command ring in shared memory.
+    
+    Commands are packed into fixed 128-byte records (no pickling, no pipe, no
+    feeder thread). The producer owns `head`, the consumer owns `tail`; each
+    only writes its own index after the record write/read, so no lock is
+    needed. The consumer sleeps on an Event that the producer sets after
+    every push.
+    
+    Commands that do not fit a record travel through a side queue; the
+    producer then pushes a QUEUED marker record (push_queued), and the
+    consumer takes the next side-queue command at that point, so the ring
+    keeps the one command order.
+    
+    Record layout (little-endian, RECORD):
+        seq, command_id           int64
+        type, flags, button, dir  uint8 (codes into the tables below)
+        x, y                      int32
+        amount                    int16
+        frequency, duration_ms    uint16
+        key                       32 bytes utf-8 ("keys" joined by 0x1f)
+        name                      24 bytes utf-8
+        capture, fusion, enqueue, dispatch timestamps   float64 (NaN = unset)
+    """
+    
+    RECORD = struct.Struct("<qqBBBBiihHH2x32s24s4d4x")
+    INDEX = struct.Struct("<Q")
+    HEAD_OFFSET = 0
+    TAIL_OFFSET = 64            # Separate cache lines for the two indices
+    DATA_OFFSET = 128
+    
+    TYPES = list(CommandType)
+    TYPE_CODES = {t.value: i for i, t in enumerate(TYPES)}
+    BUTTONS = ("left", "right", "middle")
+    DIRECTIONS = ("up", "down", "left", "right")
+    TIMESTAMP_KEYS = ("capture", "fusion", "enqueue", "dispatch")
+    FIELDS = {
+        "type", "command_id", "name", "x", "y", "button", "direction", "amount",
+        "frequency", "duration_ms", "key", "keys", "timestamps",
+    }
+    FLAG_XY = 1
+    FLAG_TIMESTAMPS = 2
+    FLAG_QUEUED = 4
+    QUEUED = object()  # pop() result for a marker record
+    KEY_SEPARATOR = "\x1f"
+    
+    def __init__(self, capacity: int = 1024, name: Optional[str] = None):
+        """
+        Create (name=None) or attach to a ring.
+        
+        Args:
+            capacity: Number of records (rounded up to a power of two)
+            name: Existing shared memory block to attach to
+        """
+        self.capacity = 1 << max(1, int(capacity) - 1).bit_length()
+        self._mask = self.capacity - 1
+        size = self.DATA_OFFSET + self.capacity * self.RECORD.size
+        self._owner = name is None
+        if self._owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+            self.shm.buf[:self.DATA_OFFSET] = bytes(self.DATA_OFFSET)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.wakeup = None  # mp.Event, set by the owner
+        self._buf = self.shm.buf
+    
+    def __getstate__(self):
+        return {"capacity": self.capacity, "name": self.shm.name, "wakeup": self.wakeup}
+    
+    def __setstate__(self, state):
+        self.__init__(state["capacity"], name=state["name"])
+        self.wakeup = state["wakeup"]
+    
+    def _load(self, offset: int) -> int:
+        return self.INDEX.unpack_from(self._buf, offset)[0]
+    
+    def __len__(self) -> int:
+        return self._load(self.HEAD_OFFSET) - self._load(self.TAIL_OFFSET)
+    
+    def full(self) -> bool:
+        """Producer side: no free record (only the producer makes it fuller)"""
+        return len(self) >= self.capacity
+    
+    @classmethod
+    def encode_fields(cls, command_data: dict) -> Optional[tuple]:
+        """Record fields for a command dict, or None if it does not fit a record"""
+        if not cls.FIELDS.issuperset(command_data):
+            return None
+        type_code = cls.TYPE_CODES.get(command_data.get("type"))
+        if type_code is None:
+            return None
+        
+        flags = 0
+        x = command_data.get("x")
+        y = command_data.get("y")
+        if x is not None and y is not None:
+            flags |= cls.FLAG_XY
+        keys = command_data.get("keys")
+        key = cls.KEY_SEPARATOR.join(keys) if keys else command_data.get("key", "")
+        key_bytes = key.encode("utf-8")
+        name_bytes = str(command_data.get("name", "")).encode("utf-8")
+        timestamps = command_data.get("timestamps")
+        stamps = [math.nan] * 4
+        if timestamps is not None:
+            flags |= cls.FLAG_TIMESTAMPS
+            stamps = [float(timestamps.get(k, math.nan)) for k in cls.TIMESTAMP_KEYS]
+        
+        try:
+            button = cls.BUTTONS.index(command_data.get("button", "left"))
+            direction = cls.DIRECTIONS.index(command_data.get("direction", "up"))
+        except ValueError:
+            return None
+        amount = int(command_data.get("amount", 3))
+        frequency = int(command_data.get("frequency", 1000))
+        duration_ms = int(command_data.get("duration_ms", 100))
+        if (len(key_bytes) > 32 or len(name_bytes) > 24 or not -32768 <= amount < 32768
+                or not 0 <= frequency < 65536 or not 0 <= duration_ms < 65536):
+            return None
+        command_id = command_data.get("command_id")
+        
+        return (
+            -1 if command_id is None else int(command_id), type_code, flags, button, direction,
+            int(x) if flags & cls.FLAG_XY else 0, int(y) if flags & cls.FLAG_XY else 0,
+            amount, frequency, duration_ms, key_bytes, name_bytes, *stamps
+        )
+    
+    def push(self, command_data: dict) -> Optional[bool]:
+        """
+        Producer side: append a command.
+        
+        Returns:
+            True if queued, False if the ring is full, None if the command does
+            not fit a record (send it another way)
+        """
+        fields = self.encode_fields(command_data)
+        if fields is None:
+            return None
+        return self._push_fields(fields)
+    
+    def push_queued(self) -> bool:
+        """
+        Producer side: mark the place of a command sent through the side queue
+        (put it there first). Returns False if the ring is full.
+        """
+        return self._push_fields((-1, 0, self.FLAG_QUEUED, 0, 0, 0, 0, 0, 0, 0, b"", b"", *[math.nan] * 4))
+    
+    def _push_fields(self, fields: tuple) -> bool:
+        head = self._load(self.HEAD_OFFSET)
+        if head - self._load(self.TAIL_OFFSET) >= self.capacity:
+            return False
+        offset = self.DATA_OFFSET + (head & self._mask) * self.RECORD.size
+        self.RECORD.pack_into(self._buf, offset, head, *fields)
+        self.INDEX.pack_into(self._buf, self.HEAD_OFFSET, head + 1)  # Publish
+        if self.wakeup is not None:
+            self.wakeup.set()
+        return True
+    
+    def pop(self) -> Optional[object]:
+        """
+        Consumer side: next command dict (same shape as the queue transport),
+        QUEUED for a marker record (take the next side-queue command), or None
+        """
+        tail = self._load(self.TAIL_OFFSET)
+        if tail == self._load(self.HEAD_OFFSET):
+            return None
+        offset = self.DATA_OFFSET + (tail & self._mask) * self.RECORD.size
+        (_, command_id, type_code, flags, button, direction, x, y, amount, frequency,
+         duration_ms, key_bytes, name_bytes, *stamps) = self.RECORD.unpack_from(self._buf, offset)
+        self.INDEX.pack_into(self._buf, self.TAIL_OFFSET, tail + 1)  # Release slot
+        if flags & self.FLAG_QUEUED:
+            return self.QUEUED
+        
+        key = key_bytes.rstrip(b"\0").decode("utf-8")
+        command_data = {
+            "type": self.TYPES[type_code].value,
+            "button": self.BUTTONS[button],
+            "direction": self.DIRECTIONS[direction],
+            "amount": amount,
+            "frequency": frequency,
+            "duration_ms": duration_ms,
+        }
+        if self.KEY_SEPARATOR in key:
+            command_data["keys"] = key.split(self.KEY_SEPARATOR)
+        else:
+            command_data["key"] = key
+        if flags & self.FLAG_XY:
+            command_data["x"] = x
+            command_data["y"] = y
+        if command_id >= 0:
+            command_data["command_id"] = command_id
+        name = name_bytes.rstrip(b"\0").decode("utf-8")
+        if name:
+            command_data["name"] = name
+        if flags & self.FLAG_TIMESTAMPS:
+            command_data["timestamps"] = {
+                k: v for k, v in zip(self.TIMESTAMP_KEYS, stamps) if not math.isnan(v)
+            }
+        return command_data
+    
+    def wait(self, timeout: float) -> None:
+        """Consumer side: sleep until the producer pushes (or timeout)"""
+        if self.wakeup is None:
+            time.sleep(min(timeout, 0.001))
+            return
+        self.wakeup.wait(timeout)
+        self.wakeup.clear()
+    
+    def close(self) -> None:
+        """Detach from the shared memory block"""
+        self._buf = None
+        try:
+            self.shm.close()
+        except (OSError, BufferError):
+            pass
+    
+    def unlink(self) -> None:
+        """Free the shared memory block (creator only, after both sides are done)"""
+        if self._owner:
+            try:
+                self.shm.unlink()
+            except OSError:
+                pass
+
+
 def cross_platform_beep(frequency: int = 1000, duration_ms: int = 100) -> None:
     """
     Cross-platform beep without winsound dependency.
@@ -78,30 +312,68 @@ class CommandWorkerProcess:
     Fixes GAP 3: Multiprocessing-based command execution.
     """
     
-    def __init__(self, enable_audio: bool = True, enable_execution: bool = True):
+    TRANSPORTS = ("ring", "queue")
+    IDLE_WAIT_S = 0.5  # Idle wake-up interval (stop() wakes the worker immediately)
+    MIN_MOVE_HOLD_S = 0.01  # Longest a move is held while newer ones keep arriving, when unlimited
+    QUEUED_WAIT_S = 2.0  # Longest wait for a side-queue command after its ring marker
+    
+    def __init__(
+        self,
+        enable_audio: bool = True,
+        enable_execution: bool = True,
+        transport: str = "ring",
+        ring_capacity: int = 1024,
+        max_move_hz: float = 60.0
+    ):
         """
         Initialize command worker.
         
         Args:
             enable_audio: Enable audio feedback
             enable_execution: Enable actual command execution (False = simulation)
+            transport: "ring" (shared-memory CommandRing) or "queue" (multiprocessing.Queue)
+            ring_capacity: Ring size in records
+            max_move_hz: Max cursor moves per second; queued moves are coalesced
+                         to the latest target (0 = no limit, still coalesced)
         """
+        if transport not in self.TRANSPORTS:
+            raise ValueError(f"Unknown transport: {transport}")
         self.enable_audio = enable_audio
         self.enable_execution = enable_execution
+        self.max_move_hz = max_move_hz
+        
+        # Shared-memory ring; the queue below stays as fallback (and carries
+        # commands that do not fit a ring record, in ring order via markers)
+        self.command_ring: Optional[CommandRing] = None
+        self.wakeup = mp.Event()
+        if transport == "ring":
+            if not _SHARED_MEMORY_AVAILABLE:
+                logger.warning("multiprocessing.shared_memory unavailable - using queue transport")
+            else:
+                try:
+                    self.command_ring = CommandRing(ring_capacity)
+                    self.command_ring.wakeup = self.wakeup
+                except Exception as e:
+                    logger.warning(f"Could not create command ring ({e}) - using queue transport")
+        self.transport = "ring" if self.command_ring is not None else "queue"
         
         # Multiprocessing queue and control
         self.command_queue: mp.Queue = mp.Queue(maxsize=50)
+        # Completion reports for commands that carry timestamps (latency accounting)
+        self.result_queue: mp.Queue = mp.Queue(maxsize=200)
         self.running = mp.Value('i', 0)
         self.worker_process: Optional[Process] = None
         
         # Stats
         self.commands_executed = mp.Value('i', 0)
         self.commands_failed = mp.Value('i', 0)
+        self.moves_coalesced = mp.Value('i', 0)
         
         # Configuration
         self.screen_width, self.screen_height = self._get_screen_size()
         
-        logger.info(f"✓ CommandWorkerProcess initialized (screen: {self.screen_width}x{self.screen_height})")
+        logger.info(f"✓ CommandWorkerProcess initialized (screen: {self.screen_width}x{self.screen_height}, "
+                    f"transport: {self.transport})")
     
     def _get_screen_size(self) -> tuple:
         """Get screen size cross-platform"""
@@ -120,13 +392,17 @@ class CommandWorkerProcess:
                 target=self._worker_loop,
                 args=(
                     self.command_queue,
+                    self.command_ring,
+                    self.result_queue,
                     self.running,
                     self.commands_executed,
                     self.commands_failed,
+                    self.moves_coalesced,
                     self.enable_audio,
                     self.enable_execution,
                     self.screen_width,
-                    self.screen_height
+                    self.screen_height,
+                    self.max_move_hz
                 )
             )
             self.worker_process.daemon = True
@@ -137,25 +413,45 @@ class CommandWorkerProcess:
         """Stop the worker process"""
         self.running.value = 0
         if self.worker_process and self.worker_process.is_alive():
+            # Wake the worker instead of waiting out its idle timeout
+            self.wakeup.set()
+            if self.command_ring is None:
+                try:
+                    self.command_queue.put_nowait(None)
+                except Exception:
+                    pass
             self.worker_process.join(timeout=2.0)
             if self.worker_process.is_alive():
                 self.worker_process.terminate()
             logger.info("✓ Command worker process stopped")
+        if self.command_ring is not None and not (self.worker_process and self.worker_process.is_alive()):
+            self.command_ring.close()
+            self.command_ring.unlink()
+            self.command_ring = None
     
     @staticmethod
     def _worker_loop(
         cmd_queue: mp.Queue,
+        cmd_ring: Optional[CommandRing],
+        result_queue: mp.Queue,
         running: mp.Value,
         cmd_executed: mp.Value,
         cmd_failed: mp.Value,
+        moves_coalesced: mp.Value,
         enable_audio: bool,
         enable_execution: bool,
         screen_width: int,
-        screen_height: int
+        screen_height: int,
+        max_move_hz: float
     ) -> None:
         """
         Worker process main loop.
         Runs on separate process - handles all blocking operations here.
+        
+        Mouse moves are not executed on arrival: the latest one is held and
+        replaced by newer moves, then applied when the input drains or after at
+        most one move interval (max_move_hz). Any other command first applies
+        the held move, so clicks and keys land where the cursor was sent.
         """
         try:
             import pyautogui
@@ -167,35 +463,114 @@ class CommandWorkerProcess:
         
         logger.info(f"Command worker loop started (pid: {mp.current_process().pid})")
         
-        while running.value:
+        move_interval = 1.0 / max_move_hz if max_move_hz > 0 else 0.0
+        max_hold = max(move_interval, CommandWorkerProcess.MIN_MOVE_HOLD_S)
+        
+        def next_command(timeout: float) -> Optional[dict]:
+            """Next command from the ring (or the queue at a marker / without a ring); waits up to timeout"""
+            if cmd_ring is not None:
+                command_data = cmd_ring.pop()
+                if command_data is None:
+                    if timeout > 0:
+                        cmd_ring.wait(timeout)
+                    return None
+                if command_data is CommandRing.QUEUED:
+                    # Oversized command: it was put on the queue before its marker,
+                    # so it is there or still in the queue's feeder thread
+                    try:
+                        return cmd_queue.get(timeout=CommandWorkerProcess.QUEUED_WAIT_S)
+                    except queue.Empty:
+                        logger.error("Worker: queued command missing after ring marker")
+                        return None
+                return command_data
             try:
-                # Get command from queue with timeout
+                if timeout > 0:
+                    return cmd_queue.get(timeout=timeout)
+                return cmd_queue.get_nowait()
+            except queue.Empty:
+                return None  # (None is also the wake-up sentinel from stop())
+        
+        def run(command_data: dict) -> None:
+            dequeue_time = time.time()
+            
+            # Execute command
+            success = CommandWorkerProcess._execute_command(
+                command_data,
+                pyautogui,
+                enable_audio,
+                enable_execution,
+                screen_width,
+                screen_height
+            )
+            
+            # Report completion for timestamped commands
+            timestamps = command_data.get("timestamps")
+            if timestamps is not None:
+                timestamps["dequeue"] = dequeue_time
+                timestamps.setdefault("execute", time.time())
                 try:
-                    command_data = cmd_queue.get(timeout=0.5)
-                except:
-                    continue
+                    result_queue.put_nowait({
+                        "id": command_data.get("command_id"),
+                        "name": command_data.get("name", command_data.get("type")),
+                        "success": success,
+                        "timestamps": timestamps,
+                    })
+                except Exception:
+                    pass  # Main process not draining; latency sample lost
+            
+            if success:
+                cmd_executed.value += 1
+            else:
+                cmd_failed.value += 1
+        
+        pending_move: Optional[dict] = None
+        pending_since = 0.0
+        last_move = 0.0
+        
+        while running.value:
+            try:
+                if pending_move is None:
+                    wait = CommandWorkerProcess.IDLE_WAIT_S
+                else:
+                    wait = max(0.0, last_move + move_interval - time.monotonic())
+                command_data = next_command(wait)
                 
-                # Execute command
-                success = CommandWorkerProcess._execute_command(
-                    command_data,
-                    pyautogui,
-                    enable_audio,
-                    enable_execution,
-                    screen_width,
-                    screen_height
-                )
+                if command_data is not None and command_data.get("type") == CommandType.MOUSE_MOVE.value:
+                    # Coalesce to the latest target
+                    if pending_move is None:
+                        pending_since = time.monotonic()
+                    else:
+                        moves_coalesced.value += 1
+                    pending_move = command_data
+                    if time.monotonic() - pending_since < max_hold:
+                        continue
+                    command_data = None  # Held too long under a steady stream: apply now
                 
-                if success:
-                    cmd_executed.value += 1
-                else:
-                    cmd_failed.value += 1
+                if pending_move is not None:
+                    now = time.monotonic()
+                    if command_data is not None or now - last_move >= move_interval:
+                        run(pending_move)
+                        last_move = now
+                        pending_move = None
+                
+                if command_data is not None:
+                    run(command_data)
                     
             except Exception as e:
                 logger.error(f"Worker loop error: {e}")
                 cmd_failed.value += 1
         
+        if cmd_ring is not None:
+            cmd_ring.close()
         logger.info("Command worker loop stopped")
     
+    @staticmethod
+    def _mark_executed(command_data: dict) -> None:
+        """Stamp the action time (before audio feedback) on timestamped commands"""
+        timestamps = command_data.get("timestamps")
+        if timestamps is not None:
+            timestamps["execute"] = time.time()
+    
     @staticmethod
     def _execute_command(
         command_data: dict,
@@ -231,10 +606,9 @@ class CommandWorkerProcess:
                     x = max(0, min(screen_width - 1, x))
                     y = max(0, min(screen_height - 1, y))
                     pyautogui.moveTo(x, y, duration=0)  # No animation
+                CommandWorkerProcess._mark_executed(command_data)
                 
-                if enable_audio:
-                    cross_platform_beep(2000, 20)
-                
+                # No audio feedback for moves (a blocking beep per move caps the move rate)
                 return True
             
             elif cmd_type == CommandType.MOUSE_CLICK:
@@ -249,6 +623,7 @@ class CommandWorkerProcess:
                         pyautogui.click(x, y, button=button)
                     else:
                         pyautogui.click(button=button)
+                CommandWorkerProcess._mark_executed(command_data)
                 
                 if enable_audio:
                     cross_platform_beep(800, 50)
@@ -266,6 +641,7 @@ class CommandWorkerProcess:
                         pyautogui.click(x, y, clicks=2, interval=0.1)
                     else:
                         pyautogui.click(clicks=2, interval=0.1)
+                CommandWorkerProcess._mark_executed(command_data)
                 
                 if enable_audio:
                     cross_platform_beep(1000, 30)
@@ -286,6 +662,7 @@ class CommandWorkerProcess:
                         # Horizontal scroll (if supported)
                         pyautogui.press("right" if direction == "right" else "left")
                         time.sleep(0.05)
+                CommandWorkerProcess._mark_executed(command_data)
                 
                 if enable_audio:
                     cross_platform_beep(1500, 25)
@@ -303,6 +680,7 @@ class CommandWorkerProcess:
                         for k in keys:
                             pyautogui.press(k)
                             time.sleep(0.05)
+                CommandWorkerProcess._mark_executed(command_data)
                 
                 if enable_audio:
                     cross_platform_beep(1200, 40)
@@ -312,6 +690,7 @@ class CommandWorkerProcess:
             elif cmd_type == CommandType.AUDIO_BEEP:
                 freq = command_data.get("frequency", 1000)
                 duration = command_data.get("duration_ms", 100)
+                CommandWorkerProcess._mark_executed(command_data)
                 
                 if enable_audio:
                     cross_platform_beep(freq, duration)
@@ -352,12 +731,37 @@ class CommandWorkerProcess:
                 "type": command_type.value,
                 **kwargs
             }
+            ring = self.command_ring
+            if ring is not None:
+                pushed = ring.push(command_data)
+                if pushed is None and ring.full():
+                    pushed = False  # No room for the marker either
+                if pushed is not None:
+                    if not pushed:
+                        logger.error("Failed to queue command: command ring full")
+                    return pushed
             self.command_queue.put_nowait(command_data)
+            if ring is not None:
+                ring.push_queued()  # Room was checked above; only this producer fills the ring
             return True
         except Exception as e:
             logger.error(f"Failed to queue command: {e}")
             return False
     
+    def poll_results(self) -> list:
+        """
+        Drain completion reports (non-blocking).
+        
+        Returns:
+            List of {"id", "name", "success", "timestamps"} dicts
+        """
+        results = []
+        while True:
+            try:
+                results.append(self.result_queue.get_nowait())
+            except Exception:
+                return results
+    
     # Convenience methods for common commands
     
     def move_mouse(self, x: int, y: int) -> bool:
@@ -393,14 +797,26 @@ class CommandWorkerProcess:
         return {
             "commands_executed": self.commands_executed.value,
             "commands_failed": self.commands_failed.value,
-            "queue_size": self.command_queue.qsize() if hasattr(self.command_queue, 'qsize') else -1,
+            "moves_coalesced": self.moves_coalesced.value,
+            "transport": self.transport,
+            "queue_size": self._queue_size(),
             "is_running": bool(self.worker_process and self.worker_process.is_alive())
         }
     
+    def _queue_size(self) -> int:
+        try:
+            queued = self.command_queue.qsize()
+        except NotImplementedError:  # macOS
+            return -1
+        if self.command_ring is not None:
+            queued += len(self.command_ring)
+        return queued
+    
     def reset_stats(self) -> None:
         """Reset statistics"""
         self.commands_executed.value = 0
         self.commands_failed.value = 0
+        self.moves_coalesced.value = 0
 
 
 if __name__ == "__main__":